@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Batalhas de grupo: vários heróis (de HEROIS_CRIADOS ou simulados) contra uma horda montada de INIMIGO_TEMPLATES.
+
+Usa as mesmas regras do jogo (rpg_dinamico.resolver_*). A ordem dos turnos vem de uma fila de iniciativa por tempo:
+cada combatente volta a agir INTERVALO_DE_INICIATIVA / (INICIATIVA_MINIMA + agilidade) depois da sua última ação, então
+quem tem mais agilidade age mais vezes (e um buff de agilidade adianta o próximo turno). Um turno custa O(log n) no
+número de combatentes: um pop e um push no heap de iniciativa e a escolha do alvo (sorteio O(1) ou o de menor vida,
+num heap por lado). Quem cai sai da lista de vivos do seu lado em O(1); as entradas dele nos heaps são descartadas
+quando chegam ao topo, sem busca.
+
+O motor não faz I/O: cada turno devolve uma lista de eventos que a interface (a arena da GUI) ou o simulador sem
+interface escrevem com `descrever`. Batalhas de grupo não entram no diário da masmorra.
+
+Uso: python -m rpg_dinamico simulate-grupo --classes Feral,Sombra --inimigos 200 --nivel 3 --batalhas 20
+"""
+import argparse
+import heapq
+import random
+import time
+
+import persistencia
+import rpg_dinamico
+import simulador
+
+INTERVALO_DE_INICIATIVA = 100.0
+INICIATIVA_MINIMA = 10.0  # Somada à agilidade: agilidade 1 ainda age cerca de metade das vezes de agilidade 12
+
+
+# --- LADOS ---
+class Lado:
+    """
+    Os combatentes de um lado. Os vivos ficam numa lista com índice por combatente (sorteio e remoção O(1), trocando
+    com o último) e num heap de (vida, sequência, combatente) para achar o de menor vida; cada mudança de vida empilha
+    uma entrada nova e as antigas são descartadas quando aparecem no topo.
+    """
+    def __init__(self, membros):
+        self.membros = list(membros)
+        self.vivos = [c for c in self.membros if c.vida_atual > 0]; self._posicao = {c: i for i, c in enumerate(self.vivos)}
+        self._vidas = [(c.vida_atual, i, c) for i, c in enumerate(self.vivos)]; heapq.heapify(self._vidas); self._sequencia = len(self._vidas)
+
+    def __len__(self): return len(self.vivos)
+    def __contains__(self, combatente): return combatente in self._posicao
+
+    def atualizar(self, combatente):
+        """Depois de a vida de `combatente` mudar. Devolve True se ele caiu agora (e já saiu do lado)."""
+        if combatente not in self._posicao: return False
+        if combatente.vida_atual <= 0:
+            i = self._posicao.pop(combatente); ultimo = self.vivos.pop()
+            if ultimo is not combatente: self.vivos[i] = ultimo; self._posicao[ultimo] = i
+            return True
+        self._sequencia += 1; heapq.heappush(self._vidas, (combatente.vida_atual, self._sequencia, combatente))
+        if len(self._vidas) > 16 and len(self._vidas) > 4 * len(self.vivos):  # Muitas entradas vencidas: compacta
+            self._vidas = [(c.vida_atual, s, c) for s, c in enumerate(self.vivos)]; heapq.heapify(self._vidas)
+        return False
+
+    def aleatorio(self, rng=random): return self.vivos[rng.randrange(len(self.vivos))]
+
+    def mais_fraco(self, rng=None):
+        """O vivo com menor vida atual (empate: o que chegou a essa vida primeiro)."""
+        vidas = self._vidas
+        while vidas:
+            vida, _, combatente = vidas[0]
+            if combatente in self._posicao and combatente.vida_atual == vida: return combatente
+            heapq.heappop(vidas)
+        return None
+
+# Como cada lado escolhe o alvo no lado oposto: (lado oposto, rng) -> combatente.
+ALVOS = {"aleatorio": Lado.aleatorio, "mais_fraco": Lado.mais_fraco}
+
+
+# --- MOTOR ---
+class BatalhaEmGrupo:
+    """
+    Uma batalha N contra M. Para jogar um turno de fora (a GUI, com o jogador escolhendo a ação dos heróis):
+    proximo() -> inicio_do_turno(ator) -> agir(ator, alvo, habilidade). jogar_turno() faz os três sozinho, com os
+    heróis seguindo `politica` (as do simulador) e os inimigos no Ataque Básico.
+    """
+    def __init__(self, herois, inimigos, politica="gulosa", alvo_herois="mais_fraco", alvo_inimigos="aleatorio", rng=random):
+        self.herois = Lado(herois); self.inimigos = Lado(inimigos)
+        self.politica = simulador.POLITICAS[politica]; self.rng = rng
+        self._lados = {}  # combatente -> (seu lado, lado oposto, escolha de alvo)
+        for c in self.herois.membros: self._lados[c] = (self.herois, self.inimigos, ALVOS[alvo_herois])
+        for c in self.inimigos.membros: self._lados[c] = (self.inimigos, self.herois, ALVOS[alvo_inimigos])
+        self.tempo = 0.0; self.turnos = 0; self._fila = []; self._sequencia = 0  # fila: heap de (tempo, sequência, combatente)
+        for c in self.herois.vivos + self.inimigos.vivos: self._agendar(c)  # Empate de tempo: heróis primeiro, como no 1 contra 1
+
+    def _agendar(self, combatente):
+        self._sequencia += 1
+        heapq.heappush(self._fila, (self.tempo + INTERVALO_DE_INICIATIVA / (INICIATIVA_MINIMA + max(0.0, combatente.agilidade)), self._sequencia, combatente))
+
+    def eh_heroi(self, combatente): return self._lados[combatente][0] is self.herois
+
+    def resultado(self):
+        """'vitoria' ou 'derrota' (dos heróis) quando um lado inteiro caiu; None enquanto a batalha segue."""
+        if not self.inimigos: return "vitoria"
+        if not self.herois: return "derrota"
+        return None
+
+    def proximo(self):
+        """Tira da fila o próximo combatente vivo e já o reagenda. None se a batalha acabou."""
+        if self.resultado(): return None
+        while True:
+            tempo, _, combatente = heapq.heappop(self._fila)
+            if combatente.vida_atual > 0: break  # Quem caiu tem só a entrada que sobrou na fila, descartada aqui
+        self.tempo = tempo; self.turnos += 1; self._agendar(combatente)
+        return combatente
+
+    def inicio_do_turno(self, ator):
+        """Buffs e efeitos do começo do turno. Devolve (eventos, pode_agir)."""
+        eventos = [("efeito", ator, evento, tipo, valor) for evento, tipo, valor in rpg_dinamico.resolver_efeitos(ator)]
+        if eventos and self._lados[ator][0].atualizar(ator): eventos.append(("caiu", ator)); return eventos, False
+        if 'congelado' in ator.efeitos_status: eventos.append(("congelado", ator)); return eventos, False
+        return eventos, True
+
+    def escolher_alvo(self, ator):
+        _, oponentes, escolha = self._lados[ator]
+        return escolha(oponentes, self.rng)
+
+    def escolher_habilidade(self, ator, alvo): return self.politica(ator, alvo) if self.eh_heroi(ator) else None
+
+    def agir(self, ator, alvo, habilidade=None):
+        """Habilidade de `ator` em `alvo` ou, sem habilidade (ou sem caos para ela), o Ataque Básico. Devolve os eventos."""
+        resultado = None if habilidade is None else rpg_dinamico.resolver_habilidade(ator, alvo, habilidade, self.rng)
+        if resultado is None: eventos = [("ataque", ator, alvo, rpg_dinamico.resolver_ataque(ator, alvo, self.rng))]
+        else: eventos = [("habilidade", ator, alvo, habilidade, *resultado)]
+        if self._lados[alvo][0].atualizar(alvo): eventos.append(("caiu", alvo))
+        return eventos
+
+    def jogar_turno(self):
+        """Um turno automático do próximo combatente. Devolve os eventos, ou None se a batalha já acabou."""
+        ator = self.proximo()
+        if ator is None: return None
+        eventos, pode_agir = self.inicio_do_turno(ator)
+        if pode_agir:
+            alvo = self.escolher_alvo(ator); eventos += self.agir(ator, alvo, self.escolher_habilidade(ator, alvo))
+        return eventos
+
+    def rodar(self, max_turnos=None):
+        """Joga até o fim. Sem vencedor em `max_turnos` (padrão: MAX_TURNOS do simulador por combatente) conta como derrota."""
+        if max_turnos is None: max_turnos = simulador.MAX_TURNOS * len(self._lados)
+        while self.turnos < max_turnos and self.jogar_turno() is not None: pass
+        return self.resultado() or "derrota"
+
+
+def descrever(evento):
+    """Texto de log de um evento de turno."""
+    tipo = evento[0]
+    if tipo == "efeito":
+        _, combatente, ocorrido, efeito, valor = evento
+        if ocorrido == 'buff_expirou': return f"O efeito do buff de {efeito.upper()} em {combatente.nome} acabou."
+        if ocorrido == 'dano_efeito': return f"🐍 {combatente.nome} sofre {valor:.1f} de dano de veneno."
+        return f"O efeito de {efeito.upper()} em {combatente.nome} acabou."
+    if tipo == "congelado": return f"🥶 {evento[1].nome} está congelado e perde o turno!"
+    if tipo == "ataque":
+        _, ator, alvo, dano = evento
+        return f"💥 {ator.nome} ataca {alvo.nome}: " + ("💨 ERROU!" if dano is None else f"🎯 {dano:.1f} de dano.")
+    if tipo == "habilidade":
+        _, ator, alvo, habilidade, dano, efeito = evento; texto = f"✨ {ator.nome} usa {habilidade['nome']} em {alvo.nome}"
+        if dano > 0: texto += f": {dano:.1f} de dano mágico"
+        if efeito in ('veneno', 'congelado'): texto += f" ({efeito.upper()})"
+        elif efeito == 'buff_forca': texto += " (FORÇA aumentada)"
+        return texto + "."
+    return f"☠️ {evento[1].nome} caiu!"
+
+
+# --- MONTAGEM DOS LADOS ---
+def copiar_heroi(heroi):
+    """Cópia independente do herói (a batalha de grupo não mexe no herói salvo)."""
+    return persistencia.heroi_de_dict(rpg_dinamico, persistencia.heroi_para_dict(heroi))
+
+def montar_grupo(nomes):
+    """Cópias dos heróis de HEROIS_CRIADOS com Vida/Caos cheios e sem buffs."""
+    grupo = [copiar_heroi(rpg_dinamico.HEROIS_CRIADOS[nome]) for nome in nomes]
+    for heroi in grupo: simulador.restaurar(heroi)
+    return grupo
+
+def montar_horda(tamanho, nivel, rng=random):
+    """`tamanho` inimigos comuns de INIMIGO_TEMPLATES escalados para `nivel`, numerados para o log."""
+    return [rpg_dinamico.Personagem(f"{nome} #{i}", *atributos, nivel=nivel) for i, (nome, _, atributos) in enumerate(rng.choices(rpg_dinamico.linhas_de_inimigos(nivel), k=tamanho), 1)]
+
+
+# --- SIMULAÇÃO SEM INTERFACE ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m rpg_dinamico simulate-grupo", description="Simula batalhas de grupo contra hordas e relata vitórias e custo por turno.")
+    parser.add_argument("--herois", help="nomes de HEROIS_CRIADOS separados por vírgula (senão, heróis simulados de --classes)")
+    parser.add_argument("--classes", default=",".join(rpg_dinamico.CLASSES_BASE), help="um herói simulado por classe listada (repita para mais)")
+    parser.add_argument("--nivel", type=int, default=1, help="nível dos heróis simulados e da horda")
+    parser.add_argument("--inimigos", type=int, default=10, help="tamanho da horda")
+    parser.add_argument("--batalhas", type=int, default=20)
+    parser.add_argument("--politica", choices=sorted(simulador.POLITICAS), default="gulosa")
+    parser.add_argument("--alvo-herois", choices=sorted(ALVOS), default="mais_fraco")
+    parser.add_argument("--alvo-inimigos", choices=sorted(ALVOS), default="aleatorio")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--log", action="store_true", help="escreve o log da primeira batalha")
+    args = parser.parse_args(argv)
+
+    if args.herois: modelos = montar_grupo([nome.strip() for nome in args.herois.split(",")])
+    else:
+        classes = [c.strip() for c in args.classes.split(",")]
+        for classe in classes:
+            if classe not in rpg_dinamico.CLASSES_BASE: parser.error(f"classe desconhecida: {classe}")
+        modelos = [simulador.criar_heroi_simulado(classe, args.nivel) for classe in classes]
+        for i, heroi in enumerate(modelos, 1): heroi.nome = f"{heroi.nome} #{i}"
+
+    rng = random.Random(args.seed); vitorias = 0; turnos = 0; decorrido = 0.0
+    for b in range(args.batalhas):
+        batalha = BatalhaEmGrupo([copiar_heroi(h) for h in modelos], montar_horda(args.inimigos, args.nivel, rng), args.politica, args.alvo_herois, args.alvo_inimigos, rng)
+        inicio = time.perf_counter()
+        if args.log and b == 0:
+            while (eventos := batalha.jogar_turno()) is not None:
+                for evento in eventos: print(descrever(evento))
+            resultado = batalha.resultado() or "derrota"
+        else: resultado = batalha.rodar()
+        decorrido += time.perf_counter() - inicio; vitorias += resultado == "vitoria"; turnos += batalha.turnos
+
+    print(f"{len(modelos)} herói(s) contra {args.inimigos} inimigo(s) de nível {args.nivel}: {vitorias}/{args.batalhas} vitórias ({vitorias / args.batalhas:.1%}), {turnos / args.batalhas:.0f} turnos por batalha")
+    print(f"{turnos} turnos em {decorrido:.2f}s ({decorrido / max(turnos, 1) * 1e6:.1f} µs/turno)")
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de arranque da interface Tk: tempo de import e tempo até o primeiro quadro da tela inicial.
+
+Cada rodada é um processo Python novo (nada em cache no interpretador), que repete o que rpg_gui_tkinter.main() faz
+e marca: fim dos imports, Tk() criado, RPGApp montado e primeiro <Expose> da janela principal (o primeiro quadro
+pintado). O processo pai mede do lançamento até o primeiro quadro, incluindo a partida do interpretador. O banco de
+heróis e o diário apontam para um diretório temporário, então o save do jogador não influencia nem é tocado.
+
+Precisa de um servidor X. Sem $DISPLAY, sobe um Xvfb próprio (tem que estar no PATH) e o derruba no fim, o que deixa
+a medição reproduzível em servidores e CI. Para comparar com outra versão, rode o mesmo comando num checkout dela.
+
+Uso: python benchmarks/arranque.py [--rodadas 20] [--json arranque.json]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Roda no processo filho. time.time() (relógio de parede) é o único relógio comparável entre pai e filho.
+FILHO = r"""
+import json, sys, time
+marcas = {"inicio": time.time()}
+import tkinter as tk
+import rpg_gui_tkinter
+marcas["importado"] = time.time()
+root = tk.Tk()
+marcas["tk"] = time.time()
+def primeiro_quadro(event):
+    if "quadro" in marcas: return
+    marcas["quadro"] = time.time()
+    root.after_idle(root.destroy)
+root.bind("<Expose>", primeiro_quadro)
+app = rpg_gui_tkinter.RPGApp(root)
+root.after_idle(rpg_gui_tkinter.patch_rpg_dinamico)
+marcas["montado"] = time.time()
+root.after(10000, root.destroy)  # Sem Expose em 10 s (janela não mapeada): desiste em vez de travar
+root.mainloop()
+print(json.dumps(marcas))
+"""
+
+
+def iniciar_xvfb():
+    """Sobe um Xvfb num display livre; devolve (processo, ':n')."""
+    if shutil.which("Xvfb") is None: sys.exit("sem $DISPLAY e sem Xvfb no PATH: instale o Xvfb ou rode com um servidor X")
+    for numero in range(99, 140):
+        if os.path.exists(f"/tmp/.X{numero}-lock"): continue
+        processo = subprocess.Popen(["Xvfb", f":{numero}", "-screen", "0", "1920x1080x24", "-nolisten", "tcp"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for _ in range(100):  # Até 5 s para o socket aparecer
+            if os.path.exists(f"/tmp/.X11-unix/X{numero}"): return processo, f":{numero}"
+            if processo.poll() is not None: break
+            time.sleep(0.05)
+        processo.kill()
+    sys.exit("não foi possível iniciar o Xvfb")
+
+def rodada(ambiente):
+    """Uma partida da interface em processo novo: milissegundos de cada fase."""
+    lancado = time.time()
+    saida = subprocess.run([sys.executable, "-c", FILHO], cwd=RAIZ, env=ambiente, capture_output=True, text=True, timeout=60)
+    if saida.returncode != 0: sys.exit(f"a interface falhou ao iniciar:\n{saida.stderr}")
+    marcas = json.loads(saida.stdout.strip().splitlines()[-1])
+    if "quadro" not in marcas: sys.exit("a janela principal nunca foi pintada (o servidor X está aceitando janelas?)")
+    ms = lambda de, ate: (marcas[ate] - de) * 1000
+    return {"interpretador": ms(lancado, "inicio"), "imports": ms(marcas["inicio"], "importado"), "tk": ms(marcas["importado"], "tk"),
+            "tela_inicial": ms(marcas["tk"], "montado"), "ate_primeiro_quadro": ms(marcas["inicio"], "quadro"), "total": ms(lancado, "quadro")}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tempo de import e até o primeiro quadro da interface Tk, em processos novos.")
+    parser.add_argument("--rodadas", type=int, default=20)
+    parser.add_argument("--aquecimento", type=int, default=2, help="rodadas descartadas (cache de disco e de fontes)")
+    parser.add_argument("--json", help="caminho do relatório JSON com todas as rodadas")
+    args = parser.parse_args(argv)
+
+    temporario = tempfile.mkdtemp(prefix="rpg-arranque-")
+    ambiente = dict(os.environ, RPG_BANCO_HEROIS=os.path.join(temporario, "herois.db"), RPG_DIARIO=os.path.join(temporario, "masmorra.diario"))
+    xvfb = None
+    if not ambiente.get("DISPLAY"):
+        xvfb, ambiente["DISPLAY"] = iniciar_xvfb()
+    try:
+        for _ in range(args.aquecimento): rodada(ambiente)
+        rodadas = [rodada(ambiente) for _ in range(args.rodadas)]
+    finally:
+        if xvfb is not None: xvfb.terminate(); xvfb.wait()
+        shutil.rmtree(temporario, ignore_errors=True)
+
+    print(f"{args.rodadas} arranques em processos novos (display {ambiente['DISPLAY']})\n")
+    print(f"{'Fase':<28}{'mediana':>10}{'p90':>10}")
+    nomes = {"interpretador": "Partida do interpretador", "imports": "Imports", "tk": "Tk()", "tela_inicial": "RPGApp (tela inicial)",
+             "ate_primeiro_quadro": "Do 1º import ao 1º quadro", "total": "Lançamento ao 1º quadro"}
+    for chave, nome in nomes.items():
+        valores = sorted(r[chave] for r in rodadas)
+        print(f"{nome:<28}{statistics.median(valores):>8.1f}ms{valores[int(len(valores) * 0.9) - 1]:>8.1f}ms")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo: json.dump({"rodadas": rodadas, "parametros": vars(args)}, arquivo, indent=2)
+
+
+if __name__ == "__main__":
+    main()
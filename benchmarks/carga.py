@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Gerador de carga do servidor de masmorras (servidor.py): abre sessões ociosas e sessões ativas jogadas por robôs, e
+mede a latência de cada ida e volta (da resposta enviada até a próxima pergunta chegar).
+
+As ociosas conectam, leem o menu e ficam paradas até o fim. As ativas jogam pelo protocolo JSON, guiadas pelo campo
+"tela" de cada pergunta: criam um herói, põem todos os pontos em Força, entram na masmorra, atacam (às vezes com
+habilidade) e pegam a primeira recompensa. Quando a sessão acaba (game over), o robô sai e abre outra.
+
+Sem --porta, sobe um servidor próprio (`python -m rpg_dinamico serve --porta 0`, com banco de heróis temporário) num
+processo separado e relata também a memória dele antes e depois das sessões ociosas. Cliente e servidor dividem a
+máquina: num núcleo só, a latência medida inclui o tempo do próprio gerador.
+
+Uso: python benchmarks/carga.py --ociosas 2000 --ativas 200 --duracao 20 [--json carga.json]
+     python benchmarks/carga.py --porta 7878 ...   (contra um servidor já rodando)
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+import servidor
+
+LIMITE_DA_LINHA = 1 << 20
+CONEXOES_SIMULTANEAS = 256  # Conexões sendo abertas ao mesmo tempo (não estoura o backlog do servidor)
+
+
+# --- ROBÔ ---
+def responder(mensagem, numero, rng):
+    """Resposta do robô `numero` para uma pergunta do servidor."""
+    tela = mensagem.get("tela"); texto = mensagem.get("texto", [])
+    if tela == "menu":
+        if "3. Entrar na Masmorra" in texto: return "3"
+        return "4" if any(linha.startswith("Herói Ativo") for linha in texto) else "1"  # Sem vidas: sai
+    if tela == "nome": return f"Robo{numero}"
+    if tela == "classe": return str(rng.randint(1, 3))
+    if tela == "atributo": return "1"
+    if tela == "pontos": return re.search(r"\d+", mensagem["pergunta"]).group()
+    if tela == "ataque": return rng.choice("12")
+    if tela == "equipar": return "S"
+    if tela == "enter": return ""
+    return "1"  # acao, habilidade, pocao, recompensa, heroi
+
+class Estatisticas:
+    def __init__(self): self.latencias = []; self.sessoes = 0; self.concluidas = 0; self.erros = 0
+
+
+async def ler(leitor):
+    linha = await leitor.readline()
+    if not linha: raise EOFError
+    return json.loads(linha)
+
+async def ociosa(host, porta, vagas, abertas, estatisticas):
+    async with vagas:
+        try:
+            leitor, escritor = await asyncio.open_connection(host, porta, limit=LIMITE_DA_LINHA); await ler(leitor)
+        except (OSError, EOFError) as erro:
+            estatisticas.erros += 1; print(f"sessão ociosa falhou: {erro!r}", file=sys.stderr); return
+    abertas.append(escritor)
+
+async def ativa(numero, host, porta, fim, estatisticas):
+    rng = random.Random(numero); relogio = time.perf_counter
+    while time.monotonic() < fim:
+        try: leitor, escritor = await asyncio.open_connection(host, porta, limit=LIMITE_DA_LINHA)
+        except OSError: estatisticas.erros += 1; await asyncio.sleep(0.1); continue
+        estatisticas.sessoes += 1
+        try:
+            mensagem = await ler(leitor)
+            while not mensagem.get("fim") and time.monotonic() < fim:
+                resposta = json.dumps({"resposta": responder(mensagem, numero, rng)}).encode() + b"\n"
+                inicio = relogio(); escritor.write(resposta); mensagem = await ler(leitor)
+                estatisticas.latencias.append(relogio() - inicio)
+            estatisticas.concluidas += bool(mensagem.get("fim"))
+        except (OSError, EOFError, ValueError): estatisticas.erros += 1
+        finally: escritor.close()
+
+
+# --- SERVIDOR PRÓPRIO ---
+def subir_servidor(temporario):
+    ambiente = dict(os.environ, RPG_BANCO_HEROIS=os.path.join(temporario, "herois.db"), RPG_DIARIO=os.path.join(temporario, "masmorra.diario"))
+    processo = subprocess.Popen([sys.executable, "-m", "rpg_dinamico", "serve", "--porta", "0"], cwd=RAIZ, env=ambiente, stdout=subprocess.PIPE, text=True)
+    primeira = processo.stdout.readline()
+    achado = re.search(r":(\d+) ", primeira)
+    if not achado: processo.kill(); raise SystemExit(f"o servidor não subiu: {primeira!r}")
+    return processo, int(achado.group(1))
+
+def memoria_kib(pid):
+    """VmRSS do processo, em KiB (só Linux; None fora dele)."""
+    try:
+        with open(f"/proc/{pid}/status") as arquivo:
+            for linha in arquivo:
+                if linha.startswith("VmRSS:"): return int(linha.split()[1])
+    except OSError: return None
+
+
+async def carga(args, porta, pid):
+    relatorio = {"ociosas_pedidas": args.ociosas, "ativas": args.ativas, "duracao_s": args.duracao}
+    estatisticas = Estatisticas(); abertas = []; vagas = asyncio.Semaphore(CONEXOES_SIMULTANEAS)
+    memoria_antes = memoria_kib(pid) if pid else None
+    inicio = time.perf_counter()
+    await asyncio.gather(*(ociosa(args.host, porta, vagas, abertas, estatisticas) for _ in range(args.ociosas)))
+    relatorio["ociosas_abertas"] = len(abertas); relatorio["abertura_ociosas_s"] = time.perf_counter() - inicio
+    if pid:
+        memoria_depois = memoria_kib(pid)
+        if memoria_antes and memoria_depois: relatorio["servidor_rss_kib"] = memoria_depois; relatorio["kib_por_sessao_ociosa"] = (memoria_depois - memoria_antes) / max(len(abertas), 1)
+
+    fim = time.monotonic() + args.duracao; inicio = time.perf_counter()
+    await asyncio.gather(*(ativa(i, args.host, porta, fim, estatisticas) for i in range(args.ativas)))
+    decorrido = time.perf_counter() - inicio
+    for escritor in abertas: escritor.close()
+
+    latencias = sorted(estatisticas.latencias); quantil = lambda q: latencias[min(len(latencias) - 1, int(q * len(latencias)))] * 1000 if latencias else 0.0
+    relatorio.update(respostas=len(latencias), respostas_por_s=len(latencias) / decorrido, sessoes_ativas_abertas=estatisticas.sessoes,
+                     sessoes_concluidas=estatisticas.concluidas, erros=estatisticas.erros, latencia_p50_ms=quantil(0.5), latencia_p95_ms=quantil(0.95), latencia_p99_ms=quantil(0.99))
+    return relatorio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gerador de carga do servidor de masmorras: sessões ociosas e sessões jogadas por robôs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, help="servidor já rodando; sem ela, sobe um próprio")
+    parser.add_argument("--ociosas", type=int, default=1000, help="sessões que só conectam e ficam paradas")
+    parser.add_argument("--ativas", type=int, default=100, help="sessões jogadas por robôs ao mesmo tempo")
+    parser.add_argument("--duracao", type=float, default=10.0, help="segundos de jogo das sessões ativas")
+    parser.add_argument("--json", help="caminho do relatório JSON")
+    args = parser.parse_args(argv)
+    servidor.elevar_limite_de_arquivos()
+
+    processo = None; temporario = None; porta = args.porta
+    if porta is None: temporario = tempfile.mkdtemp(prefix="rpg-carga-"); processo, porta = subir_servidor(temporario)
+    try: relatorio = asyncio.run(carga(args, porta, processo.pid if processo else None))
+    finally:
+        if processo is not None: processo.terminate(); processo.wait()
+        if temporario: shutil.rmtree(temporario, ignore_errors=True)
+
+    print(f"Ociosas: {relatorio['ociosas_abertas']}/{args.ociosas} abertas em {relatorio['abertura_ociosas_s']:.2f}s", end="")
+    print(f", servidor com {relatorio['servidor_rss_kib'] / 1024:.1f} MiB ({relatorio['kib_por_sessao_ociosa']:.1f} KiB por sessão ociosa)" if "servidor_rss_kib" in relatorio else "")
+    print(f"Ativas: {args.ativas} robôs por {args.duracao:g}s, {relatorio['sessoes_ativas_abertas']} sessões ({relatorio['sessoes_concluidas']} até o game over), {relatorio['erros']} erro(s)")
+    print(f"{relatorio['respostas']} respostas ({relatorio['respostas_por_s']:,.0f}/s); latência p50 {relatorio['latencia_p50_ms']:.2f} ms, p95 {relatorio['latencia_p95_ms']:.2f} ms, p99 {relatorio['latencia_p99_ms']:.2f} ms")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo: json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
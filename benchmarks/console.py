@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de redesenho do console: custo de cada tela de batalha com o os.system('clear') original e com a tela.Tela
+(duplo buffer, só as linhas que mudaram).
+
+Cada quadro é a tela de iniciar_batalha (cabeçalho, status do herói e do inimigo, menu de ação) com a vida dos dois
+caindo um pouco a cada turno, apresentada como antes de uma entrada(). "Antes" chama limpar_tela() com o
+os.system do código original e escreve a tela inteira; "depois" usa a Tela como o main() do console. As duas escrevem
+num pseudo-terminal de 40x120 cuja outra ponta é drenada numa thread, então o clear vê um terminal de verdade e os
+bytes contados são os que chegariam ao emulador de terminal.
+
+Só Linux/macOS (precisa de pty). Uso: python benchmarks/console.py [--quadros 300] [--json console.json]
+"""
+import argparse
+import contextlib
+import fcntl
+import json
+import os
+import pty
+import statistics
+import struct
+import sys
+import tempfile
+import termios
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_TEMP = tempfile.mkdtemp(prefix="rpg-console-")
+os.environ.setdefault("RPG_BANCO_HEROIS", os.path.join(_TEMP, "herois.db"))  # Não mexe no save nem no diário do jogador
+os.environ.setdefault("RPG_DIARIO", os.path.join(_TEMP, "masmorra.diario"))
+import rpg_dinamico
+import tela
+
+LINHAS, COLUNAS = 40, 120
+
+
+def limpar_tela_antiga(): os.system('cls' if os.name == 'nt' else 'clear')
+
+def quadro_de_batalha(jogador, inimigo):
+    rpg_dinamico.limpar_tela(); print(f"--- BATALHA: {jogador.nome} vs {inimigo.nome} ---"); jogador.mostrar_status(); print("\nVS\n"); inimigo.mostrar_status()
+    print("\nSua vez de agir!"); sys.stdout.write("1. Atacar\n2. Usar Poção\n3. Tentar Fugir\n4. Ver Status Detalhado\n> "); sys.stdout.flush()
+
+
+class Terminal:
+    """Pseudo-terminal LINHASxCOLUNAS com a saída do processo apontada para ele e a outra ponta drenada (contando bytes)."""
+    def __init__(self):
+        self.mestre, self.escravo = pty.openpty(); self.bytes = 0
+        fcntl.ioctl(self.escravo, termios.TIOCSWINSZ, struct.pack("HHHH", LINHAS, COLUNAS, 0, 0))
+        self._leitor = threading.Thread(target=self._drenar, daemon=True); self._leitor.start()
+
+    def _drenar(self):
+        while True:
+            try: dados = os.read(self.mestre, 65536)
+            except OSError: return
+            if not dados: return
+            self.bytes += len(dados)
+
+    @contextlib.contextmanager
+    def como_stdout(self):
+        """fd 1 e sys.stdout no pty (o clear do os.system herda o fd 1)."""
+        sys.stdout.flush(); salvo = os.dup(1); os.dup2(self.escravo, 1)
+        anterior = sys.stdout; sys.stdout = open(1, "w", encoding="utf-8", closefd=False)
+        try: yield
+        finally: sys.stdout.flush(); sys.stdout = anterior; os.dup2(salvo, 1); os.close(salvo)
+
+    def esperar_drenar(self):
+        """Espera a thread ler tudo o que já foi escrito (o pty não tem como dizer quanto falta)."""
+        anterior = -1
+        while anterior != self.bytes: anterior = self.bytes; time.sleep(0.05)
+
+    def fechar(self): os.close(self.escravo); os.close(self.mestre)
+
+
+def medir(nome, quadros, preparar, terminal):
+    jogador = rpg_dinamico.Heroi("Ana", "Feral", **rpg_dinamico.CLASSES_BASE["Feral"]["stats"])
+    inimigo = rpg_dinamico.Personagem("Goblin", 40, 8, 4, 6, 10, 1)
+    tempos = []
+    with terminal.como_stdout():
+        restaurar = preparar()
+        try:
+            for turno in range(quadros):
+                jogador.vida_atual = jogador.vida_maxima - turno % 40; inimigo.vida_atual = inimigo.vida_maxima - turno % 35
+                inicio = time.perf_counter(); quadro_de_batalha(jogador, inimigo); tempos.append(time.perf_counter() - inicio)
+        finally: restaurar()
+    terminal.esperar_drenar()
+    return {"nome": nome, "quadros": quadros, "media_us": statistics.fmean(tempos) * 1e6, "mediana_us": statistics.median(tempos) * 1e6}
+
+def antes():
+    original = rpg_dinamico.limpar_tela; rpg_dinamico.limpar_tela = limpar_tela_antiga
+    def restaurar(): rpg_dinamico.limpar_tela = original
+    return restaurar
+
+def depois():
+    rpg_dinamico.definir_tela(tela.Tela())
+    return lambda: rpg_dinamico.definir_tela(None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Custo por tela de batalha: os.system('clear') contra a tela.Tela em duplo buffer.")
+    parser.add_argument("--quadros", type=int, default=300)
+    parser.add_argument("--json", help="caminho do relatório JSON")
+    args = parser.parse_args(argv)
+    if os.name == 'nt': sys.exit("o benchmark precisa de um pseudo-terminal (Linux/macOS)")
+
+    relatorio = []
+    for nome, preparar in (("antes  (os.system clear)", antes), ("depois (tela.Tela)", depois)):
+        terminal = Terminal(); bytes_antes = terminal.bytes
+        resultado = medir(nome, args.quadros, preparar, terminal)
+        resultado["bytes_por_quadro"] = (terminal.bytes - bytes_antes) / args.quadros; terminal.fechar()
+        relatorio.append(resultado)
+        print(f"{nome}: {resultado['media_us']:9.1f} µs por quadro (mediana {resultado['mediana_us']:.1f}), {resultado['bytes_por_quadro']:.0f} bytes por quadro")
+    print(f"Aceleração: {relatorio[0]['media_us'] / relatorio[1]['media_us']:.1f}x; bytes: {relatorio[1]['bytes_por_quadro'] / relatorio[0]['bytes_por_quadro']:.0%} do original")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo: json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de carga de pacotes de conteúdo: um conjunto grande de mods gerado (classes com habilidades, inimigos,
+chefes, nomes de equipamento), em JSON e em TOML, carregado sem cache (interpretar + validar + mesclar + escalar
+todos os níveis) e do cache compilado (hash dos pacotes + pickle), e aplicado com definir_conteudo.
+
+Uso: python benchmarks/conteudo.py [--classes 500] [--inimigos 5000] [--chefes 500] [--repeticoes 5] [--json conteudo.json]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import conteudo
+import rpg_dinamico
+
+
+def gerar_pacote(classes, inimigos, chefes):
+    """Pacote sintético com o formato dos pacotes de verdade (nomes únicos, números variados)."""
+    pacote = {"classes": {}, "inimigos": {}, "chefes": {}, "equipamentos": {}}
+    for i in range(classes):
+        pacote["classes"][f"Classe {i}"] = {
+            "desc": f"Classe gerada número {i}.",
+            "stats": {"vida_base": 40 + i % 30, "forca_base": 10 + i % 10, "defesa_base": 5 + i % 8, "agilidade_base": 5 + i % 12, "caos_base": 30 + i % 40},
+            "habilidades": [
+                {"nome": f"Golpe {i}", "custo": 4 + i % 6, "multiplicador": 1.1 + i % 5 / 10, "desc": "Dano mágico."},
+                {"nome": f"Veneno {i}", "custo": 8, "multiplicador": 0.5, "desc": "Dano e veneno.", "efeito": {"tipo": "veneno", "dano": 3 + i % 4, "duracao": 3, "chance": 0.9}},
+                {"nome": f"Fúria {i}", "custo": 6, "multiplicador": 0, "desc": "Mais força.", "efeito": {"tipo": "buff_forca", "valor": 4, "duracao": 2, "chance": 1.0}},
+            ],
+        }
+    for i in range(inimigos): pacote["inimigos"][f"Inimigo {i}"] = {"vida": 20 + i % 50, "forca": 5 + i % 12, "defesa": 2 + i % 9, "agilidade": 1 + i % 15, "caos": i % 30}
+    for i in range(chefes): pacote["chefes"][f"Chefe {i}"] = {"vida": 150 + i % 100, "forca": 20 + i % 15, "defesa": 10 + i % 15, "agilidade": 5 + i % 15, "caos": 20 + i % 80}
+    for slot in rpg_dinamico.SLOTS_EQUIPAMENTO: pacote["equipamentos"][slot] = {"prefixos": [f"{slot.capitalize()} {i}" for i in range(20)], "sufixos": [f"do Mod {i}" for i in range(20)]}
+    return pacote
+
+def _toml_valor(valor):
+    if isinstance(valor, str): return json.dumps(valor, ensure_ascii=False)  # String básica do TOML = string JSON (para estes textos)
+    if isinstance(valor, dict): return "{ " + ", ".join(f"{chave} = {_toml_valor(v)}" for chave, v in valor.items()) + " }"
+    if isinstance(valor, list): return "[" + ", ".join(_toml_valor(v) for v in valor) + "]"
+    return repr(valor)
+
+def para_toml(pacote):
+    """O mesmo pacote em TOML: uma tabela por entrada, habilidades como array de tabelas."""
+    linhas = []
+    for secao, entradas in pacote.items():
+        for nome, dados in entradas.items():
+            linhas.append(f"[{secao}.{_toml_valor(nome)}]")
+            for chave, valor in dados.items():
+                if chave != "habilidades": linhas.append(f"{chave} = {_toml_valor(valor)}")
+            for hab in dados.get("habilidades", []):
+                linhas.append(f"[[{secao}.{_toml_valor(nome)}.habilidades]]"); linhas.extend(f"{chave} = {_toml_valor(valor)}" for chave, valor in hab.items())
+    return "\n".join(linhas) + "\n"
+
+
+def melhor_ms(funcao, repeticoes):
+    melhor = float('inf')
+    for _ in range(repeticoes): inicio = time.perf_counter(); funcao(); melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor * 1000
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Carga de pacotes de conteúdo grandes: sem cache contra o cache compilado.")
+    parser.add_argument("--classes", type=int, default=500)
+    parser.add_argument("--inimigos", type=int, default=5000)
+    parser.add_argument("--chefes", type=int, default=500)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--json", help="caminho do relatório JSON")
+    args = parser.parse_args(argv)
+
+    temporario = tempfile.mkdtemp(prefix="rpg-conteudo-"); relatorio = []
+    try:
+        pacote = gerar_pacote(args.classes, args.inimigos, args.chefes)
+        caminhos = {"json": os.path.join(temporario, "mod.json"), "toml": os.path.join(temporario, "mod.toml")}
+        with open(caminhos["json"], "w", encoding="utf-8") as arquivo: json.dump(pacote, arquivo, ensure_ascii=False)
+        if conteudo.tomllib is not None:
+            with open(caminhos["toml"], "w", encoding="utf-8") as arquivo: arquivo.write(para_toml(pacote))
+        else: del caminhos["toml"]
+        print(f"Pacote: {args.classes} classes, {args.inimigos} inimigos, {args.chefes} chefes")
+        for formato, caminho in caminhos.items():
+            cache = os.path.join(temporario, f"{formato}.cache"); compilado = conteudo.carregar([caminho], rpg_dinamico, cache)
+            resultado = {"formato": formato, "bytes_pacote": os.path.getsize(caminho), "bytes_cache": os.path.getsize(cache),
+                         "sem_cache_ms": melhor_ms(lambda: conteudo.carregar([caminho], rpg_dinamico), args.repeticoes),
+                         "com_cache_ms": melhor_ms(lambda: conteudo.carregar([caminho], rpg_dinamico, cache), args.repeticoes),
+                         "aplicar_ms": melhor_ms(lambda: rpg_dinamico.definir_conteudo(compilado), args.repeticoes)}
+            relatorio.append(resultado)
+            print(f"{formato:4s} ({resultado['bytes_pacote'] / 1024:,.0f} KiB): sem cache {resultado['sem_cache_ms']:8.1f} ms, com cache {resultado['com_cache_ms']:6.1f} ms "
+                  f"({resultado['sem_cache_ms'] / resultado['com_cache_ms']:.1f}x), definir_conteudo {resultado['aplicar_ms']:.1f} ms")
+    finally:
+        rpg_dinamico.definir_conteudo(None); shutil.rmtree(temporario, ignore_errors=True)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo: json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
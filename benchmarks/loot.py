@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de geração de recompensas: custo por item e distribuição dos itens gerados.
+
+"Antes" é uma cópia fiel do gerador original (probabilidade acumulada a cada sorteio de raridade, listas de chaves
+remontadas a cada chamada e um `if` por slot); "depois" usa a tabela de loot compilada de rpg_dinamico, item a item
+(gerar_recompensa_aleatoria) e em lote (gerar_recompensas). As frequências por raridade/slot e as médias de bônus
+devem bater entre os dois, dentro do ruído de amostragem.
+
+Uso: python benchmarks/loot.py [--itens 50000] [--lote 3] [--seed 0]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import rpg_dinamico
+from rpg_dinamico import RARIDADES, NOMES_EQUIPAMENTOS, POCA_TEMPLATES, Equipamento, Pocao
+
+
+# --- GERADOR ORIGINAL (referência "antes") ---
+def obter_raridade_antiga(rng):
+    roll = rng.random(); cumulative_chance = 0
+    for raridade in ["comum", "incomum", "raro"]:
+        data = RARIDADES[raridade]
+        cumulative_chance += data['chance'];
+        if roll < cumulative_chance: return raridade
+    return "comum"
+
+def gerar_recompensa_antiga(nivel_batalha, rng):
+    if rng.random() > 0.4:
+        raridade = obter_raridade_antiga(rng); multiplicador = RARIDADES[raridade]['multiplicador']; slot = rng.choice(list(NOMES_EQUIPAMENTOS.keys())); bonus_base = nivel_batalha * 2
+        prefixo = rng.choice(NOMES_EQUIPAMENTOS[slot]["prefixos"]); sufixo = rng.choice(NOMES_EQUIPAMENTOS[slot]["sufixos"]); nome_item = f"{prefixo} {sufixo}"
+        bonus_caos = (rng.uniform(bonus_base, bonus_base + 2) * multiplicador) if rng.random() < 0.2 else 0
+        if slot == "arma": return Equipamento(nome_item, slot, raridade, bonus_forca=rng.uniform(bonus_base, bonus_base + 3) * multiplicador, bonus_caos=bonus_caos)
+        if slot == "capacete": return Equipamento(nome_item, slot, raridade, bonus_defesa=rng.uniform(bonus_base, bonus_base + 2) * multiplicador, bonus_agilidade=-rng.uniform(1, 2), bonus_caos=bonus_caos)
+        if slot == "armadura": return Equipamento(nome_item, slot, raridade, bonus_defesa=rng.uniform(bonus_base, bonus_base + 5) * multiplicador, bonus_vida=bonus_base*2*multiplicador)
+        if slot == "calca": return Equipamento(nome_item, slot, raridade, bonus_agilidade=rng.uniform(bonus_base, bonus_base + 2) * multiplicador, bonus_vida=bonus_base*multiplicador)
+        if slot == "bota": return Equipamento(nome_item, slot, raridade, bonus_agilidade=rng.uniform(bonus_base, bonus_base + 2) * multiplicador, bonus_defesa=-rng.uniform(1, 2))
+    else:
+        raridade = obter_raridade_antiga(rng); multiplicador = RARIDADES[raridade]['multiplicador']; tipo_pocao = rng.choice(list(POCA_TEMPLATES.keys())); template = POCA_TEMPLATES[tipo_pocao]
+        valor_final = template.get('valor', 0) * multiplicador
+        return Pocao(template['nome'], raridade, tipo_pocao, valor_final, template.get('duracao', 0))
+
+
+def cronometrar(gerar, itens, repeticoes=5):
+    """Nanossegundos por item (melhor de `repeticoes` rodadas, para filtrar o ruído da máquina); `gerar()` devolve a lista de uma chamada."""
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        gerados = 0; inicio = time.perf_counter()
+        while gerados < itens: gerados += len(gerar())
+        melhor = min(melhor, (time.perf_counter() - inicio) / gerados * 1e9)
+    return melhor
+
+def amostrar(gerar, itens):
+    gerados = []
+    while len(gerados) < itens: gerados.extend(gerar())
+    return gerados
+
+def perfil(itens):
+    """Frequência de cada (tipo, raridade), (slot ou poção) e média dos bônus de cada slot."""
+    contagem = {}; somas = {}
+    for item in itens:
+        chave = getattr(item, "slot", None) or item.tipo
+        for c in (item.raridade, chave): contagem[c] = contagem.get(c, 0) + 1
+        if isinstance(item, Equipamento):
+            soma = somas.setdefault(chave, [0.0] * 5)
+            for i, valor in enumerate((item.bonus_vida, item.bonus_forca, item.bonus_defesa, item.bonus_agilidade, item.bonus_caos)): soma[i] += valor
+    medias = {slot: [v / contagem[slot] for v in soma] for slot, soma in somas.items()}
+    return {c: n / len(itens) for c, n in contagem.items()}, medias
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Custo por item de recompensa, gerador original vs. tabelas de loot compiladas.")
+    parser.add_argument("--itens", type=int, default=50000, help="itens por rodada cronometrada e por amostra de distribuição")
+    parser.add_argument("--lote", type=int, default=3, help="itens por chamada de gerar_recompensas")
+    parser.add_argument("--nivel", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    rng = random.Random(args.seed)
+
+    antiga = lambda: [gerar_recompensa_antiga(args.nivel, rng)]
+    lote = lambda: rpg_dinamico.gerar_recompensas(args.nivel, args.lote, rng)
+    t_antes = cronometrar(antiga, args.itens)
+    t_depois = cronometrar(lambda: [rpg_dinamico.gerar_recompensa_aleatoria(args.nivel, rng)], args.itens)
+    t_lote = cronometrar(lote, args.itens)
+    print(f"Antes  (laço acumulado + ifs por slot): {t_antes:7.0f} ns/item")
+    print(f"Depois (tabela compilada, 1 por vez):   {t_depois:7.0f} ns/item  ({t_antes / t_depois:.2f}x)")
+    print(f"Depois (gerar_recompensas, lote de {args.lote}): {t_lote:7.0f} ns/item  ({t_antes / t_lote:.2f}x)")
+
+    freq_antes, medias_antes = perfil(amostrar(antiga, args.itens)); freq_depois, medias_depois = perfil(amostrar(lote, args.itens))
+    print(f"\n{'':<16}{'antes':>8}{'depois':>8}")
+    for chave in sorted(freq_antes): print(f"{chave:<16}{freq_antes[chave]:>8.3f}{freq_depois.get(chave, 0.0):>8.3f}")
+    print("\nMédia de bônus por slot (vida, força, defesa, agilidade, caos):")
+    for slot in sorted(medias_antes):
+        print(f"{slot:<10} antes  " + " ".join(f"{v:6.2f}" for v in medias_antes[slot]))
+        print(f"{'':<10} depois " + " ".join(f"{v:6.2f}" for v in medias_depois[slot]))
+
+
+if __name__ == "__main__":
+    main()
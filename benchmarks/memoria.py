@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de memória: bytes por herói totalmente equipado (5 itens, 5 poções, 2 buffs e 1 efeito ativos).
+
+"Antes" usa uma cópia fiel do layout original (classes com __dict__, equipamentos em dict de 5 chaves e
+buffs/efeitos em dict de dicts); "depois" usa as classes atuais de rpg_dinamico (com __slots__ e tabelas de índice fixo).
+
+Uso: python benchmarks/memoria.py [--herois 5000]
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import rpg_dinamico
+
+
+# --- LAYOUT ORIGINAL (referência "antes") ---
+class ItemAntigo:
+    def __init__(self, nome, raridade): self.nome = nome; self.raridade = raridade
+
+class EquipamentoAntigo(ItemAntigo):
+    def __init__(self, nome, slot, raridade, bonus_vida=0.0, bonus_forca=0.0, bonus_defesa=0.0, bonus_agilidade=0.0, bonus_caos=0.0):
+        super().__init__(nome, raridade); self.slot = slot; self.bonus_vida = float(bonus_vida); self.bonus_forca = float(bonus_forca); self.bonus_defesa = float(bonus_defesa); self.bonus_agilidade = float(bonus_agilidade); self.bonus_caos = float(bonus_caos)
+
+class PocaoAntiga(ItemAntigo):
+    def __init__(self, nome, raridade, tipo, valor, duracao=0): super().__init__(nome, raridade); self.tipo = tipo; self.valor = float(valor); self.duracao = duracao
+
+class HeroiAntigo:
+    def __init__(self, nome, classe, vida_base, forca_base, defesa_base, agilidade_base, caos_base):
+        self.nome = nome; self.vida_base = float(vida_base); self.forca_base = float(forca_base); self.defesa_base = float(defesa_base); self.agilidade_base = float(agilidade_base); self.caos_base = float(caos_base); self.nivel = 1
+        self.vida_atual = self.vida_base; self.caos_atual = self.caos_base
+        self.equipamentos = {"arma": None, "capacete": None, "armadura": None, "calca": None, "bota": None}
+        self.buffs_ativos = {}; self.efeitos_status = {}
+        self.classe = classe; self.xp_atual = 0; self.xp_proximo_nivel = 10; self.inventario_pocoes = []; self.proficiencia = 0.0
+
+
+def montar(classe_heroi, classe_equip, classe_pocao, i):
+    heroi = classe_heroi(f"Herói {i}", "Feral", **rpg_dinamico.CLASSES_BASE["Feral"]["stats"])
+    for slot in rpg_dinamico.NOMES_EQUIPAMENTOS:
+        heroi.equipamentos[slot] = classe_equip(f"Item {i}", slot, "raro", bonus_vida=i % 7, bonus_forca=1.5, bonus_defesa=2.5, bonus_agilidade=-1.0, bonus_caos=0.5)
+    heroi.inventario_pocoes.extend(classe_pocao("Poção de Cura", "comum", "cura", 50.0 + i % 3) for _ in range(rpg_dinamico.MAX_POCOES_INVENTARIO))
+    heroi.buffs_ativos['forca'] = {'valor': 5.0, 'turnos_restantes': 3}
+    heroi.buffs_ativos['defesa'] = {'valor': 5.0, 'turnos_restantes': 2}
+    heroi.efeitos_status['veneno'] = {'turnos_restantes': 2, 'dano': 5}
+    return heroi
+
+
+def medir(classe_heroi, classe_equip, classe_pocao, quantidade):
+    """Bytes alocados por herói (média sobre `quantidade` heróis vivos ao mesmo tempo)."""
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    herois = [montar(classe_heroi, classe_equip, classe_pocao, i) for i in range(quantidade)]
+    depois = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del herois
+    return (depois - antes) / quantidade
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bytes por herói totalmente equipado, layout original vs. compacto.")
+    parser.add_argument("--herois", type=int, default=5000)
+    args = parser.parse_args(argv)
+    antes = medir(HeroiAntigo, EquipamentoAntigo, PocaoAntiga, args.herois)
+    depois = medir(rpg_dinamico.Heroi, rpg_dinamico.Equipamento, rpg_dinamico.Pocao, args.herois)
+    print(f"Antes  (__dict__ + dicts aninhados): {antes:8.0f} bytes/herói")
+    print(f"Depois (__slots__ + tabelas fixas):  {depois:8.0f} bytes/herói")
+    print(f"Redução: {1 - depois / antes:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+Suíte de micro-benchmarks dos caminhos quentes de combate, geração e texto, com relatório JSON e comparação.
+
+Cada caso roda em laço até cada rodada durar pelo menos --tempo-minimo segundos e guarda o ns/op de cada rodada. O
+relatório traz o mínimo (a métrica estável, usada na comparação) e a mediana. Os métodos de combate são medidos na
+versão do console (print e RITMO.pausar; a saída vai para /dev/null e o ritmo fica instantâneo) e na versão da GUI
+(rpg_gui_tkinter.patch_rpg_dinamico, com um logger que só guarda a mensagem). O patch é aplicado só durante os
+casos "gui" e as classes voltam ao estado do console depois. Sem tkinter, os casos "gui" são pulados.
+
+Uso:
+    python benchmarks/micro.py --json antes.json              # roda tudo e grava
+    python benchmarks/micro.py --filtro combate --rodadas 9   # só os casos cujo nome contém "combate"
+    python benchmarks/micro.py --json depois.json --base antes.json --limite 10
+    python benchmarks/micro.py --comparar antes.json depois.json --limite 10
+A comparação marca como regressão todo caso que ficou mais de --limite % mais lento e sai com código 1 se houver algum.
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import eventos
+import rpg_dinamico
+from rpg_dinamico import CLASSES_BASE, SLOTS_EQUIPAMENTO, Equipamento, Heroi, Pocao
+
+try:
+    import rpg_gui_tkinter
+except ImportError:  # Python sem tkinter: só os casos do console
+    rpg_gui_tkinter = None
+
+# Métodos que patch_rpg_dinamico troca, para devolvê-los depois dos casos da GUI.
+ALVOS_DO_PATCH = [(rpg_dinamico.Item, "nome_formatado"), (Equipamento, "__str__"), (Heroi, "get_status_texto_com_itens"),
+                  (rpg_dinamico.Personagem, "processar_efeitos_e_buffs"), (rpg_dinamico.Personagem, "atacar"), (Heroi, "usar_habilidade"),
+                  (Heroi, "usar_pocao"), (Heroi, "ganhar_xp"), (Heroi, "equipar_item")]
+_AUSENTE = object()
+
+
+# --- CENÁRIO ---
+def heroi_equipado(classe=None, nivel=3):
+    """Herói de nível `nivel` com os cinco slots ocupados e o inventário de poções cheio (o mesmo em toda rodada)."""
+    classe = classe or next(iter(CLASSES_BASE))
+    heroi = Heroi("Bench", classe, **CLASSES_BASE[classe]["stats"]); heroi.nivel = nivel
+    for i, slot in enumerate(SLOTS_EQUIPAMENTO):
+        heroi.equipamentos[slot] = Equipamento(f"Item {slot}", slot, ("comum", "incomum", "raro")[i % 3], bonus_vida=4, bonus_forca=3, bonus_defesa=2, bonus_agilidade=-1, bonus_caos=1.5)
+    heroi.inventario_pocoes = [Pocao("Poção de Cura", "comum", "cura", 20) for _ in range(rpg_dinamico.MAX_POCOES_INVENTARIO)]
+    return heroi
+
+def alvo_inesgotavel(nivel=3):
+    """Inimigo que não morre durante o laço (a vida nunca chega a zero)."""
+    inimigo = rpg_dinamico.gerar_inimigo(nivel, random.Random(0)); inimigo.vida_atual = 1e12
+    return inimigo
+
+def habilidade_com_efeito(classe):
+    habilidades = CLASSES_BASE[classe]["habilidades"]
+    return next((h for h in habilidades if h.get("efeito")), habilidades[0])
+
+
+# --- CASOS ---
+# Cada caso é uma fábrica: monta o cenário (fora da medição) e devolve a função medida, sem argumentos.
+CASOS = {}
+
+def caso(nome, gui=False):
+    def registrar(fabrica): CASOS[nome] = (fabrica, gui); return fabrica
+    return registrar
+
+def _registrar_combate(variante, gui):
+    logger = [].append if gui else None  # A GUI manda cada linha ao LogDeBatalha; aqui só guardamos a referência
+
+    @caso(f"combate.atacar.{variante}", gui)
+    def _():
+        heroi = heroi_equipado(); alvo = alvo_inesgotavel()
+        return (lambda: heroi.atacar(alvo, logger)) if gui else (lambda: heroi.atacar(alvo))
+
+    @caso(f"combate.usar_habilidade.{variante}", gui)
+    def _():
+        heroi = heroi_equipado(); alvo = alvo_inesgotavel(); habilidade = habilidade_com_efeito(heroi.classe)
+        def passo():
+            heroi.caos_atual = 1e9  # Nunca falta caos
+            if gui: heroi.usar_habilidade(alvo, habilidade, logger)
+            else: heroi.usar_habilidade(alvo, habilidade)
+        return passo
+
+    @caso(f"combate.processar_efeitos.{variante}", gui)
+    def _():
+        # Inclui recolocar 2 buffs e 1 veneno a cada chamada, para que sempre haja contadores andando e expirando.
+        heroi = heroi_equipado(); heroi.vida_atual = 1e12
+        def passo():
+            heroi.buffs_ativos["forca"] = {"valor": 5.0, "turnos_restantes": 1}; heroi.buffs_ativos["defesa"] = {"valor": 3.0, "turnos_restantes": 2}
+            heroi.efeitos_status["veneno"] = {"dano": 2.0, "turnos_restantes": 1}
+            if gui: heroi.processar_efeitos_e_buffs(logger)
+            else: heroi.processar_efeitos_e_buffs()
+        return passo
+
+_registrar_combate("console", False)
+_registrar_combate("gui", True)
+
+def _registrar_grupo(inimigos):
+    @caso(f"grupo.jogar_turno.{inimigos}_inimigos")
+    def _():
+        # Ninguém cai (vida inesgotável dos dois lados): mede só o custo por turno, que deve crescer com log(n).
+        import batalha_em_grupo
+        rng = random.Random(0); herois = [heroi_equipado(classe) for classe in CLASSES_BASE]; horda = batalha_em_grupo.montar_horda(inimigos, 3, rng)
+        for combatente in herois + horda: combatente.vida_atual = 1e12
+        return batalha_em_grupo.BatalhaEmGrupo(herois, horda, rng=rng).jogar_turno
+
+for _inimigos in (10, 1000): _registrar_grupo(_inimigos)
+
+@caso("eventos.arquivo_jsonl.emitir")
+def _():
+    # Custo por evento do destino JSON Lines, com a codificação e a escrita do lote amortizadas (três floats, como num acerto).
+    destino = eventos.ArquivoDeEventos(os.devnull, tamanho_maximo=None); evento = eventos.Acerto("Heroi", "Goblin", 42, 12.700000000000001, 87.29999999999998)
+    return lambda: destino.emitir(evento)
+
+@caso("geracao.gerar_inimigo")
+def _(): rng = random.Random(0); return lambda: rpg_dinamico.gerar_inimigo(3, rng)
+
+@caso("geracao.gerar_chefe")
+def _(): rng = random.Random(0); return lambda: rpg_dinamico.gerar_chefe(3, rng)
+
+@caso("geracao.gerar_recompensa_aleatoria")
+def _(): rng = random.Random(0); return lambda: rpg_dinamico.gerar_recompensa_aleatoria(3, rng)
+
+@caso("geracao.obter_raridade")
+def _(): rng = random.Random(0); return lambda: rpg_dinamico.obter_raridade(rng)
+
+@caso("atributos.derivados_em_cache")
+def _():
+    heroi = heroi_equipado(); heroi.buffs_ativos["forca"] = {"valor": 5.0, "turnos_restantes": 3}
+    return lambda: (heroi.forca, heroi.defesa, heroi.agilidade, heroi.vida_maxima, heroi.caos_maximo)
+
+@caso("atributos.derivados_recalculados")
+def _():
+    heroi = heroi_equipado(); heroi.buffs_ativos["forca"] = {"valor": 5.0, "turnos_restantes": 3}
+    def passo():
+        heroi.invalidar_atributos()  # Como depois de uma troca de equipamento ou de uma subida de nível
+        return heroi.forca, heroi.defesa, heroi.agilidade, heroi.vida_maxima, heroi.caos_maximo
+    return passo
+
+@caso("texto.equipamento_str.console")
+def _(): item = heroi_equipado().equipamentos["arma"]; return lambda: str(item)
+
+@caso("texto.equipamento_str.gui", gui=True)
+def _(): item = heroi_equipado().equipamentos["arma"]; return lambda: str(item)
+
+@caso("texto.mostrar_status.console")
+def _(): heroi = heroi_equipado(); return heroi.mostrar_status
+
+@caso("texto.status_com_itens.gui", gui=True)
+def _():
+    heroi = heroi_equipado(); heroi.buffs_ativos["forca"] = {"valor": 5.0, "turnos_restantes": 3}; heroi.efeitos_status["veneno"] = {"dano": 2.0, "turnos_restantes": 2}
+    return heroi.get_status_texto_com_itens
+
+
+# --- MEDIÇÃO ---
+@contextlib.contextmanager
+def versao_gui():
+    """Aplica o patch da GUI e, na saída, devolve às classes os métodos do console."""
+    originais = [(classe, nome, classe.__dict__.get(nome, _AUSENTE)) for classe, nome in ALVOS_DO_PATCH]
+    rpg_gui_tkinter.patch_rpg_dinamico()
+    try: yield
+    finally:
+        for classe, nome, funcao in originais:
+            if funcao is _AUSENTE: delattr(classe, nome)
+            else: setattr(classe, nome, funcao)
+
+def medir(passo, rodadas, tempo_minimo):
+    """ns/op de cada rodada. O número de chamadas por rodada cresce até uma rodada durar `tempo_minimo` segundos."""
+    n = 1
+    while True:
+        inicio = time.perf_counter()
+        for _ in range(n): passo()
+        decorrido = time.perf_counter() - inicio
+        if decorrido >= tempo_minimo: break
+        n *= 2 if decorrido < tempo_minimo / 4 else 1 + int(tempo_minimo / max(decorrido, 1e-9))
+    tempos = []
+    for _ in range(rodadas):
+        inicio = time.perf_counter()
+        for _ in range(n): passo()
+        tempos.append((time.perf_counter() - inicio) / n * 1e9)
+    return n, tempos
+
+def rodar(nomes, rodadas, tempo_minimo):
+    resultados = {}
+    rpg_dinamico.definir_ritmo(rpg_dinamico.Ritmo("instantaneo"))
+    with open(os.devnull, "w", encoding="utf-8") as nulo:
+        for gui in (False, True):
+            selecionados = [nome for nome in nomes if CASOS[nome][1] == gui]
+            if not selecionados: continue
+            if gui and rpg_gui_tkinter is None:
+                print(f"tkinter indisponível: pulando {len(selecionados)} caso(s) da GUI", file=sys.stderr); continue
+            with versao_gui() if gui else contextlib.nullcontext(), contextlib.redirect_stdout(nulo):
+                for nome in selecionados:
+                    random.seed(0); passo = CASOS[nome][0]()
+                    n, tempos = medir(passo, rodadas, tempo_minimo)
+                    resultados[nome] = {"ns_min": min(tempos), "ns_mediana": sorted(tempos)[len(tempos) // 2], "chamadas_por_rodada": n, "rodadas": tempos}
+                    print(f"{nome:<42}{min(tempos):>10.0f} ns/op", file=sys.__stdout__)
+    return resultados
+
+def metadados(args):
+    try: commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True).stdout.strip() or None
+    except OSError: commit = None
+    return {"data": datetime.datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(), "plataforma": platform.platform(),
+            "processador": platform.processor() or platform.machine(), "commit": commit, "rodadas": args.rodadas, "tempo_minimo": args.tempo_minimo}
+
+
+# --- COMPARAÇÃO ---
+def comparar(base, atual, limite, metrica="ns_min"):
+    """Imprime a variação de cada caso presente nos dois relatórios; devolve os nomes que pioraram mais de `limite` %."""
+    regressoes = []
+    print(f"\n{'Caso':<42}{'base':>10}{'atual':>10}{'variação':>10}")
+    for nome in sorted(set(base["casos"]) & set(atual["casos"])):
+        antes = base["casos"][nome][metrica]; depois = atual["casos"][nome][metrica]; variacao = (depois - antes) / antes * 100
+        marca = ""
+        if variacao > limite: marca = "  REGRESSÃO"; regressoes.append(nome)
+        elif variacao < -limite: marca = "  melhora"
+        print(f"{nome:<42}{antes:>10.0f}{depois:>10.0f}{variacao:>+9.1f}%{marca}")
+    for nome in sorted(set(base["casos"]) ^ set(atual["casos"])):
+        print(f"{nome:<42}{'(só em ' + ('base' if nome in base['casos'] else 'atual') + ')':>30}")
+    print(f"\n{len(regressoes)} regressão(ões) acima de {limite:g}% ({metrica})")
+    return regressoes
+
+def carregar(caminho):
+    with open(caminho, encoding="utf-8") as arquivo: return json.load(arquivo)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de combate, geração e texto, com relatório JSON e comparação entre rodadas.")
+    parser.add_argument("--json", help="grava o relatório desta rodada neste caminho")
+    parser.add_argument("--filtro", default="", help="só os casos cujo nome contém este texto")
+    parser.add_argument("--rodadas", type=int, default=7)
+    parser.add_argument("--tempo-minimo", type=float, default=0.05, help="segundos mínimos por rodada")
+    parser.add_argument("--base", help="relatório anterior para comparar com esta rodada")
+    parser.add_argument("--comparar", nargs=2, metavar=("BASE", "ATUAL"), help="só compara dois relatórios já gravados")
+    parser.add_argument("--limite", type=float, default=10.0, help="piora percentual que conta como regressão")
+    parser.add_argument("--metrica", choices=("ns_min", "ns_mediana"), default="ns_min")
+    parser.add_argument("--listar", action="store_true", help="lista os casos e sai")
+    args = parser.parse_args(argv)
+
+    if args.listar:
+        for nome, (_, gui) in CASOS.items(): print(nome)
+        return 0
+    if args.comparar:
+        return 1 if comparar(carregar(args.comparar[0]), carregar(args.comparar[1]), args.limite, args.metrica) else 0
+
+    nomes = [nome for nome in CASOS if args.filtro in nome]
+    if not nomes: parser.error(f"nenhum caso contém {args.filtro!r} (veja --listar)")
+    relatorio = {"meta": metadados(args), "casos": rodar(nomes, args.rodadas, args.tempo_minimo)}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo: json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+    if args.base:
+        return 1 if comparar(carregar(args.base), relatorio, args.limite, args.metrica) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de troca de telas da interface Tk: latência de voltar ao menu e de abrir a janela de batalha do andar seguinte.
+
+"Antes" é uma cópia do código original (limpar_tela destruindo e recriando todo o menu; a janela de batalha destruída
+no fim de cada andar e recriada do zero no próximo); "depois" usa o GerenciadorDeTelas (menu construído uma vez e só
+atualizado) e a janela de batalha persistente (escondida entre andares e reiniciada no lugar). Cada troca é medida até
+o Tk terminar de processar geometria e desenho (update), que é o que o jogador espera.
+
+Precisa de um display X. Sem tela (servidor, CI): xvfb-run python benchmarks/telas.py
+Uso: python benchmarks/telas.py [--trocas 200]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_TEMP = tempfile.mkdtemp(prefix="rpg-telas-")
+os.environ.setdefault("RPG_BANCO_HEROIS", os.path.join(_TEMP, "herois.db"))  # Não mexe no save nem no diário do jogador
+os.environ.setdefault("RPG_DIARIO", os.path.join(_TEMP, "masmorra.diario"))
+import tkinter as tk
+import rpg_dinamico
+import rpg_gui_tkinter
+from rpg_gui_tkinter import PainelDeStatus
+
+
+# --- CÓDIGO ORIGINAL (referência "antes") ---
+def tela_inicial_antiga(app, container):
+    for widget in container.winfo_children(): widget.destroy()
+    tk.Label(container, text="RPG de Masmorra", font=app.title_font, fg=app.colors["fg_title"], bg=app.colors["bg_main"]).pack(pady=(0, 20))
+    vidas_texto = "❤️ " * app.vidas_heroi if app.vidas_heroi > 0 else "☠️ GAME OVER"
+    tk.Label(container, text=f"Vidas restantes: {vidas_texto}", font=app.stats_font, fg=app.colors["fg_normal"], bg=app.colors["bg_main"]).pack(pady=5)
+    hero_info = f"Herói Ativo: {app.heroi_selecionado.nome} - {app.heroi_selecionado.classe} (Nível {app.heroi_selecionado.nivel})"
+    tk.Label(container, text=hero_info, font=app.label_font, fg=app.colors["fg_success"], bg=app.colors["bg_main"]).pack(pady=10)
+    button_frame = tk.Frame(container, bg=app.colors["bg_main"]); button_frame.pack(pady=10)
+    btn_style = {'font': app.button_font, 'bg': app.colors["bg_frame"], 'fg': app.colors["fg_normal"], 'activebackground': app.colors["accent"], 'activeforeground': 'white', 'width': 25, 'pady': 5, 'relief': 'flat', 'bd': 0}
+    tk.Button(button_frame, text="Criar Novo Herói", command=app.tela_criar_heroi, **btn_style).pack(pady=5)
+    tk.Button(button_frame, text="Selecionar Herói", command=app.tela_selecionar_heroi, **btn_style).pack(pady=5)
+    tk.Button(button_frame, text="Entrar na Masmorra", command=app.iniciar_masmorra, **dict(btn_style, fg=app.colors["fg_success"])).pack(pady=5)
+    tk.Button(button_frame, text="Sair do Jogo", command=app.master.quit, **dict(btn_style, fg=app.colors["fg_danger"])).pack(pady=10)
+
+def janela_batalha_antiga(app, janela):
+    if janela is not None and janela.winfo_exists(): janela.destroy()
+    janela = tk.Toplevel(app.master)
+    janela.title(f"Batalha contra {app.inimigo_atual.nome}"); janela.geometry("1280x720"); janela.configure(bg=app.colors["bg_main"])
+    stats_frame = tk.Frame(janela, bg=app.colors["bg_main"]); stats_frame.pack(side='top', fill='x', padx=10, pady=10)
+    botoes = tk.Frame(janela, bg=app.colors["bg_main"]); botoes.pack(side='bottom', fill='x', pady=20)
+    log_frame = tk.Frame(janela, bg=app.colors["bg_widget"]); log_frame.pack(side='top', expand=True, fill='both', padx=10, pady=10)
+    heroi_frame = tk.Frame(stats_frame, bg=app.colors["bg_frame"], bd=2, relief='sunken'); heroi_frame.pack(side='left', expand=True, fill='x', padx=(0, 5))
+    inimigo_frame = tk.Frame(stats_frame, bg=app.colors["bg_frame"], bd=2, relief='sunken'); inimigo_frame.pack(side='right', expand=True, fill='x', padx=(5, 0))
+    tk.Label(heroi_frame, text=f"Herói: {app.heroi_selecionado.nome} ({app.heroi_selecionado.classe})", font=app.button_font, fg=app.colors["fg_title"], bg=app.colors["bg_frame"]).pack()
+    stats_style = {'font': app.stats_font, 'fg': app.colors["fg_normal"], 'bg': app.colors["bg_frame"]}
+    PainelDeStatus(app.master, heroi_frame, app.heroi_selecionado, PainelDeStatus.CAMPOS_HEROI, **stats_style)
+    tk.Label(inimigo_frame, text=f"Inimigo: {app.inimigo_atual.nome}", font=app.button_font, fg=app.colors["fg_danger"], bg=app.colors["bg_frame"]).pack()
+    PainelDeStatus(app.master, inimigo_frame, app.inimigo_atual, PainelDeStatus.CAMPOS_INIMIGO, **stats_style)
+    log = tk.Text(log_frame, height=10, bg=app.colors["bg_widget"], fg=app.colors["fg_normal"], font=app.stats_font, wrap='word', bd=0); log.pack(side='left', expand=True, fill='both', padx=5, pady=5)
+    scrollbar = tk.Scrollbar(log_frame, command=log.yview, relief='flat', bg=app.colors["bg_widget"]); scrollbar.pack(side='right', fill='y')
+    log.config(yscrollcommand=scrollbar.set, state='disabled')
+    botoes.columnconfigure((0, 1, 2, 3, 4, 5), weight=1)
+    btn_style = {'font': app.button_font, 'bg': app.colors["bg_frame"], 'fg': app.colors["fg_normal"], 'width': 12, 'pady': 5, 'relief': 'flat'}
+    for coluna, texto in enumerate(("Ataque Básico", "Habilidades", "Poção", "Fugir", "Status", "Histórico")):
+        tk.Button(botoes, text=texto, **btn_style).grid(row=0, column=coluna, padx=5)
+    janela.transient(app.master); janela.grab_set()
+    return janela
+
+
+def medir(troca, root, trocas):
+    """Milissegundos de cada troca, incluindo o trabalho de layout/desenho que ela deixou pendente no Tk."""
+    tempos = []
+    for _ in range(trocas):
+        inicio = time.perf_counter(); troca(); root.update()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos
+
+def resumo(nome, tempos, base=None):
+    tempos = sorted(tempos); mediana = statistics.median(tempos); p95 = tempos[int(len(tempos) * 0.95) - 1]
+    ganho = f"  ({base / mediana:5.1f}x)" if base else ""
+    print(f"{nome:<44}{mediana:8.2f} ms mediana {p95:8.2f} ms p95{ganho}")
+    return mediana
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latência de troca de tela: destruir e recriar vs. telas em cache e janela de batalha persistente.")
+    parser.add_argument("--trocas", type=int, default=200, help="trocas medidas por cenário")
+    args = parser.parse_args(argv)
+    try: root = tk.Tk()
+    except tk.TclError as erro: parser.error(f"sem display X ({erro}); rode com xvfb-run")
+
+    app = rpg_gui_tkinter.RPGApp(root)
+    classe = next(iter(rpg_dinamico.CLASSES_BASE))
+    app.heroi_selecionado = rpg_dinamico.Heroi("Bench", classe, **rpg_dinamico.CLASSES_BASE[classe]["stats"])
+    app.inimigo_atual = rpg_dinamico.gerar_inimigo(1)
+    root.update()
+
+    print(f"{args.trocas} trocas por cenário\n")
+    antigo = tk.Frame(app.main_frame, bg=app.colors["bg_main"]); antigo.grid(row=0, column=0, sticky='nsew')  # Mesma célula do menu em cache
+    menu_antes = resumo("Menu, antes  (limpar_tela + recriar)", medir(lambda: tela_inicial_antiga(app, antigo), root, args.trocas))
+    antigo.destroy()
+    resumo("Menu, depois (tela em cache + atualizar)", medir(lambda: app.telas.mostrar("menu"), root, args.trocas), menu_antes)
+
+    janela = [None]
+    def batalha_antiga():
+        app.inimigo_atual = rpg_dinamico.gerar_inimigo(1); janela[0] = janela_batalha_antiga(app, janela[0])
+    batalha_antes = resumo("Batalha, antes  (destruir + recriar Toplevel)", medir(batalha_antiga, root, args.trocas))
+    janela[0].destroy()
+    def batalha_nova():
+        app.esconder_batalha(); app.inimigo_atual = rpg_dinamico.gerar_inimigo(1); app.preparar_janela_batalha()
+    resumo("Batalha, depois (esconder + reiniciar)", medir(batalha_nova, root, args.trocas), batalha_antes)
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Pacotes de conteúdo: classes, inimigos, chefes, nomes de equipamento, poções e raridades em arquivos JSON ou TOML,
+validados e compilados uma vez e guardados num cache em disco invalidado pelo hash dos pacotes.
+
+Um pacote tem as seções (todas opcionais) classes, inimigos, chefes, equipamentos, pocoes e raridades, no mesmo
+formato de CLASSES_BASE, INIMIGO_TEMPLATES, CHEFE_TEMPLATES, NOMES_EQUIPAMENTOS, POCA_TEMPLATES e RARIDADES (em TOML,
+uma habilidade sem efeito simplesmente não tem a chave "efeito"). Os pacotes são aplicados em ordem sobre o conteúdo
+embutido: cada entrada substitui ou acrescenta a de mesmo nome.
+
+A forma compilada (ConteudoCompilado) já traz as habilidades indexadas por classe e as linhas escaladas de inimigos
+e chefes de todos os níveis. Ela é gravada com pickle sob uma chave sha256 do formato, do código de rpg_dinamico
+(conteúdo embutido e fórmulas de escala) e dos bytes de cada pacote; se a chave bate, carregar() só lê os pacotes
+para conferir o hash e desempacota o cache, sem interpretar, validar nem escalar nada.
+
+Uso: RPG_CONTEUDO=mod.json python rpg_dinamico.py   (vários pacotes separados por os.pathsep)
+     python -m rpg_dinamico conteudo mod.json extra.toml   (valida, compila e mostra o tempo com e sem cache)
+     python -m rpg_dinamico conteudo --exportar base.json   (o conteúdo embutido como pacote, ponto de partida)
+"""
+import argparse
+import contextlib
+import gc
+import hashlib
+import json
+import os
+import pickle
+import time
+from collections import namedtuple
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11: só pacotes JSON
+    tomllib = None
+
+FORMATO = 1  # Versão da forma compilada: mudar invalida todos os caches
+SECOES = ("classes", "inimigos", "chefes", "equipamentos", "pocoes", "raridades")
+ATRIBUTOS_DE_CLASSE = ("vida_base", "forca_base", "defesa_base", "agilidade_base", "caos_base")
+ATRIBUTOS_DE_INIMIGO = ("vida", "forca", "defesa", "agilidade", "caos")
+# Efeitos que resolver_habilidade sabe aplicar -> campos obrigatórios além de duracao e chance.
+EFEITOS_DE_HABILIDADE = {"veneno": (), "congelado": (), "buff_forca": ("valor",)}
+TIPOS_DE_POCAO = ("cura", "restaura_caos", "buff_forca", "buff_defesa", "buff_agilidade")
+
+
+class ConteudoCompilado(namedtuple("ConteudoCompilado", "chave secoes habilidades linhas_inimigos linhas_chefes")):
+    """
+    Conteúdo pronto para rpg_dinamico.definir_conteudo: `secoes` (seção -> tabela mesclada, no formato das globais),
+    `habilidades` (classe -> tupla de habilidades) e `linhas_inimigos`/`linhas_chefes` (nível -> linhas escaladas,
+    como linhas_de_inimigos/linhas_de_chefes devolvem) para todos os níveis de XP_PARA_NIVEL.
+    """
+    __slots__ = ()
+
+
+# --- VALIDAÇÃO ---
+def _numero(valor, onde, minimo=0):
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)) or not valor >= minimo: raise ValueError(f"{onde}: esperava um número >= {minimo}, veio {valor!r}")
+    return valor
+
+def _texto(valor, onde):
+    if not isinstance(valor, str) or not valor: raise ValueError(f"{onde}: esperava um texto, veio {valor!r}")
+    return valor
+
+def _registro(dados, onde, obrigatorios, opcionais=()):
+    """Confere que `dados` é um objeto com todos os campos obrigatórios e nenhum desconhecido (pega erro de digitação)."""
+    if not isinstance(dados, dict): raise ValueError(f"{onde}: esperava um objeto, veio {type(dados).__name__}")
+    faltando = [campo for campo in obrigatorios if campo not in dados]
+    if faltando: raise ValueError(f"{onde}: faltam os campos {', '.join(faltando)}")
+    sobrando = [campo for campo in dados if campo not in obrigatorios and campo not in opcionais]
+    if sobrando: raise ValueError(f"{onde}: campos desconhecidos {', '.join(sobrando)}")
+    return dados
+
+def _duracao(valor, onde):
+    if not isinstance(valor, int) or isinstance(valor, bool) or valor < 1: raise ValueError(f"{onde}: esperava um inteiro >= 1, veio {valor!r}")
+    return valor
+
+def _efeito(dados, onde):
+    if dados is None: return None
+    tipo = dados.get("tipo") if isinstance(dados, dict) else None
+    if tipo not in EFEITOS_DE_HABILIDADE: raise ValueError(f"{onde}.tipo: efeito desconhecido {tipo!r} (conhecidos: {', '.join(EFEITOS_DE_HABILIDADE)})")
+    _registro(dados, onde, ("tipo", "duracao", "chance") + EFEITOS_DE_HABILIDADE[tipo], ("valor", "dano")); _duracao(dados["duracao"], f"{onde}.duracao")
+    if _numero(dados["chance"], f"{onde}.chance") > 1: raise ValueError(f"{onde}.chance: esperava uma probabilidade entre 0 e 1, veio {dados['chance']!r}")
+    for campo in ("valor", "dano"):
+        if campo in dados: _numero(dados[campo], f"{onde}.{campo}")
+    return dict(dados)
+
+def _classe(nome, dados, onde):
+    _registro(dados, onde, ("desc", "stats", "habilidades")); _texto(dados["desc"], f"{onde}.desc")
+    stats = _registro(dados["stats"], f"{onde}.stats", ATRIBUTOS_DE_CLASSE)
+    for atributo in ATRIBUTOS_DE_CLASSE: _numero(stats[atributo], f"{onde}.stats.{atributo}", 1 if atributo == "vida_base" else 0)
+    if not isinstance(dados["habilidades"], list): raise ValueError(f"{onde}.habilidades: esperava uma lista")
+    habilidades = []
+    for i, hab in enumerate(dados["habilidades"]):
+        local = f"{onde}.habilidades[{i}]"; _registro(hab, local, ("nome", "custo", "multiplicador", "desc"), ("efeito",))
+        _texto(hab["nome"], f"{local}.nome"); _numero(hab["custo"], f"{local}.custo"); _numero(hab["multiplicador"], f"{local}.multiplicador"); _texto(hab["desc"], f"{local}.desc")
+        habilidades.append({"nome": hab["nome"], "custo": hab["custo"], "multiplicador": hab["multiplicador"], "efeito": _efeito(hab.get("efeito"), f"{local}.efeito"), "desc": hab["desc"]})
+    return {"desc": dados["desc"], "stats": dict(stats), "habilidades": habilidades}
+
+def _inimigo(nome, dados, onde):
+    _registro(dados, onde, ATRIBUTOS_DE_INIMIGO)
+    for atributo in ATRIBUTOS_DE_INIMIGO: _numero(dados[atributo], f"{onde}.{atributo}", 1 if atributo == "vida" else 0)
+    return dict(dados)
+
+def _nomes_de_equipamento(slot, dados, onde):
+    _registro(dados, onde, ("prefixos", "sufixos"))
+    for campo in ("prefixos", "sufixos"):
+        if not isinstance(dados[campo], list) or not dados[campo]: raise ValueError(f"{onde}.{campo}: esperava uma lista não vazia")
+        for i, nome in enumerate(dados[campo]): _texto(nome, f"{onde}.{campo}[{i}]")
+    return {"prefixos": list(dados["prefixos"]), "sufixos": list(dados["sufixos"])}
+
+def _pocao(tipo, dados, onde):
+    buff = tipo.startswith("buff_")  # Buffs duram; cura e caos são instantâneas
+    _registro(dados, onde, ("nome", "valor", "duracao") if buff else ("nome", "valor"), () if buff else ("duracao",))
+    _texto(dados["nome"], f"{onde}.nome"); _numero(dados["valor"], f"{onde}.valor")
+    if "duracao" in dados: _duracao(dados["duracao"], f"{onde}.duracao")
+    return dict(dados)
+
+def _raridade(nome, dados, onde):
+    _registro(dados, onde, ("chance", "multiplicador"), ("cor",))
+    if _numero(dados["chance"], f"{onde}.chance") == 0: raise ValueError(f"{onde}.chance: uma raridade precisa de chance > 0")
+    _numero(dados["multiplicador"], f"{onde}.multiplicador")
+    return {"chance": dados["chance"], "multiplicador": dados["multiplicador"], "cor": dados.get("cor", "")}
+
+_VALIDADORES = {"classes": _classe, "inimigos": _inimigo, "chefes": _inimigo, "equipamentos": _nomes_de_equipamento, "pocoes": _pocao, "raridades": _raridade}
+
+def validar(pacote, origem, jogo):
+    """Entradas de um pacote já interpretado, conferidas e normalizadas: {seção: {nome: dados}}. ValueError diz onde está o erro."""
+    if not isinstance(pacote, dict): raise ValueError(f"{origem}: o pacote deve ser um objeto com as seções {', '.join(SECOES)}")
+    desconhecidas = [secao for secao in pacote if secao not in SECOES]
+    if desconhecidas: raise ValueError(f"{origem}: seções desconhecidas {', '.join(desconhecidas)} (conhecidas: {', '.join(SECOES)})")
+    validado = {}
+    for secao, entradas in pacote.items():
+        if not isinstance(entradas, dict): raise ValueError(f"{origem}: {secao}: esperava um objeto nome -> dados")
+        for nome in entradas:
+            if secao == "equipamentos" and nome not in jogo.SLOTS_EQUIPAMENTO: raise ValueError(f"{origem}: {secao}[{nome!r}]: slot desconhecido (slots: {', '.join(jogo.SLOTS_EQUIPAMENTO)})")
+            if secao == "pocoes" and nome not in TIPOS_DE_POCAO: raise ValueError(f"{origem}: {secao}[{nome!r}]: tipo de poção desconhecido (tipos: {', '.join(TIPOS_DE_POCAO)})")
+        validado[secao] = {nome: _VALIDADORES[secao](nome, dados, f"{origem}: {secao}[{nome!r}]") for nome, dados in entradas.items()}
+    return validado
+
+
+# --- COMPILAÇÃO E CACHE ---
+def interpretar(caminho, bruto):
+    """Bytes de um pacote -> objeto, pelo sufixo do arquivo (.toml é TOML; o resto, JSON)."""
+    try:
+        if caminho.lower().endswith(".toml"):
+            if tomllib is None: raise ValueError("pacotes TOML precisam do Python 3.11+ (tomllib)")
+            return tomllib.loads(bruto.decode("utf-8"))
+        return json.loads(bruto)
+    except (ValueError, UnicodeDecodeError) as erro: raise ValueError(f"{caminho}: {erro}") from erro
+
+def compilar(pacotes, jogo, chave=None):
+    """[(origem, pacote interpretado)] -> ConteudoCompilado: valida cada pacote, mescla sobre jogo.CONTEUDO_EMBUTIDO e indexa."""
+    secoes = pickle.loads(pickle.dumps(jogo.CONTEUDO_EMBUTIDO))  # Cópia profunda (mais rápida que copy.deepcopy)
+    for origem, pacote in pacotes:
+        for secao, entradas in validar(pacote, origem, jogo).items(): secoes[secao].update(entradas)
+    habilidades = {classe: tuple(dados["habilidades"]) for classe, dados in secoes["classes"].items()}
+    niveis = sorted(jogo.XP_PARA_NIVEL)  # Todos os níveis que um herói alcança
+    return ConteudoCompilado(chave, secoes, habilidades, {nivel: jogo.montar_linhas_de_inimigos(secoes["inimigos"], nivel) for nivel in niveis},
+                             {nivel: jogo.montar_linhas_de_chefes(secoes["chefes"], nivel) for nivel in niveis})
+
+def ler_pacotes(caminhos, jogo):
+    """(chave sha256, [bytes de cada pacote]). A chave cobre o formato, o código de `jogo` e cada pacote com seu sufixo, em ordem."""
+    resumo = hashlib.sha256(f"conteudo-{FORMATO}".encode())
+    with open(jogo.__file__, "rb") as arquivo: resumo.update(arquivo.read())
+    brutos = []
+    for caminho in caminhos:
+        with open(caminho, "rb") as arquivo: bruto = arquivo.read()
+        resumo.update(f"\0{os.path.splitext(caminho)[1].lower()}\0{len(bruto)}\0".encode()); resumo.update(bruto); brutos.append(bruto)
+    return resumo.hexdigest(), brutos
+
+def ler_cache(caminho_cache, chave):
+    """O ConteudoCompilado do cache se ele foi gravado com `chave`; senão (ou se não dá para ler), None."""
+    coletando = gc.isenabled()
+    try:
+        with open(caminho_cache, "rb") as arquivo:
+            if pickle.load(arquivo) != (FORMATO, chave): return None  # Cabeçalho separado: cache velho não é desempacotado
+            # Dezenas de milhares de tuplas sem ciclos: o coletor só atrasaria o desempacotamento (~1/3 do tempo).
+            gc.disable(); return ConteudoCompilado(*pickle.load(arquivo))
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError): return None
+    finally:
+        if coletando: gc.enable()
+
+def gravar_cache(caminho_cache, compilado):
+    """Grava o cache de uma vez (temporário + rename). Falhar aqui (diretório só de leitura) só custa recompilar da próxima vez."""
+    temporario = f"{caminho_cache}.{os.getpid()}.tmp"
+    with contextlib.suppress(OSError):
+        with open(temporario, "wb") as arquivo:
+            pickle.dump((FORMATO, compilado.chave), arquivo, pickle.HIGHEST_PROTOCOL); pickle.dump(tuple(compilado), arquivo, pickle.HIGHEST_PROTOCOL)
+        os.replace(temporario, caminho_cache)
+
+def carregar(caminhos, jogo, caminho_cache=None):
+    """ConteudoCompilado dos pacotes `caminhos` (em ordem): do cache se a chave bate; senão interpreta, valida, compila e regrava o cache."""
+    chave, brutos = ler_pacotes(caminhos, jogo)
+    compilado = ler_cache(caminho_cache, chave) if caminho_cache else None
+    if compilado is None:
+        compilado = compilar([(caminho, interpretar(caminho, bruto)) for caminho, bruto in zip(caminhos, brutos)], jogo, chave)
+        if caminho_cache: gravar_cache(caminho_cache, compilado)
+    return compilado
+
+
+# --- LINHA DE COMANDO ---
+def main(argv=None):
+    import rpg_dinamico  # Aqui, não no topo: rpg_dinamico importa este módulo
+    parser = argparse.ArgumentParser(prog="python -m rpg_dinamico conteudo", description="Valida e compila pacotes de conteúdo JSON/TOML.")
+    parser.add_argument("pacotes", nargs="*", help="pacotes aplicados em ordem sobre o conteúdo embutido")
+    parser.add_argument("--cache", default=rpg_dinamico.CAMINHO_CACHE_CONTEUDO, help="arquivo de cache (padrão: RPG_CACHE_CONTEUDO ou conteudo.cache)")
+    parser.add_argument("--exportar", help="grava o conteúdo embutido como pacote JSON neste caminho")
+    args = parser.parse_args(argv)
+    if args.exportar:
+        with open(args.exportar, "w", encoding="utf-8") as arquivo: json.dump(rpg_dinamico.CONTEUDO_EMBUTIDO, arquivo, ensure_ascii=False, indent=2)
+        print(f"Conteúdo embutido exportado para {args.exportar}")
+    if not args.pacotes:
+        if not args.exportar: parser.error("informe pacotes para compilar ou --exportar")
+        return
+
+    try:
+        inicio = time.perf_counter(); chave, brutos = ler_pacotes(args.pacotes, rpg_dinamico)
+        compilado = compilar([(caminho, interpretar(caminho, bruto)) for caminho, bruto in zip(args.pacotes, brutos)], rpg_dinamico, chave)
+        frio = time.perf_counter() - inicio
+    except (OSError, ValueError) as erro: raise SystemExit(f"pacote inválido: {erro}")
+    gravar_cache(args.cache, compilado)
+    print(", ".join(f"{len(compilado.secoes[secao])} {secao}" for secao in SECOES))
+    inicio = time.perf_counter(); chave, _ = ler_pacotes(args.pacotes, rpg_dinamico); em_cache = ler_cache(args.cache, chave); quente = time.perf_counter() - inicio
+    if em_cache is None: raise SystemExit(f"Compilado em {frio * 1000:.1f} ms, mas o cache {args.cache} não pôde ser gravado")
+    print(f"Compilado em {frio * 1000:.1f} ms; do cache ({args.cache}) em {quente * 1000:.1f} ms. Chave {chave[:16]}")
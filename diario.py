@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Diário de batalha: registro append-only (JSON Lines) dos eventos de uma masmorra em andamento, para recuperar
+a corrida depois de um travamento ou de uma janela fechada no meio da luta.
+
+Cada regra de rpg_dinamico (resolver_*) registra um evento compacto com o resultado absoluto (vida/caos depois da ação,
+rolagem do dado, efeito aplicado), então reaplicar um evento é só copiar valores. A cada SNAPSHOT_A_CADA eventos, e no
+início de cada andar, um snapshot com o estado completo é gravado; a recuperação parte do último snapshot e reaplica
+no máximo essa quantidade de eventos. As escritas ficam no buffer do arquivo e só são forçadas ao disco (fsync) nas
+fronteiras de andar e no fim da masmorra.
+"""
+import json
+import os
+
+import persistencia
+
+SNAPSHOT_A_CADA = 32
+_SEPARADORES = (',', ':')
+
+
+# --- SERIALIZAÇÃO DE INIMIGOS E ITENS ---
+def personagem_para_dict(personagem):
+    return {"nome": personagem.nome, "nivel": personagem.nivel, "chefe": type(personagem).__name__ == "Chefao",
+            "base": [personagem.vida_base, personagem.forca_base, personagem.defesa_base, personagem.agilidade_base, personagem.caos_base],
+            "vida_atual": personagem.vida_atual, "caos_atual": personagem.caos_atual,
+            "buffs": persistencia.pilhas_para_lista(personagem.buffs_ativos), "efeitos": persistencia.pilhas_para_lista(personagem.efeitos_status)}
+
+def personagem_de_dict(jogo, dados):
+    classe = jogo.Chefao if dados["chefe"] else jogo.Personagem
+    personagem = classe(dados["nome"], *dados["base"], nivel=dados["nivel"])
+    personagem.nome = dados["nome"]  # Chefao decora o nome no construtor; o salvo já vem decorado.
+    personagem.vida_atual = dados["vida_atual"]; personagem.caos_atual = dados["caos_atual"]
+    persistencia.carregar_pilhas(personagem.buffs_ativos, dados["buffs"]); persistencia.carregar_pilhas(personagem.efeitos_status, dados["efeitos"])
+    return personagem
+
+def item_para_dict(item):
+    if hasattr(item, "slot"):
+        return {"k": "equip", "nome": item.nome, "slot": item.slot, "raridade": item.raridade, "bonus_vida": item.bonus_vida, "bonus_forca": item.bonus_forca,
+                "bonus_defesa": item.bonus_defesa, "bonus_agilidade": item.bonus_agilidade, "bonus_caos": item.bonus_caos}
+    return {"k": "pocao", "nome": item.nome, "raridade": item.raridade, "tipo": item.tipo, "valor": item.valor, "duracao": item.duracao}
+
+def item_de_dict(jogo, dados):
+    dados = dict(dados); tipo = dados.pop("k")
+    if tipo == "equip": return jogo.Equipamento(dados.pop("nome"), dados.pop("slot"), dados.pop("raridade"), **dados)
+    return jogo.Pocao(dados["nome"], dados["raridade"], dados["tipo"], dados["valor"], dados["duracao"])
+
+
+class DiarioDeBatalha:
+    """Escreve o diário da masmorra em andamento. Ligado às regras com rpg_dinamico.definir_diario(diario)."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._arquivo = None
+        self._desde_snapshot = 0
+        self.heroi = None; self.inimigo = None
+        self.contexto = {}  # andar, total de andares, vidas... o que o front-end precisar para retomar
+
+    # --- Ciclo de vida ---
+    def iniciar_masmorra(self, heroi, **contexto):
+        """Começa um diário novo (descarta o da corrida anterior) e grava o primeiro snapshot."""
+        self.fechar()
+        self._arquivo = open(self.caminho, "w", encoding="utf-8")
+        self.heroi = heroi; self.inimigo = None; self.contexto = dict(contexto)
+        self.snapshot()
+
+    def continuar_masmorra(self, heroi, inimigo=None, **contexto):
+        """Continua anexando ao diário existente (depois de uma recuperação)."""
+        self.fechar()
+        self._arquivo = open(self.caminho, "a", encoding="utf-8")
+        self.heroi = heroi; self.inimigo = inimigo; self.contexto = dict(contexto)
+        self.snapshot()
+
+    def iniciar_batalha(self, inimigo, andar):
+        self.inimigo = inimigo; self.contexto["andar"] = andar; self.contexto.pop("vencida", None)
+        self.snapshot()
+
+    def fim_de_batalha(self, resultado):
+        if resultado == "vitoria": self.contexto["vencida"] = True
+        self.registrar("fim", res=resultado)
+
+    def fim_de_andar(self):
+        """Fronteira de andar: snapshot e fsync. É o único ponto (além do fim) que força o diário ao disco."""
+        self.snapshot(); self._sincronizar()
+
+    def encerrar(self, resultado):
+        """Marca a masmorra como terminada; um diário encerrado não é oferecido para recuperação."""
+        if self._arquivo is None: return
+        self._escrever({"t": "encerrada", "res": resultado}); self._sincronizar(); self.fechar()
+
+    def fechar(self):
+        if self._arquivo is not None: self._arquivo.close(); self._arquivo = None
+
+    # --- Escrita ---
+    def papel(self, personagem): return "h" if personagem is self.heroi else "i"
+
+    item_para_dict = staticmethod(item_para_dict)
+
+    def registrar(self, evento, /, **dados):
+        if self._arquivo is None: return
+        dados["t"] = evento
+        self._escrever(dados)
+        self._desde_snapshot += 1
+        if self._desde_snapshot >= SNAPSHOT_A_CADA: self.snapshot()
+
+    def registrar_heroi(self):
+        """Estado completo do herói (XP, nível, pontos distribuídos), para mudanças que não passam pelas regras de combate."""
+        self.registrar("heroi", heroi=persistencia.heroi_para_dict(self.heroi))
+
+    def snapshot(self):
+        if self._arquivo is None: return
+        self._escrever({"t": "snapshot", "heroi": persistencia.heroi_para_dict(self.heroi),
+                        "inimigo": personagem_para_dict(self.inimigo) if self.inimigo is not None else None, "ctx": self.contexto})
+        self._desde_snapshot = 0
+
+    def _escrever(self, registro):
+        self._arquivo.write(json.dumps(registro, ensure_ascii=False, separators=_SEPARADORES) + "\n")
+
+    def _sincronizar(self):
+        if self._arquivo is None: return
+        self._arquivo.flush(); os.fsync(self._arquivo.fileno())
+
+
+# --- RECUPERAÇÃO ---
+class Recuperacao:
+    """Estado reconstruído: herói, inimigo da batalha interrompida (ou None), contexto do front-end e eventos reaplicados."""
+    def __init__(self, heroi, inimigo, contexto, reaplicados):
+        self.heroi = heroi; self.inimigo = inimigo; self.contexto = contexto; self.reaplicados = reaplicados
+
+def _ler_registros(caminho):
+    registros = []
+    try:
+        with open(caminho, encoding="utf-8") as arquivo:
+            for linha in arquivo:
+                try: registros.append(json.loads(linha))
+                except ValueError: break  # última linha cortada pela queda: descarta dali em diante
+    except FileNotFoundError: pass
+    return registros
+
+def _reaplicar(jogo, registro, heroi, inimigo, contexto):
+    """Aplica um evento sobre o estado. Devolve o herói (que pode ser substituído por um evento 'heroi')."""
+    tipo = registro["t"]
+    alvos = {"h": heroi, "i": inimigo}
+    if tipo == "dano": alvos[registro["alvo"]].vida_atual = registro["vida"]
+    elif tipo == "hab":
+        alvos[registro["a"]].caos_atual = registro["caos"]; alvo = alvos[registro["alvo"]]; alvo.vida_atual = registro["vida"]
+        # Pelas mesmas regras de acúmulo da jogada original (aplicar), não por atribuição
+        if registro["ef"] in ("veneno", "congelado"): alvo.efeitos_status.aplicar(registro["ef"], registro["valor"], registro["turnos"])
+        elif registro["ef"] == "buff_forca": alvos[registro["a"]].buffs_ativos.aplicar("forca", registro["valor"], registro["turnos"])
+    elif tipo == "tick":
+        # Os contadores andam de forma determinística; o veneno é conferido com a vida registrada.
+        personagem = alvos[registro["a"]]; personagem.buffs_ativos.avancar_turno(); personagem.efeitos_status.avancar_turno(); personagem.vida_atual = registro["vida"]
+    elif tipo == "pocao":
+        pocao = heroi.inventario_pocoes.pop(registro["i"])
+        if pocao.tipo not in ("cura", "restaura_caos"): heroi.buffs_ativos.aplicar(pocao.tipo.split("_")[1], pocao.valor, registro["turnos"])
+        heroi.vida_atual = registro["vida"]; heroi.caos_atual = registro["caos"]
+    elif tipo == "loot":
+        item = item_de_dict(jogo, registro["item"])
+        if registro["item"]["k"] == "equip": heroi.equipamentos[item.slot] = item; heroi.vida_atual = registro["vida"]; heroi.caos_atual = registro["caos"]
+        else: heroi.inventario_pocoes.append(item)
+    elif tipo == "quebra": heroi.equipamentos[registro["slot"]] = None
+    elif tipo == "heroi": heroi = persistencia.heroi_de_dict(jogo, registro["heroi"])
+    elif tipo == "fim" and registro["res"] == "vitoria": contexto["vencida"] = True
+    return heroi
+
+def recuperar(caminho, jogo):
+    """Reconstrói a masmorra interrompida a partir do diário, ou devolve None se não houver nada a retomar."""
+    registros = _ler_registros(caminho)
+    if not registros or registros[-1]["t"] == "encerrada": return None
+    ultimo = max((i for i, r in enumerate(registros) if r["t"] == "snapshot"), default=None)
+    if ultimo is None: return None
+    snapshot = registros[ultimo]
+    heroi = persistencia.heroi_de_dict(jogo, snapshot["heroi"])
+    inimigo = personagem_de_dict(jogo, snapshot["inimigo"]) if snapshot["inimigo"] else None
+    contexto = dict(snapshot["ctx"]); eventos = registros[ultimo + 1:]
+    for registro in eventos:
+        heroi = _reaplicar(jogo, registro, heroi, inimigo, contexto)
+    return Recuperacao(heroi, inimigo, contexto, len(eventos))
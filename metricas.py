@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentação opcional por fase do turno: contadores e histogramas de latência, exportados em JSON ou no formato
+de texto do Prometheus no fim de cada masmorra.
+
+Ligada com rpg_dinamico.definir_metricas(Metricas(caminho)) (os jogos fazem isso quando RPG_METRICAS aponta para um
+arquivo). A medição funciona embrulhando as funções de cada fase (instrumentar), do mesmo jeito que a GUI troca os
+métodos do jogo em patch_rpg_dinamico: desligada, nenhuma função é trocada e o custo é zero. As fases aninham
+(a resolução de uma ação inclui a aplicação do dano), então cada histograma mede o tempo inclusivo da fase.
+"""
+import bisect
+import builtins
+import functools
+import json
+import os
+import time
+
+# Limites superiores dos baldes, em segundos (de 1 µs a 1 s); o último balde (+Inf) pega o resto.
+LIMITES_PADRAO = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0)
+_AUSENTE = object()
+
+
+def alvos_do_jogo(jogo):
+    """(dono, atributo, fase) de cada ponto medido em rpg_dinamico. `jogo` é o módulo, passado como em persistencia."""
+    return [(jogo, "resolver_efeitos", "efeitos"),
+            (jogo, "resolver_ataque", "acao"), (jogo, "resolver_habilidade", "acao"), (jogo, "resolver_pocao", "acao"),
+            (jogo.Personagem, "receber_dano", "dano"),
+            (jogo.Personagem, "mostrar_status", "status"), (jogo, "limpar_tela", "limpar_tela"),
+            (jogo, "print", "log"),  # Sombreia o print só dentro do módulo do jogo: cada linha escrita no console
+            (jogo.TabelaDeLoot, "gerar", "recompensas"),
+            (jogo, "gerar_inimigo", "inimigos"), (jogo, "gerar_chefe", "inimigos"),
+            (jogo.PoolDeInimigos, "gerar_inimigo", "inimigos"), (jogo.PoolDeInimigos, "gerar_chefe", "inimigos")]
+
+
+class Histograma:
+    """Baldes cumulativos no estilo do Prometheus (valor <= limite), soma e contagem."""
+    __slots__ = ('limites', 'contagens', 'soma', 'total')
+
+    def __init__(self, limites=LIMITES_PADRAO):
+        self.limites = limites; self.contagens = [0] * (len(limites) + 1); self.soma = 0.0; self.total = 0
+
+    def observar(self, segundos):
+        self.contagens[bisect.bisect_left(self.limites, segundos)] += 1; self.soma += segundos; self.total += 1
+
+    def quantil(self, q):
+        """Limite superior do balde onde cai o quantil `q` (inf se cair no último)."""
+        alvo = q * self.total; acumulado = 0
+        for limite, contagem in zip(self.limites + (float('inf'),), self.contagens):
+            acumulado += contagem
+            if acumulado >= alvo: return limite
+        return float('inf')
+
+    def cumulativos(self):
+        acumulado = 0; saida = []
+        for contagem in self.contagens: acumulado += contagem; saida.append(acumulado)
+        return saida
+
+
+class Metricas:
+    """Contadores e histogramas por fase de uma masmorra. `caminho` terminado em .prom ou .txt exporta no formato do Prometheus; senão, JSON."""
+
+    def __init__(self, caminho=None, limites=LIMITES_PADRAO):
+        self.caminho = caminho; self.limites = limites
+        self.fases = {}       # fase -> Histograma
+        self.contadores = {}  # (nome, ((rótulo, valor), ...)) -> total
+        self.masmorras = 0
+        self._trocados = []   # (dono, atributo, original) para desinstrumentar
+
+    # --- Coleta ---
+    def histograma(self, fase):
+        histograma = self.fases.get(fase)
+        if histograma is None: histograma = self.fases[fase] = Histograma(self.limites)
+        return histograma
+
+    def observar(self, fase, segundos): self.histograma(fase).observar(segundos)
+
+    def incrementar(self, nome, quantidade=1, **rotulos):
+        chave = (nome, tuple(sorted(rotulos.items())))
+        self.contadores[chave] = self.contadores.get(chave, 0) + quantidade
+
+    def cronometrar(self, fase, funcao):
+        """Versão de `funcao` que registra a duração de cada chamada na fase."""
+        histograma = self.histograma(fase); relogio = time.perf_counter
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            inicio = relogio()
+            try: return funcao(*args, **kwargs)
+            finally: histograma.observar(relogio() - inicio)
+        return medida
+
+    def instrumentar(self, alvos):
+        """Troca cada `dono.atributo` pela versão cronometrada. Um nome de builtin num módulo (print) sombreia o builtin só ali."""
+        for dono, atributo, fase in alvos:
+            original = vars(dono).get(atributo, _AUSENTE)
+            funcao = getattr(builtins, atributo) if original is _AUSENTE else original
+            setattr(dono, atributo, self.cronometrar(fase, funcao)); self._trocados.append((dono, atributo, original))
+
+    def desinstrumentar(self):
+        """Devolve as funções originais, na ordem inversa da troca."""
+        for dono, atributo, original in reversed(self._trocados):
+            if original is _AUSENTE: delattr(dono, atributo)
+            else: setattr(dono, atributo, original)
+        self._trocados = []
+
+    def fim_de_masmorra(self, resultado):
+        """Conta a masmorra, exporta as métricas dela (se há caminho) e zera os histogramas para a próxima."""
+        self.masmorras += 1; self.incrementar("masmorras", resultado=resultado)
+        if self.caminho: self.exportar(self.caminho, resultado=resultado)
+        for histograma in self.fases.values(): histograma.__init__(self.limites)  # As funções embrulhadas guardam o objeto: zera no lugar
+
+    # --- Exportação ---
+    def para_dict(self, **contexto):
+        fases = {}
+        for fase, h in sorted(self.fases.items()):
+            if not h.total: continue
+            fases[fase] = {"chamadas": h.total, "soma_s": h.soma, "media_us": h.soma / h.total * 1e6,
+                           "p50_ate_s": h.quantil(0.5), "p95_ate_s": h.quantil(0.95), "p99_ate_s": h.quantil(0.99),
+                           "baldes": {_rotulo_limite(l): c for l, c in zip(self.limites + (float('inf'),), h.cumulativos())}}
+        contadores = [dict(nome=nome, rotulos=dict(rotulos), valor=valor) for (nome, rotulos), valor in sorted(self.contadores.items())]
+        return {"masmorra": self.masmorras, **contexto, "fases": fases, "contadores": contadores}
+
+    def para_prometheus(self):
+        linhas = ["# HELP rpg_fase_segundos Latencia de cada fase do turno, na ultima masmorra.", "# TYPE rpg_fase_segundos histogram"]
+        for fase, h in sorted(self.fases.items()):
+            if not h.total: continue
+            for limite, acumulado in zip(self.limites + (float('inf'),), h.cumulativos()):
+                linhas.append(f'rpg_fase_segundos_bucket{{fase="{fase}",le="{_rotulo_limite(limite)}"}} {acumulado}')
+            linhas.append(f'rpg_fase_segundos_sum{{fase="{fase}"}} {h.soma!r}')
+            linhas.append(f'rpg_fase_segundos_count{{fase="{fase}"}} {h.total}')
+        nomes = sorted({nome for nome, _ in self.contadores})
+        for nome in nomes:
+            linhas += [f"# HELP rpg_{nome}_total Contador {nome} desde o inicio do jogo.", f"# TYPE rpg_{nome}_total counter"]
+            for (n, rotulos), valor in sorted(self.contadores.items()):
+                if n != nome: continue
+                texto = ",".join(f'{r}="{v}"' for r, v in rotulos)
+                linhas.append(f"rpg_{nome}_total{{{texto}}} {valor}" if texto else f"rpg_{nome}_total {valor}")
+        return "\n".join(linhas) + "\n"
+
+    def exportar(self, caminho, **contexto):
+        """Grava o arquivo inteiro de uma vez (arquivo temporário + rename), para quem lê nunca ver um pela metade."""
+        prometheus = caminho.endswith((".prom", ".txt"))
+        texto = self.para_prometheus() if prometheus else json.dumps(self.para_dict(**contexto), ensure_ascii=False, indent=2)
+        temporario = caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo: arquivo.write(texto)
+        os.replace(temporario, caminho)
+
+def _rotulo_limite(limite): return "+Inf" if limite == float('inf') else repr(limite)
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Otimizador da distribuição de pontos livres (Força/Defesa/Agilidade) por classe e nível, feito sobre o simulador.
+
+Uma distribuição é avaliada pela taxa de vitória contra a mistura de uma masmorra padrão: os INIMIGO_TEMPLATES
+(3/4 do peso, um andar comum cada) e os CHEFE_TEMPLATES (1/4, o andar do chefe), escalados para o nível do herói.
+A busca é uma grade sobre as divisões dos pontos seguida de subida de encosta (mover pontos de um atributo para
+outro enquanto melhorar).
+
+Cada confronto (vetor de atributos do herói contra um inimigo) é simulado uma vez e memorizado: o vetor já inclui
+classe, nível, proficiência e equipamento, então candidatos repetidos pela busca, distribuições que chegam ao
+mesmo vetor e novos pedidos de sugestão saem do cache. O gerador de cada confronto depende só da seed e do inimigo
+(números aleatórios comuns): todo candidato enfrenta a mesma sequência de dados, o que deixa a comparação bem
+menos ruidosa, e o resultado é o mesmo com 1 ou N processos.
+
+Uso: python -m rpg_dinamico optimize --classes Feral --niveis 1-5 --batalhas 200 --processos 4
+"""
+import argparse
+import contextlib
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import rpg_dinamico
+import simulador
+
+BATALHAS_POR_CONFRONTO = 200
+BATALHAS_SUGESTAO = 60      # Botão da interface: roda no processo do jogo, precisa responder em ~1 s
+PESO_CHEFES = 0.25          # 3 andares comuns e o chefe
+CONFRONTOS_POR_BLOCO = 8    # Unidade de trabalho mandada a cada processo
+
+# (vetor, tipo, inimigo, política, batalhas, seed) -> (vitórias, soma da vida restante em fração da máxima)
+_RESULTADOS = {}
+
+# --- VETORES DE ATRIBUTOS ---
+# Vetor: (classe, nível, proficiência, vida máxima, força, defesa, agilidade, caos máximo), já com o equipamento.
+def vetor_do_heroi(heroi):
+    itens = [eq for eq in heroi.equipamentos.values() if eq]
+    return (heroi.classe, heroi.nivel, round(heroi.proficiencia, 6),
+            heroi.vida_base + sum(eq.bonus_vida for eq in itens), heroi.forca_base + sum(eq.bonus_forca for eq in itens),
+            heroi.defesa_base + sum(eq.bonus_defesa for eq in itens), heroi.agilidade_base + sum(eq.bonus_agilidade for eq in itens),
+            heroi.caos_base + sum(eq.bonus_caos for eq in itens))
+
+def vetor_base(classe, nivel):
+    """Vetor de um herói novo da classe no nível pedido, antes de gastar qualquer ponto livre."""
+    heroi = rpg_dinamico.Heroi(f"Otim-{classe}", classe, **rpg_dinamico.CLASSES_BASE[classe]["stats"])
+    while heroi.nivel < nivel:
+        heroi.xp_atual = heroi.xp_proximo_nivel; rpg_dinamico.resolver_subida_de_nivel(heroi)
+    return vetor_do_heroi(heroi)
+
+def pontos_livres(nivel):
+    """Pontos que o jogador reparte até chegar ao nível: os da criação e os de cada subida."""
+    return rpg_dinamico.PONTOS_DISTRIBUICAO_INICIAL + (nivel - 1) * rpg_dinamico.PONTOS_POR_NIVEL
+
+def com_pontos(vetor, distribuicao):
+    forca, defesa, agilidade = distribuicao
+    return vetor[:4] + (vetor[4] + forca, vetor[5] + defesa, vetor[6] + agilidade) + vetor[7:]
+
+def heroi_do_vetor(vetor):
+    classe, nivel, proficiencia, vida, forca, defesa, agilidade, caos = vetor
+    heroi = rpg_dinamico.Heroi(f"Otim-{classe}", classe, vida, forca, defesa, agilidade, caos)
+    heroi.nivel = nivel; heroi.proficiencia = proficiencia
+    return heroi
+
+# --- CONFRONTOS ---
+def confrontos(nivel):
+    """(peso, tipo, nome da linha) de cada inimigo da mistura no nível; os pesos somam 1."""
+    comuns = rpg_dinamico.linhas_de_inimigos(nivel); chefes = rpg_dinamico.linhas_de_chefes(nivel)
+    return [((1 - PESO_CHEFES) / len(comuns), "inimigo", nome) for nome, _, _ in comuns] + [(PESO_CHEFES / len(chefes), "chefe", nome) for nome, _, _ in chefes]
+
+def simular_confronto(vetor, tipo, nome, politica, batalhas, seed):
+    """`batalhas` lutas do vetor contra um inimigo. Devolve (vitórias, soma da vida restante em fração da máxima)."""
+    nivel = vetor[1]
+    linhas, classe = (rpg_dinamico.linhas_de_chefes, rpg_dinamico.Chefao) if tipo == "chefe" else (rpg_dinamico.linhas_de_inimigos, rpg_dinamico.Personagem)
+    _, _, atributos = next(linha for linha in linhas(nivel) if linha[0] == nome)
+    heroi = heroi_do_vetor(vetor); inimigo = classe(nome, *atributos, nivel=nivel)
+    rng = random.Random(f"{seed}/{tipo}/{nome}"); acao = simulador.POLITICAS[politica]; vitorias = 0; vida = 0.0
+    for _ in range(batalhas):
+        simulador.restaurar(heroi); simulador.restaurar(inimigo)
+        venceu, _, restante = simulador.simular_batalha(heroi, inimigo, acao, rng)
+        if venceu: vitorias += 1; vida += restante / heroi.vida_maxima
+    return vitorias, vida
+
+def simular_bloco(chaves):
+    """Simula uma lista de chaves do cache. Função de módulo para poder ir a outro processo."""
+    with _sem_diario():
+        return [(chave, simular_confronto(*chave)) for chave in chaves]
+
+@contextlib.contextmanager
+def _sem_diario():
+    """As batalhas simuladas não podem ir para o diário nem para os eventos da masmorra de verdade (o botão da interface roda no meio dela)."""
+    diario = rpg_dinamico.DIARIO; destino = rpg_dinamico.EVENTOS; rpg_dinamico.definir_diario(None); rpg_dinamico.definir_eventos(None)
+    try: yield
+    finally: rpg_dinamico.definir_diario(diario); rpg_dinamico.definir_eventos(destino)
+
+def avaliar(vetores, politica="gulosa", batalhas=BATALHAS_POR_CONFRONTO, seed=0, executor=None):
+    """
+    (pontuação, vida restante média nas vitórias) de cada vetor contra a mistura. Só os confrontos fora do cache são
+    simulados, em blocos no `executor` (um ProcessPoolExecutor) se houver um, senão neste processo.
+    """
+    pendentes = []
+    for vetor in dict.fromkeys(vetores):
+        for _, tipo, nome in confrontos(vetor[1]):
+            chave = (vetor, tipo, nome, politica, batalhas, seed)
+            if chave not in _RESULTADOS: pendentes.append(chave)
+    if pendentes:
+        if executor is None: _RESULTADOS.update(simular_bloco(pendentes))
+        else:
+            blocos = [pendentes[i:i + CONFRONTOS_POR_BLOCO] for i in range(0, len(pendentes), CONFRONTOS_POR_BLOCO)]
+            for bloco in executor.map(simular_bloco, blocos): _RESULTADOS.update(bloco)
+    notas = []
+    for vetor in vetores:
+        pontuacao = 0.0; vitorias = 0; vida = 0.0
+        for peso, tipo, nome in confrontos(vetor[1]):
+            v, soma_vida = _RESULTADOS[(vetor, tipo, nome, politica, batalhas, seed)]
+            pontuacao += peso * v / batalhas; vitorias += v; vida += soma_vida
+        notas.append((pontuacao, vida / vitorias if vitorias else 0.0))
+    return notas
+
+# --- BUSCA ---
+def grade(pontos, passo):
+    """Divisões (força, defesa, agilidade) de `pontos` com força e defesa em múltiplos de `passo`."""
+    return [(f, d, pontos - f - d) for f in range(0, pontos + 1, passo) for d in range(0, pontos - f + 1, passo)]
+
+def vizinhas(distribuicao, delta):
+    """Distribuições que movem `delta` pontos de um atributo para outro."""
+    saida = []
+    for de in range(3):
+        if distribuicao[de] < delta: continue
+        for para in range(3):
+            if para == de: continue
+            nova = list(distribuicao); nova[de] -= delta; nova[para] += delta; saida.append(tuple(nova))
+    return saida
+
+def otimizar_distribuicao(vetor, pontos, politica="gulosa", batalhas=BATALHAS_POR_CONFRONTO, seed=0, executor=None, passo=None):
+    """
+    Melhor divisão de `pontos` livres sobre `vetor`: grade com `passo` (padrão: ~5 valores por atributo) e depois
+    subida de encosta com passos cada vez menores até 1 ponto. Devolve (distribuição, (pontuação, vida), candidatas avaliadas).
+    """
+    passo = passo or max(1, pontos // 5); avaliadas = {}
+    def avaliar_novas(candidatas):
+        novas = [c for c in dict.fromkeys(candidatas) if c not in avaliadas]
+        for candidata, nota in zip(novas, avaliar([com_pontos(vetor, c) for c in novas], politica, batalhas, seed, executor)): avaliadas[candidata] = nota
+    avaliar_novas(grade(pontos, passo))
+    melhor = max(avaliadas, key=avaliadas.get); delta = max(1, passo // 2)
+    while True:
+        candidatas = vizinhas(melhor, delta); avaliar_novas(candidatas)
+        proxima = max(candidatas + [melhor], key=avaliadas.get)
+        if proxima != melhor: melhor = proxima
+        elif delta == 1: break
+        else: delta //= 2
+    return melhor, avaliadas[melhor], len(avaliadas)
+
+def sugerir_distribuicao(heroi, pontos, politica="gulosa", batalhas=BATALHAS_SUGESTAO, seed=0):
+    """Sugestão para a tela de distribuição de pontos: (força, defesa, agilidade) e a pontuação estimada."""
+    distribuicao, (pontuacao, _), _ = otimizar_distribuicao(vetor_do_heroi(heroi), pontos, politica, batalhas, seed)
+    return distribuicao, pontuacao
+
+# --- RELATÓRIO ---
+def otimizar_lote(classes, niveis, politica="gulosa", batalhas=BATALHAS_POR_CONFRONTO, seed=0, processos=None):
+    """Uma linha por (classe, nível): a melhor distribuição dos pontos livres e a pontuação das distribuições fixas do simulador."""
+    linhas = []
+    with contextlib.ExitStack() as pilha:
+        executor = None if processos == 1 else pilha.enter_context(ProcessPoolExecutor(max_workers=processos))
+        for classe in classes:
+            for nivel in niveis:
+                base = vetor_base(classe, nivel); pontos = pontos_livres(nivel)
+                melhor, (pontuacao, vida), avaliadas = otimizar_distribuicao(base, pontos, politica, batalhas, seed, executor)
+                # As fixas seguem a mesma progressão do jogo (pontos repartidos a cada nível), como no simulador.
+                fixas = {nome: vetor_do_heroi(simulador.criar_heroi_simulado(classe, nivel, nome)) for nome in simulador.DISTRIBUICOES}
+                notas = dict(zip(fixas, avaliar(list(fixas.values()), politica, batalhas, seed, executor)))
+                linhas.append(dict(classe=classe, nivel=nivel, pontos=pontos, forca=melhor[0], defesa=melhor[1], agilidade=melhor[2],
+                                   pontuacao=pontuacao, vida_restante_media=vida, candidatas=avaliadas,
+                                   distribuicoes_fixas={nome: nota[0] for nome, nota in notas.items()}))
+    return linhas
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m rpg_dinamico optimize", description="Procura a melhor distribuição de pontos por classe e nível contra a mistura de inimigos e chefes.")
+    parser.add_argument("--classes", default=",".join(rpg_dinamico.CLASSES_BASE), help="classes separadas por vírgula")
+    parser.add_argument("--niveis", type=simulador._intervalo, default=[1, 2, 3, 4, 5], help="ex.: 1-5 ou 1,3,5")
+    parser.add_argument("--batalhas", type=int, default=BATALHAS_POR_CONFRONTO, help="batalhas por confronto (vetor contra inimigo)")
+    parser.add_argument("--politica", choices=sorted(simulador.POLITICAS), default="gulosa")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processos", type=int, default=os.cpu_count(), help="1 roda sem pool de processos")
+    parser.add_argument("--json", help="caminho do relatório JSON")
+    args = parser.parse_args(argv)
+    classes = [c.strip() for c in args.classes.split(",")]
+    for classe in classes:
+        if classe not in rpg_dinamico.CLASSES_BASE: parser.error(f"classe desconhecida: {classe}")
+
+    inicio = time.perf_counter()
+    linhas = otimizar_lote(classes, args.niveis, args.politica, args.batalhas, args.seed, args.processos)
+    decorrido = time.perf_counter() - inicio
+
+    fixas = list(simulador.DISTRIBUICOES)
+    print(f"{'Classe':<22}{'Nív':>4}{'Pts':>5}  {'FOR/DEF/AGI':<12}{'Melhor':>8}" + "".join(f"{nome[:11]:>12}" for nome in fixas))
+    for l in linhas:
+        divisao = f"{l['forca']}/{l['defesa']}/{l['agilidade']}"
+        print(f"{l['classe']:<22}{l['nivel']:>4}{l['pontos']:>5}  {divisao:<12}{l['pontuacao']:>7.1%}" + "".join(f"{l['distribuicoes_fixas'][nome]:>11.1%} " for nome in fixas))
+    confrontos_simulados = len(_RESULTADOS)
+    print(f"\n{sum(l['candidatas'] for l in linhas)} distribuições avaliadas, {confrontos_simulados} confrontos simulados "
+          f"({confrontos_simulados * args.batalhas:,} batalhas) em {decorrido:.2f}s com {args.processos} processo(s); seed {args.seed}")
+    if args.json: simulador.salvar_json(linhas, args.json, vars(args))
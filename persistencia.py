@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Persistência dos heróis em SQLite.
+
+RepositorioDeHerois tem a mesma interface de dict que HEROIS_CRIADOS sempre teve (`nome in`, `[nome]`, `[nome] = heroi`,
+`keys()`), mas guarda os heróis em disco. A listagem (`resumos()`) lê só nome/classe/nível das colunas indexadas;
+o herói completo (equipamentos, poções, buffs) só é montado quando é pedido por nome. Escritas são agrupadas e
+gravadas em uma única transação por `salvar()`.
+"""
+import json
+from collections.abc import MutableMapping
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS herois (
+    nome TEXT PRIMARY KEY,
+    classe TEXT NOT NULL,
+    nivel INTEGER NOT NULL,
+    dados TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_herois_classe ON herois (classe);
+CREATE INDEX IF NOT EXISTS idx_herois_nivel ON herois (nivel);
+"""
+
+# --- SERIALIZAÇÃO ---
+# `jogo` é o módulo com as classes (rpg_dinamico); é passado explicitamente porque, rodando como script, ele é `__main__`.
+def _numero_ou_none(valor): return None if valor == float('inf') else valor
+
+def pilhas_para_lista(tabela):
+    """Buffs/efeitos pilha por pilha, [tipo, turnos restantes, valor]: a visão de dict soma as pilhas de um tipo."""
+    return [list(pilha) for pilha in tabela.pilhas()]
+
+def carregar_pilhas(tabela, dados):
+    """Refaz `tabela` a partir de pilhas_para_lista; aceita também o formato antigo, {tipo: {valor/dano, turnos_restantes}}."""
+    tabela.clear()
+    if isinstance(dados, dict): tabela.update(dados); return
+    for tipo, turnos, valor in dados: tabela.empilhar(tipo, valor, turnos)
+
+def heroi_para_dict(heroi):
+    return {
+        "nome": heroi.nome, "classe": heroi.classe, "nivel": heroi.nivel,
+        "base": [heroi.vida_base, heroi.forca_base, heroi.defesa_base, heroi.agilidade_base, heroi.caos_base],
+        "vida_atual": heroi.vida_atual, "caos_atual": heroi.caos_atual,
+        "xp_atual": heroi.xp_atual, "xp_proximo_nivel": _numero_ou_none(heroi.xp_proximo_nivel), "proficiencia": heroi.proficiencia,
+        "equipamentos": {slot: None if eq is None else {"nome": eq.nome, "raridade": eq.raridade, "bonus_vida": eq.bonus_vida, "bonus_forca": eq.bonus_forca,
+                                                          "bonus_defesa": eq.bonus_defesa, "bonus_agilidade": eq.bonus_agilidade, "bonus_caos": eq.bonus_caos}
+                         for slot, eq in heroi.equipamentos.items()},
+        "pocoes": [{"nome": p.nome, "raridade": p.raridade, "tipo": p.tipo, "valor": p.valor, "duracao": p.duracao} for p in heroi.inventario_pocoes],
+        "buffs": pilhas_para_lista(heroi.buffs_ativos), "efeitos": pilhas_para_lista(heroi.efeitos_status),
+    }
+
+def heroi_de_dict(jogo, dados):
+    vida, forca, defesa, agilidade, caos = dados["base"]
+    heroi = jogo.Heroi(dados["nome"], dados["classe"], vida, forca, defesa, agilidade, caos)
+    heroi.nivel = dados["nivel"]; heroi.vida_atual = dados["vida_atual"]; heroi.caos_atual = dados["caos_atual"]
+    heroi.xp_atual = dados["xp_atual"]; heroi.proficiencia = dados["proficiencia"]
+    heroi.xp_proximo_nivel = float('inf') if dados["xp_proximo_nivel"] is None else dados["xp_proximo_nivel"]
+    for slot, eq in dados["equipamentos"].items():
+        if eq: heroi.equipamentos[slot] = jogo.Equipamento(eq.pop("nome"), slot, eq.pop("raridade"), **eq)
+    heroi.inventario_pocoes = [jogo.Pocao(p["nome"], p["raridade"], p["tipo"], p["valor"], p["duracao"]) for p in dados["pocoes"]]
+    carregar_pilhas(heroi.buffs_ativos, dados["buffs"]); carregar_pilhas(heroi.efeitos_status, dados["efeitos"])
+    return heroi
+
+
+def _assinatura(heroi):
+    """O que muda num herói sem avisar os observadores: XP, nível, proficiência e o inventário de poções."""
+    return (heroi.nivel, heroi.xp_atual, heroi.xp_proximo_nivel, heroi.proficiencia,
+            tuple((p.nome, p.raridade, p.tipo, p.valor, p.duracao) for p in heroi.inventario_pocoes))
+
+
+class RepositorioDeHerois(MutableMapping):
+    """
+    Heróis por nome, em SQLite. Heróis já carregados ficam em memória e `salvar()` regrava só os que mudaram: o
+    repositório observa cada um (vida, caos, atributos, buffs, efeitos, equipamento) e compara o resto com a assinatura
+    da última gravação, então voltar ao menu sem ter jogado não serializa nada.
+    """
+    TAMANHO_DO_LOTE = 32  # Gravações pendentes que disparam um `salvar()` automático.
+
+    def __init__(self, jogo, caminho=":memory:"):
+        self._jogo = jogo; self.caminho = caminho
+        self._conexao = None
+        self._carregados = {}   # nome -> Heroi (mapa de identidade: o mesmo nome devolve sempre o mesmo objeto)
+        self._pendentes = set()  # nomes com gravação pendente
+        self._assinaturas = {}   # nome -> _assinatura(heroi) na última leitura/gravação
+        self._observacoes = {}   # nome -> (heroi, callback inscrito nele)
+
+    def _acompanhar(self, nome, heroi):
+        """Inscreve o repositório no herói: qualquer mudança observável o põe entre os pendentes."""
+        self._esquecer(nome)
+        def marcar(_, marca): self._pendentes.add(nome)
+        self._observacoes[nome] = (heroi, marcar); heroi.observar(marcar)
+        self._assinaturas[nome] = _assinatura(heroi)
+
+    def _esquecer(self, nome):
+        observacao = self._observacoes.pop(nome, None); self._assinaturas.pop(nome, None)
+        if observacao is not None: heroi, marcar = observacao; heroi.deixar_de_observar(marcar)
+
+    @property
+    def conexao(self):
+        """Abre o banco só no primeiro uso, para não criar o arquivo em quem apenas importa o jogo."""
+        if self._conexao is None:
+            import sqlite3  # Só quando o banco é usado de fato: o arranque da interface não paga este import.
+            self._conexao = sqlite3.connect(self.caminho)
+            self._conexao.executescript(ESQUEMA)
+        return self._conexao
+
+    # --- Interface de dict ---
+    def __getitem__(self, nome):
+        heroi = self._carregados.get(nome)
+        if heroi is not None: return heroi
+        linha = self.conexao.execute("SELECT dados FROM herois WHERE nome = ?", (nome,)).fetchone()
+        if linha is None: raise KeyError(nome)
+        heroi = self._carregados[nome] = heroi_de_dict(self._jogo, json.loads(linha[0]))
+        self._acompanhar(nome, heroi)
+        return heroi
+
+    def __setitem__(self, nome, heroi):
+        if self._carregados.get(nome) is not heroi: self._carregados[nome] = heroi; self._acompanhar(nome, heroi)
+        self._pendentes.add(nome)
+        if len(self._pendentes) >= self.TAMANHO_DO_LOTE: self.salvar()
+
+    def __delitem__(self, nome):
+        existia = self._carregados.pop(nome, None) is not None
+        self._pendentes.discard(nome); self._esquecer(nome)
+        with self.conexao: cursor = self.conexao.execute("DELETE FROM herois WHERE nome = ?", (nome,))
+        if not existia and cursor.rowcount == 0: raise KeyError(nome)
+
+    def __contains__(self, nome):
+        return nome in self._carregados or self.conexao.execute("SELECT 1 FROM herois WHERE nome = ?", (nome,)).fetchone() is not None
+
+    def __iter__(self): return iter(self.keys())
+
+    def keys(self):
+        """Nomes na ordem de criação (no banco primeiro, depois os ainda não gravados)."""
+        nomes = [nome for (nome,) in self.conexao.execute("SELECT nome FROM herois ORDER BY rowid")]
+        vistos = set(nomes)
+        return nomes + [nome for nome in self._carregados if nome not in vistos]
+
+    def __len__(self): return len(self.keys())
+
+    def __bool__(self):
+        return bool(self._carregados) or self.conexao.execute("SELECT 1 FROM herois LIMIT 1").fetchone() is not None
+
+    # --- Listagem e gravação ---
+    def resumos(self, classe=None, nivel_minimo=None):
+        """[(nome, classe, nível)] sem montar nenhum Heroi; filtros usam os índices de classe e nível."""
+        sql = "SELECT nome, classe, nivel FROM herois"; filtros = []; parametros = []
+        if classe is not None: filtros.append("classe = ?"); parametros.append(classe)
+        if nivel_minimo is not None: filtros.append("nivel >= ?"); parametros.append(nivel_minimo)
+        if filtros: sql += " WHERE " + " AND ".join(filtros)
+        linhas = {nome: (nome, c, n) for nome, c, n in self.conexao.execute(sql + " ORDER BY rowid", parametros)}
+        # Heróis em memória podem estar à frente do banco (subiram de nível, ainda não gravados).
+        for nome, heroi in self._carregados.items():
+            if (classe is None or heroi.classe == classe) and (nivel_minimo is None or heroi.nivel >= nivel_minimo): linhas[nome] = (nome, heroi.classe, heroi.nivel)
+            else: linhas.pop(nome, None)
+        return list(linhas.values())
+
+    def salvar(self):
+        """Grava numa única transação os heróis pendentes ou que mudaram desde a última gravação (eles mudam no lugar durante a partida)."""
+        assinaturas = self._assinaturas
+        for nome, heroi in self._carregados.items():
+            if nome not in self._pendentes and assinaturas.get(nome) != _assinatura(heroi): self._pendentes.add(nome)
+        if not self._pendentes: return
+        herois = [(nome, self._carregados[nome]) for nome in self._pendentes if nome in self._carregados]
+        linhas = [(nome, h.classe, h.nivel, json.dumps(heroi_para_dict(h), ensure_ascii=False)) for nome, h in herois]
+        with self.conexao:
+            self.conexao.executemany("INSERT INTO herois (nome, classe, nivel, dados) VALUES (?, ?, ?, ?) "
+                                     "ON CONFLICT(nome) DO UPDATE SET classe = excluded.classe, nivel = excluded.nivel, dados = excluded.dados", linhas)
+        for nome, heroi in herois: assinaturas[nome] = _assinatura(heroi)
+        self._pendentes.clear()
+
+    def fechar(self):
+        if self._conexao is not None: self.salvar(); self._conexao.close(); self._conexao = None
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Probabilidade exata de vitória e turnos esperados de um confronto herói contra inimigo, sem Monte Carlo.
+
+Com uma política de ação fixa (simulador.POLITICAS), a batalha é uma cadeia de Markov finita: o estado no começo
+de um turno é (vida e caos do herói, vida do inimigo, buffs e efeitos com seus contadores) e o resto é fixo. Os
+sorteios de um turno só entram em comparações com limiares conhecidos (o acerto de resolver_ataque contra
+chance_de_acerto, a chance do efeito de cada habilidade), então cada sorteio tem poucas faixas de resultado
+equivalentes. O modelo roda o turno de verdade (simulador.simular_turno, com as regras resolver_*) uma vez por
+faixa, com um gerador roteirizado, e soma a probabilidade de cada estado seguinte. As respostas vêm de programação
+dinâmica sobre esses estados, com tabela de memória.
+
+Nenhum turno volta a um estado anterior: vida e caos nunca sobem e os contadores só descem, exceto quando uma
+habilidade paga em caos os reinicia. O único ciclo possível é o turno em que ninguém acerta e nada muda; ele é
+resolvido fechado, dividindo por (1 - p de ficar no mesmo estado). A trava de MAX_TURNOS do simulador é ignorada
+(turnos ilimitados); ela só pesa em lutas que quase nunca terminam.
+
+Uso: python -m rpg_dinamico exact --classes Feral --niveis 1-3 --batalhas 20000
+"""
+import argparse
+import math
+import random
+import time
+import types
+
+import rpg_dinamico
+import simulador
+
+
+class _Ramificador:
+    """
+    Gerador roteirizado: cada sorteio devolve o representante da faixa escolhida em `escolhas` (ou a primeira faixa,
+    anotando as outras em `novos` para serem exploradas) e multiplica `probabilidade` pelo peso da faixa.
+    """
+    __slots__ = ('escolhas', 'caminho', 'probabilidade', 'novos', 'faixas_randint', 'faixas_random')
+
+    def __init__(self, escolhas, faixas_randint, faixas_random):
+        self.escolhas = escolhas; self.caminho = []; self.probabilidade = 1.0; self.novos = []
+        self.faixas_randint = faixas_randint; self.faixas_random = faixas_random
+
+    def _sortear(self, faixas):
+        i = len(self.caminho)
+        if i < len(self.escolhas): k = self.escolhas[i]
+        else:
+            k = 0; prefixo = tuple(self.caminho)
+            self.novos.extend(prefixo + (j,) for j in range(1, len(faixas)))
+        self.caminho.append(k); valor, peso = faixas[k]; self.probabilidade *= peso
+        return valor
+
+    def randint(self, a, b):
+        if (a, b) != (1, 100): raise ValueError(f"sorteio não modelado: randint({a}, {b})")
+        return self._sortear(self.faixas_randint)
+
+    def random(self): return self._sortear(self.faixas_random)
+
+
+def _faixas_randint(limiares):
+    """Faixas de 1..100 em que `rolagem > limiar` dá o mesmo resultado para todos os limiares: (maior valor da faixa, peso)."""
+    faixas = []; anterior = 0
+    for limite in sorted(set(limiares) | {100}):
+        if limite > anterior: faixas.append((limite, (limite - anterior) / 100)); anterior = limite
+    return faixas
+
+def _faixas_random(limiares):
+    """Faixas de [0, 1) em que `rolagem < limiar` dá o mesmo resultado para todos os limiares: (menor valor da faixa, peso)."""
+    cortes = [0.0] + sorted({l for l in limiares if 0.0 < l < 1.0}) + [1.0]
+    return [(inicio, fim - inicio) for inicio, fim in zip(cortes, cortes[1:])]
+
+
+class ModeloDeBatalha:
+    """
+    Cadeia de Markov de um confronto: atributos fixos do herói e do inimigo (base e equipamento, sem buffs) e uma
+    política. A tabela de memória vale para qualquer estado desse confronto, então perguntar de novo a cada turno
+    da mesma batalha só calcula os estados ainda não vistos.
+    """
+
+    def __init__(self, heroi, inimigo, politica="gulosa"):
+        self.politica = simulador.POLITICAS[politica] if isinstance(politica, str) else politica
+        self._heroi = rpg_dinamico.Heroi(heroi.nome, heroi.classe, *self._atributos_fixos(heroi))
+        self._heroi.nivel = heroi.nivel; self._heroi.proficiencia = heroi.proficiencia
+        self._inimigo = rpg_dinamico.Personagem(inimigo.nome, *self._atributos_fixos(inimigo), nivel=inimigo.nivel)
+        self._chances_de_efeito = [hab['efeito']['chance'] for hab in rpg_dinamico.HABILIDADES_POR_CLASSE[heroi.classe] if hab.get('efeito')]
+        self._memoria = {}  # estado -> (P(vitória), E[turnos], E[turnos * 1{vitória}])
+
+    @staticmethod
+    def _atributos_fixos(p):
+        buffs = p.buffs_ativos
+        return (p.vida_maxima, p.forca - buffs.valor('forca'), p.defesa - buffs.valor('defesa'), p.agilidade - buffs.valor('agilidade'), p.caos_maximo)
+
+    # --- Estados ---
+    def estado_de(self, heroi, inimigo):
+        """
+        Estado no começo de um turno, com buffs e efeitos pilha por pilha (as regras de acúmulo podem empilhar). Vida e
+        caos arredondados: somas de danos iguais em outra ordem caem no mesmo estado.
+        """
+        return (round(heroi.vida_atual, 6), round(heroi.caos_atual, 6), round(inimigo.vida_atual, 6),
+                heroi.buffs_ativos.pilhas(), heroi.efeitos_status.pilhas(), inimigo.efeitos_status.pilhas())
+
+    def estado_inicial(self):
+        return (round(self._heroi.vida_maxima, 6), round(self._heroi.caos_maximo, 6), round(self._inimigo.vida_maxima, 6), (), (), ())
+
+    def _carregar(self, estado):
+        vida_h, caos_h, vida_i, buffs_h, efeitos_h, efeitos_i = estado; heroi = self._heroi; inimigo = self._inimigo
+        heroi.vida_atual = vida_h; heroi.caos_atual = caos_h; inimigo.vida_atual = vida_i
+        for tabela, entradas in ((heroi.buffs_ativos, buffs_h), (heroi.efeitos_status, efeitos_h), (inimigo.efeitos_status, efeitos_i)):
+            tabela.clear()
+            for tipo, turnos, valor in entradas: tabela.empilhar(tipo, valor, turnos)
+
+    def _limiares_de_acerto(self):
+        """Chances de acerto possíveis neste turno (a agilidade do herói muda se o buff dela expirar no começo do turno)."""
+        heroi = self._heroi; agi_inimigo = types.SimpleNamespace(agilidade=self._inimigo.agilidade)
+        limiares = set()
+        for agilidade in {heroi.agilidade, heroi.agilidade - heroi.buffs_ativos.valor('agilidade')}:
+            agi_heroi = types.SimpleNamespace(agilidade=agilidade)
+            limiares.add(math.floor(rpg_dinamico.chance_de_acerto(agi_heroi, agi_inimigo)))
+            limiares.add(math.floor(rpg_dinamico.chance_de_acerto(agi_inimigo, agi_heroi)))
+        return limiares
+
+    def transicoes(self, estado):
+        """{resultado: probabilidade} de um turno a partir de `estado`; resultado é 'vitoria', 'derrota' ou o próximo estado."""
+        self._carregar(estado)
+        faixas_randint = _faixas_randint(self._limiares_de_acerto()); faixas_random = _faixas_random(self._chances_de_efeito)
+        saida = {}; pendentes = [()]
+        while pendentes:
+            rng = _Ramificador(pendentes.pop(), faixas_randint, faixas_random)
+            self._carregar(estado)
+            simulador.simular_turno(self._heroi, self._inimigo, self.politica, rng)
+            pendentes.extend(rng.novos)
+            if self._inimigo.vida_atual <= 0 and self._heroi.vida_atual > 0: resultado = 'vitoria'
+            elif self._heroi.vida_atual <= 0: resultado = 'derrota'
+            else: resultado = self.estado_de(self._heroi, self._inimigo)
+            saida[resultado] = saida.get(resultado, 0.0) + rng.probabilidade
+        return saida
+
+    # --- Programação dinâmica ---
+    def resolver(self, estado):
+        """(P(vitória), E[turnos], E[turnos * 1{vitória}]) a partir de `estado`. Pilha explícita: batalhas longas passariam do limite de recursão."""
+        memoria = self._memoria
+        if estado in memoria: return memoria[estado]
+        rpg_dinamico_diario = rpg_dinamico.DIARIO; rpg_dinamico.definir_diario(None)  # Os turnos explorados não são a batalha de verdade
+        rpg_dinamico_eventos = rpg_dinamico.EVENTOS; rpg_dinamico.definir_eventos(None)
+        try:
+            pilha = [estado]; ramos = {}
+            while pilha:
+                atual = pilha[-1]
+                if atual in memoria: pilha.pop(); continue
+                if atual not in ramos: ramos[atual] = self.transicoes(atual)
+                faltando = [r for r in ramos[atual] if isinstance(r, tuple) and r != atual and r not in memoria]
+                if faltando: pilha.extend(faltando); continue
+                memoria[atual] = self._combinar(atual, ramos.pop(atual)); pilha.pop()
+        finally:
+            rpg_dinamico.definir_diario(rpg_dinamico_diario); rpg_dinamico.definir_eventos(rpg_dinamico_eventos)
+        return memoria[estado]
+
+    def _combinar(self, estado, ramos):
+        memoria = self._memoria; fica = 0.0; vitoria = 0.0; turnos = 1.0; turnos_vitoria = 0.0
+        for resultado, p in ramos.items():
+            if resultado == estado: fica += p
+            elif resultado == 'vitoria': vitoria += p; turnos_vitoria += p
+            elif resultado != 'derrota':
+                v, t, tv = memoria[resultado]; vitoria += p * v; turnos += p * t; turnos_vitoria += p * (v + tv)
+        if fica >= 1.0: return 0.0, math.inf, 0.0  # Ninguém consegue mais agir sobre ninguém
+        vitoria /= 1 - fica
+        return vitoria, turnos / (1 - fica), (turnos_vitoria + fica * vitoria) / (1 - fica)
+
+    def prever(self, heroi=None, inimigo=None):
+        """
+        (probabilidade de vitória, turnos esperados, turnos esperados numa vitória) do começo do turno atual de
+        `heroi` contra `inimigo`, ou do começo da batalha se omitidos.
+        """
+        estado = self.estado_inicial() if heroi is None else self.estado_de(heroi, inimigo)
+        vitoria, turnos, turnos_vitoria = self.resolver(estado)
+        return vitoria, turnos, turnos_vitoria / vitoria if vitoria else math.inf
+
+    def __len__(self): return len(self._memoria)
+
+
+def probabilidade_de_vitoria(heroi, inimigo, politica="gulosa"):
+    """Atalho para uma pergunta só: (vitória, turnos esperados, turnos numa vitória) a partir do estado atual dos dois."""
+    return ModeloDeBatalha(heroi, inimigo, politica).prever(heroi, inimigo)
+
+
+# --- CONFERÊNCIA CONTRA O SIMULADOR ---
+def conferir(classe, nivel, tipo, linha, politica, distribuicao, batalhas, rng):
+    """Uma linha do relatório: o modelo exato e `batalhas` lutas de Monte Carlo do mesmo confronto."""
+    nome, _, atributos = linha
+    heroi = simulador.criar_heroi_simulado(classe, nivel, distribuicao); inimigo = rpg_dinamico.Personagem(nome, *atributos, nivel=nivel)
+    inicio = time.perf_counter(); modelo = ModeloDeBatalha(heroi, inimigo, politica)
+    vitoria, turnos, turnos_vitoria = modelo.prever(); decorrido = time.perf_counter() - inicio
+    vitorias = 0; soma_turnos = 0
+    for _ in range(batalhas):
+        simulador.restaurar(heroi); simulador.restaurar(inimigo)
+        venceu, t, _ = simulador.simular_batalha(heroi, inimigo, simulador.POLITICAS[politica], rng)
+        if venceu: vitorias += 1; soma_turnos += t
+    taxa = vitorias / batalhas; erro = math.sqrt(max(vitoria * (1 - vitoria), 1e-12) / batalhas)
+    return dict(classe=classe, nivel=nivel, tipo=tipo, inimigo=nome, exata=vitoria, monte_carlo=taxa, z=(taxa - vitoria) / erro,
+                turnos_vitoria_exato=turnos_vitoria, turnos_vitoria_monte_carlo=soma_turnos / vitorias if vitorias else math.inf,
+                turnos_esperados=turnos, estados=len(modelo), segundos=decorrido)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m rpg_dinamico exact", description="Probabilidade exata de vitória por confronto, conferida contra o simulador.")
+    parser.add_argument("--classes", default=",".join(rpg_dinamico.CLASSES_BASE), help="classes separadas por vírgula")
+    parser.add_argument("--niveis", type=simulador._intervalo, default=[1, 2, 3], help="ex.: 1-5 ou 1,3,5")
+    parser.add_argument("--politica", choices=sorted(simulador.POLITICAS), default="gulosa")
+    parser.add_argument("--distribuicao", choices=sorted(simulador.DISTRIBUICOES), default="equilibrada")
+    parser.add_argument("--batalhas", type=int, default=5000, help="lutas de Monte Carlo por confronto para a conferência (0 desliga)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="caminho do relatório JSON")
+    args = parser.parse_args(argv)
+    classes = [c.strip() for c in args.classes.split(",")]
+    for classe in classes:
+        if classe not in rpg_dinamico.CLASSES_BASE: parser.error(f"classe desconhecida: {classe}")
+
+    rng = random.Random(args.seed); linhas = []; ok = True
+    print(f"{'Classe':<22}{'Nív':>4}  {'Inimigo':<26}{'Exata':>8}{'MC':>8}{'z':>7}{'Turnos':>8}{'MC':>7}{'Estados':>9}{'ms':>8}")
+    for classe in classes:
+        for nivel in args.niveis:
+            confrontos = [("inimigo", l) for l in rpg_dinamico.linhas_de_inimigos(nivel)] + [("chefe", l) for l in rpg_dinamico.linhas_de_chefes(nivel)]
+            for tipo, linha in confrontos:
+                l = conferir(classe, nivel, tipo, linha, args.politica, args.distribuicao, args.batalhas, rng); linhas.append(l)
+                passou = not args.batalhas or abs(l['z']) <= 4; ok = ok and passou
+                mc = f"{l['monte_carlo']:>7.1%}{l['z']:>+7.2f}" if args.batalhas else f"{'-':>7}{'-':>7}"
+                print(f"{classe:<22}{nivel:>4}  {l['inimigo']:<26}{l['exata']:>7.1%} {mc}{l['turnos_vitoria_exato']:>8.2f}{l['turnos_vitoria_monte_carlo']:>7.2f}"
+                      f"{l['estados']:>9}{l['segundos'] * 1000:>8.1f}{'' if passou else '  DIVERGIU'}")
+    if args.json: simulador.salvar_json(linhas, args.json, vars(args))
+    raise SystemExit(0 if ok else 1)
@@ -1,7 +1,18 @@
 # -*- coding: utf-8 -*-
+import atexit
+import copy
+import heapq
 import os
 import random
+import sys
 import time
+from collections.abc import MutableMapping
+
+import diario
+import eventos
+import metricas
+import persistencia
+import tela
 
 # --- CONSTANTES DE CONFIGURAÇÃO DO JOGO --- Felipe
 XP_PARA_NIVEL = {1: 10, 2: 25, 3: 50, 4: 80, 5: float('inf')}
@@ -10,6 +21,8 @@ PONTOS_POR_NIVEL = 5
 PENALIDADE_XP_MORTE = 0.70
 CHANCE_QUEBRA_AO_FUGIR = 0.25
 MAX_POCOES_INVENTARIO = 5
+# Modo de depuração: confere o cache de atributos derivados contra o recálculo completo a cada leitura.
+VERIFICAR_CACHE_ATRIBUTOS = os.environ.get("RPG_VERIFICAR_CACHE") == "1"
 
 RARIDADES = {
     "comum": {"chance": 0.75, "multiplicador": 1.0, "cor": "\033[97m"},
@@ -49,16 +62,158 @@ CLASSES_BASE = {
 NOMES_EQUIPAMENTOS = { "arma": {"prefixos": ["Espada", "Machado"], "sufixos": ["Brutal", "Veloz"]}, "capacete": {"prefixos": ["Elmo", "Capacete"], "sufixos": ["da Guarda", "Sombrio"]}, "armadura": {"prefixos": ["Peitoral", "Cota de Malha"], "sufixos": ["de Placas", "Leve"]}, "calca": {"prefixos": ["Grevas", "Calças"], "sufixos": ["de Batalha", "do Viajante"]}, "bota": {"prefixos": ["Botas", "Coturno"], "sufixos": ["de Corrida", "Pesadas"]} }
 INIMIGO_TEMPLATES = { "Goblin Ladrão": {"vida": 20, "forca": 5, "defesa": 2, "agilidade": 8, "caos": 10}, "Orc Guerreiro": {"vida": 40, "forca": 10, "defesa": 5, "agilidade": 3, "caos": 5}, "Lobo das Neves": {"vida": 30, "forca": 8, "defesa": 3, "agilidade": 12, "caos": 15}, "Golem de Pedra": {"vida": 60, "forca": 12, "defesa": 10, "agilidade": 1, "caos": 0}, "Mago Esqueleto": {"vida": 25, "forca": 15, "defesa": 2, "agilidade": 6, "caos": 30} }
 CHEFE_TEMPLATES = { "Lich Tirano": {"vida": 150, "forca": 20, "defesa": 15, "agilidade": 10, "caos": 100}, "Behemoth Colossal": {"vida": 250, "forca": 30, "defesa": 25, "agilidade": 5, "caos": 20}, "Quimera Mutante": {"vida": 180, "forca": 25, "defesa": 10, "agilidade": 20, "caos": 50} }
+# Bônus de cada slot de equipamento: (atributo, regra, parâmetro), com base = nível * 2 e mult = multiplicador da raridade.
+# "faixa": uniform(base, base + p) * mult; "fixo": base * p * mult; "penalidade": -uniform(1, 2); "talvez": "faixa" com CHANCE_BONUS_CAOS.
+BONUS_POR_SLOT = {
+    "arma": [("bonus_forca", "faixa", 3), ("bonus_caos", "talvez", 2)],
+    "capacete": [("bonus_defesa", "faixa", 2), ("bonus_agilidade", "penalidade", None), ("bonus_caos", "talvez", 2)],
+    "armadura": [("bonus_defesa", "faixa", 5), ("bonus_vida", "fixo", 2)],
+    "calca": [("bonus_agilidade", "faixa", 2), ("bonus_vida", "fixo", 1)],
+    "bota": [("bonus_agilidade", "faixa", 2), ("bonus_defesa", "penalidade", None)],
+}
+CHANCE_EQUIPAMENTO = 0.6  # O resto das recompensas são poções.
+CHANCE_BONUS_CAOS = 0.2
 # MODIFICAÇÃO: Adicionada a Poção de Caos
 POCA_TEMPLATES = { "cura": {"nome": "Poção de Cura", "valor": 50}, "restaura_caos": {"nome": "Poção de Caos", "valor": 40}, "buff_forca": {"nome": "Elixir de Força", "valor": 5, "duracao": 3}, "buff_defesa": {"nome": "Poção Casca de Ferro", "valor": 5, "duracao": 3}, "buff_agilidade": {"nome": "Extrato de Agilidade", "valor": 5, "duracao": 3} }
 
+# --- REGRAS DE COMBATE (SEM E/S) ---
+# Resolvem uma ação e devolvem o resultado; quem chama decide o que mostrar e quanto esperar.
+# `rng` é qualquer objeto com a interface do módulo `random` (o próprio módulo ou um `random.Random`).
+# Com um diário ativo (DIARIO, ver diario.py), cada regra também registra o que aconteceu para recuperação.
+# Com um destino de eventos (EVENTOS, ver eventos.py), cada regra também emite um evento tipado; o texto fica com quem o mostra.
+DIARIO = None
+EVENTOS = None
+
+def definir_diario(diario):
+    """Liga (ou desliga, com None) o diário de batalha usado pelas regras."""
+    global DIARIO
+    DIARIO = diario
+
+def definir_eventos(destino):
+    """Liga (ou desliga, com None) o destino dos eventos de combate: qualquer objeto com emitir(evento)."""
+    global EVENTOS
+    EVENTOS = destino
+
+def chance_de_acerto(atacante, alvo): return max(20, min(100, 90 - (alvo.agilidade - atacante.agilidade)))
+def chance_de_fuga(heroi, inimigo): return max(10, min(90, 50 + (heroi.agilidade - inimigo.agilidade)))
+
+def resolver_ataque(atacante, alvo, rng=random):
+    """Rola o acerto do Ataque Básico. Devolve o dano aplicado ou None se errou."""
+    rolagem = rng.randint(1, 100)
+    if rolagem > chance_de_acerto(atacante, alvo):
+        if DIARIO is not None: DIARIO.registrar("erro", a=DIARIO.papel(atacante), r=rolagem)
+        if EVENTOS is not None: EVENTOS.emitir(eventos.Erro(atacante.nome, alvo.nome, rolagem))
+        return None
+    dano = max(1.0, atacante.forca - alvo.defesa * 0.3); alvo.receber_dano(dano)
+    if DIARIO is not None: DIARIO.registrar("dano", a=DIARIO.papel(atacante), alvo=DIARIO.papel(alvo), r=rolagem, v=dano, vida=alvo.vida_atual)
+    if EVENTOS is not None: EVENTOS.emitir(eventos.Acerto(atacante.nome, alvo.nome, rolagem, dano, alvo.vida_atual))
+    return dano
+
+def resolver_habilidade(heroi, alvo, habilidade, rng=random):
+    """Gasta o caos e aplica a habilidade. Devolve (dano, tipo do efeito aplicado ou None), ou None se faltou caos."""
+    if heroi.caos_atual < habilidade['custo']: return None
+    heroi.caos_atual -= habilidade['custo']
+    dano_magico = heroi.forca * (habilidade['multiplicador'] + heroi.proficiencia)
+    if dano_magico > 0: alvo.receber_dano(dano_magico)
+    efeito = habilidade.get('efeito'); aplicado = None; rolagem = None
+    if efeito:
+        rolagem = rng.random()
+        if rolagem < efeito['chance']:
+            if efeito['tipo'] in ['veneno', 'congelado']:
+                alvo.efeitos_status.aplicar(efeito['tipo'], efeito.get('dano', 0), efeito['duracao'] + 1); aplicado = efeito['tipo']
+            elif efeito['tipo'] == 'buff_forca':
+                heroi.buffs_ativos.aplicar('forca', efeito['valor'], efeito['duracao'] + 1); aplicado = efeito['tipo']
+    if DIARIO is not None:
+        DIARIO.registrar("hab", a=DIARIO.papel(heroi), alvo=DIARIO.papel(alvo), n=habilidade['nome'], caos=heroi.caos_atual, v=dano_magico, vida=alvo.vida_atual,
+                         r=rolagem, ef=aplicado, turnos=efeito['duracao'] + 1 if aplicado else None, valor=efeito.get('valor', efeito.get('dano', 0)) if aplicado else None)
+    if EVENTOS is not None:
+        EVENTOS.emitir(eventos.Habilidade(heroi.nome, alvo.nome, habilidade['nome'], dano_magico, alvo.vida_atual, heroi.caos_atual))
+        if aplicado: EVENTOS.emitir(eventos.EfeitoAplicado(heroi.nome if aplicado == 'buff_forca' else alvo.nome, aplicado, efeito.get('valor', efeito.get('dano', 0)), efeito['duracao'] + 1))
+    return dano_magico, aplicado
+
+def resolver_fuga(heroi, inimigo, rng=random):
+    """Rola a fuga. Devolve (escapou, chance, item destruído ou None): uma fuga que falha pode destruir um item equipado."""
+    chance = chance_de_fuga(heroi, inimigo)
+    if rng.randint(1, 100) <= chance: return True, chance, None
+    quebrado = None
+    if rng.random() < CHANCE_QUEBRA_AO_FUGIR:
+        equipados = [slot for slot, item in heroi.equipamentos.items() if item]
+        if equipados:
+            slot = rng.choice(equipados); quebrado = heroi.equipamentos[slot]; heroi.equipamentos[slot] = None
+            if DIARIO is not None: DIARIO.registrar("quebra", slot=slot)
+    return False, chance, quebrado
+
+def resolver_pocao(heroi, pocao_index):
+    """Consome a poção do inventário. Devolve (poção, quanto curou/restaurou ou o valor do buff)."""
+    pocao = heroi.inventario_pocoes.pop(pocao_index)
+    if pocao.tipo == 'cura':
+        quantidade = min(heroi.vida_maxima - heroi.vida_atual, pocao.valor); heroi.vida_atual += quantidade
+    # MODIFICAÇÃO: Lógica para a poção de caos
+    elif pocao.tipo == 'restaura_caos':
+        quantidade = min(heroi.caos_maximo - heroi.caos_atual, pocao.valor); heroi.caos_atual += quantidade
+    else:
+        quantidade = pocao.valor; heroi.buffs_ativos.aplicar(pocao.tipo.split('_')[1], pocao.valor, pocao.duracao + 1)
+    if DIARIO is not None: DIARIO.registrar("pocao", i=pocao_index, tipo=pocao.tipo, v=quantidade, turnos=pocao.duracao + 1, vida=heroi.vida_atual, caos=heroi.caos_atual)
+    if EVENTOS is not None: EVENTOS.emitir(eventos.Pocao(heroi.nome, pocao.nome, pocao.raridade, pocao.tipo, quantidade, pocao.duracao))
+    return pocao, quantidade
+
+def resolver_equipar(heroi, novo_equip):
+    """Troca o item do slot, levando junto a diferença de Vida/Caos máximos para a Vida/Caos atuais. Devolve o item substituído."""
+    item_atual = heroi.equipamentos.get(novo_equip.slot)
+    bonus_vida_antigo = item_atual.bonus_vida if item_atual else 0.0
+    bonus_caos_antigo = item_atual.bonus_caos if item_atual else 0.0
+    heroi.equipamentos[novo_equip.slot] = novo_equip
+    heroi.vida_atual += novo_equip.bonus_vida - bonus_vida_antigo; heroi.caos_atual += novo_equip.bonus_caos - bonus_caos_antigo
+    heroi.vida_atual = min(heroi.vida_maxima, heroi.vida_atual); heroi.caos_atual = min(heroi.caos_maximo, heroi.caos_atual)
+    if DIARIO is not None: DIARIO.registrar("loot", item=DIARIO.item_para_dict(novo_equip), vida=heroi.vida_atual, caos=heroi.caos_atual)
+    if EVENTOS is not None: EVENTOS.emitir(eventos.Loot(heroi.nome, novo_equip.nome, novo_equip.raridade, novo_equip.slot))
+    return item_atual
+
+def resolver_guardar_pocao(heroi, pocao):
+    """Guarda a poção se houver espaço no inventário. Devolve False se estiver cheio."""
+    if len(heroi.inventario_pocoes) >= MAX_POCOES_INVENTARIO: return False
+    heroi.inventario_pocoes.append(pocao)
+    if DIARIO is not None: DIARIO.registrar("loot", item=DIARIO.item_para_dict(pocao))
+    if EVENTOS is not None: EVENTOS.emitir(eventos.Loot(heroi.nome, pocao.nome, pocao.raridade, "pocao"))
+    return True
+
+def resolver_subida_de_nivel(heroi):
+    """Sobe um nível: XP excedente, proficiência e os ganhos fixos de Vida/Caos base. Os pontos livres ficam a cargo de quem chama."""
+    heroi.xp_atual -= heroi.xp_proximo_nivel; heroi.nivel += 1
+    heroi.xp_proximo_nivel = XP_PARA_NIVEL.get(heroi.nivel, float('inf'))
+    heroi.proficiencia += 0.05
+    # MODIFICAÇÃO: Aumento de vida e caos por nível
+    heroi.vida_base += 20
+    heroi.caos_base += 10
+    if EVENTOS is not None: EVENTOS.emitir(eventos.SubidaDeNivel(heroi.nome, heroi.nivel))
+
+def resolver_efeitos(personagem):
+    """Avança um turno de buffs e efeitos. Devolve a lista de eventos (evento, tipo, valor) na ordem em que ocorreram."""
+    # O diário precisa de todo tique que anda contadores, inclusive o que esvazia as tabelas: o teste vem antes de avançar.
+    ocorridos = []; havia_algo = DIARIO is not None and bool(personagem.buffs_ativos or personagem.efeitos_status)
+    buffs = personagem.buffs_ativos.avancar_turno(); efeitos = personagem.efeitos_status.avancar_turno()
+    if not buffs and not efeitos and not havia_algo: return ocorridos  # O caso comum em combate: nada disparou neste tique
+    for tipo, _, expirou in buffs:
+        if expirou: ocorridos.append(('buff_expirou', tipo, 0.0))
+    for tipo, valor, expirou in efeitos:
+        if tipo == 'veneno': personagem.receber_dano(valor); ocorridos.append(('dano_efeito', tipo, valor))
+        if expirou: ocorridos.append(('efeito_expirou', tipo, 0.0))
+    if havia_algo: DIARIO.registrar("tick", a=DIARIO.papel(personagem), vida=personagem.vida_atual)
+    if EVENTOS is not None:
+        for ocorrido, tipo, valor in ocorridos:
+            if ocorrido == 'dano_efeito': EVENTOS.emitir(eventos.DanoDeEfeito(personagem.nome, tipo, valor, personagem.vida_atual))
+            else: EVENTOS.emitir(eventos.EfeitoExpirou(personagem.nome, tipo, ocorrido == 'buff_expirou'))
+    return ocorridos
+
 # --- CLASSES BASE (A ESTRUTURA DO JOGO) ---
 
 class Item:
+    __slots__ = ('nome', 'raridade')
     def __init__(self, nome, raridade): self.nome = nome; self.raridade = raridade
     def nome_formatado(self): cor = RARIDADES[self.raridade]['cor']; icone = "✨" if self.raridade == "raro" else ""; return f"{cor}{self.nome} [{self.raridade.capitalize()}] {icone}{COR_RESET}"
 
 class Equipamento(Item):
+    __slots__ = ('slot', 'bonus_vida', 'bonus_forca', 'bonus_defesa', 'bonus_agilidade', 'bonus_caos')
     def __init__(self, nome, slot, raridade, bonus_vida=0.0, bonus_forca=0.0, bonus_defesa=0.0, bonus_agilidade=0.0, bonus_caos=0.0):
         super().__init__(nome, raridade); self.slot = slot; self.bonus_vida = float(bonus_vida); self.bonus_forca = float(bonus_forca); self.bonus_defesa = float(bonus_defesa); self.bonus_agilidade = float(bonus_agilidade); self.bonus_caos = float(bonus_caos)
     def __str__(self):
@@ -66,6 +221,7 @@ class Equipamento(Item):
         return f"{self.nome_formatado()} ({', '.join(bonus)})"
 
 class Pocao(Item):
+    __slots__ = ('tipo', 'valor', 'duracao')
     def __init__(self, nome, raridade, tipo, valor, duracao=0):
         super().__init__(nome, raridade); self.tipo = tipo; self.valor = float(valor); self.duracao = duracao
     def __str__(self):
@@ -73,52 +229,325 @@ class Pocao(Item):
         elif self.tipo == 'restaura_caos': return f"{self.nome_formatado()} (Restaura {self.valor:.1f} de Caos)"
         else: tipo_str = self.tipo.split('_')[1].upper(); return f"{self.nome_formatado()} (+{self.valor:.1f} {tipo_str} por {self.duracao} turnos)"
 
+# --- REPRESENTAÇÃO COMPACTA DE SLOTS E EFEITOS ---
+# Os cinco slots de equipamento vivem em uma lista de índice fixo e os buffs/efeitos em tabelas com relógio e agenda de
+# expiração próprios, mas continuam expostos com a mesma interface de dict (`equipamentos['arma']`, `buffs_ativos.items()`, `data['turnos_restantes'] -= 1`) que a GUI usa.
+SLOTS_EQUIPAMENTO = ("arma", "capacete", "armadura", "calca", "bota")
+TIPOS_BUFF = ("forca", "defesa", "agilidade")
+TIPOS_EFEITO = ("veneno", "congelado")
+# Efeitos que agem a cada turno enquanto ativos (os outros só contam o tempo até expirar).
+EFEITOS_PERIODICOS = frozenset({"veneno"})
+# O que acontece ao aplicar de novo um buff/efeito ativo: "renovar" troca valor e duração, "maior" fica com o maior
+# valor e a maior duração, "acumular" soma mais uma pilha com duração própria (até MAX_PILHAS_DE_EFEITO; cheia, a que
+# vence primeiro sai). Tipos fora da tabela renovam. Todos renovam hoje, para manter o balanceamento do jogo.
+REGRAS_DE_ACUMULO = {"forca": "renovar", "defesa": "renovar", "agilidade": "renovar", "veneno": "renovar", "congelado": "renovar"}
+MAX_PILHAS_DE_EFEITO = 5
+_INDICE_SLOT = {slot: i for i, slot in enumerate(SLOTS_EQUIPAMENTO)}
+# Marcas de mudança publicadas aos observadores de um Personagem (combináveis com |).
+MUDOU_VIDA, MUDOU_CAOS, MUDOU_ATRIBUTOS, MUDOU_BUFFS, MUDOU_EFEITOS = 1, 2, 4, 8, 16
+MUDOU_TUDO = MUDOU_VIDA | MUDOU_CAOS | MUDOU_ATRIBUTOS | MUDOU_BUFFS | MUDOU_EFEITOS
+_INDICES_DE_TIPOS = {}  # tupla de tipos -> {tipo: índice}, compartilhado por todas as tabelas com os mesmos tipos
+
+class _AtributoBase:
+    """Atributo base (vida_base, forca_base, ...) guardado em `_base[indice]`; alterá-lo invalida o cache de atributos derivados."""
+    __slots__ = ('indice',)
+    def __init__(self, indice): self.indice = indice
+    def __get__(self, obj, tipo=None): return self if obj is None else obj._base[self.indice]
+    def __set__(self, obj, valor): obj._base[self.indice] = valor; obj._agregado = None; obj._mudou(MUDOU_ATRIBUTOS)
+
+class _SlotsDeEquipamento(MutableMapping):
+    """Os cinco slots de equipamento em uma lista fixa. Trocar um item zera os caches de atributos do dono."""
+    __slots__ = ('_itens', '_dono')
+    def __init__(self, dono, dados=None):
+        self._dono = dono; self._itens = [None] * len(SLOTS_EQUIPAMENTO)
+        if dados: self.update(dados)
+    def __getitem__(self, slot): return self._itens[_INDICE_SLOT[slot]]
+    def __setitem__(self, slot, item): self._itens[_INDICE_SLOT[slot]] = item; self._dono._bonus_equip = self._dono._agregado = None; self._dono._mudou(MUDOU_ATRIBUTOS)
+    def __delitem__(self, slot): self[slot] = None
+    def __iter__(self): return iter(SLOTS_EQUIPAMENTO)
+    def __len__(self): return len(SLOTS_EQUIPAMENTO)
+    def __contains__(self, slot): return slot in _INDICE_SLOT
+    def get(self, slot, padrao=None): i = _INDICE_SLOT.get(slot); return padrao if i is None else self._itens[i]
+    def values(self): return list(self._itens)
+    def items(self): return list(zip(SLOTS_EQUIPAMENTO, self._itens))
+    def __repr__(self): return repr(dict(self.items()))
+
+class Efeito:
+    """Uma aplicação (pilha) de buff ou efeito: valor e o tique do relógio da tabela em que expira."""
+    __slots__ = ('tipo', 'valor', 'expira', 'ativo')
+    def __init__(self, tipo, valor, expira): self.tipo = tipo; self.valor = valor; self.expira = expira; self.ativo = True
+    def __repr__(self): return f"Efeito({self.tipo!r}, {self.valor!r}, expira={self.expira})"
+
+class _Registro:
+    """Visão de um tipo ativo de _TabelaDeEfeitos com cara de dict: 'turnos_restantes' (da pilha que dura mais) e 'valor' (ou 'dano', a soma das pilhas)."""
+    __slots__ = ('_tabela', '_indice')
+    def __init__(self, tabela, indice): self._tabela = tabela; self._indice = indice
+    def __getitem__(self, chave):
+        if chave == 'turnos_restantes': return self._tabela._restantes(self._indice)
+        if chave in ('valor', 'dano'): return self._tabela._valores[self._indice]
+        raise KeyError(chave)
+    def __setitem__(self, chave, valor):
+        if chave == 'turnos_restantes': self._tabela._reagendar(self._indice, valor)
+        elif chave in ('valor', 'dano'): self._tabela._definir_valor(self._indice, valor)
+        else: raise KeyError(chave)
+    def get(self, chave, padrao=None):
+        try: return self[chave]
+        except KeyError: return padrao
+    def __repr__(self): return repr({'turnos_restantes': self['turnos_restantes'], 'valor': self['valor']})
+
+class _TabelaDeEfeitos(MutableMapping):
+    """
+    Buffs ou efeitos de status de um personagem. A tabela tem um relógio próprio, que anda um tique por avancar_turno,
+    e cada aplicação é um Efeito com o tique em que expira, agendado num heap. Avançar o turno custa O(1) mais o
+    trabalho do que de fato dispara (os EFEITOS_PERIODICOS ativos e as pilhas que vencem no tique), sem varrer o resto.
+
+    Reaplicar um tipo ativo com `aplicar` segue REGRAS_DE_ACUMULO; atribuir com `tabela[tipo] = {...}` substitui
+    tudo (é o que restaurar um estado salvo usa). Por fora continua com cara de dict, uma entrada por tipo ativo.
+    Entradas que entram, saem ou mudam de valor avisam o dono com `marca` (só a contagem de turnos anda em silêncio).
+    """
+    __slots__ = ('_tipos', '_indices', '_pilhas', '_valores', '_ativos', '_vivos', '_periodicos', '_relogio', '_agenda', '_sequencia', '_dono', '_marca')
+    def __init__(self, tipos, dono=None, dados=None, marca=0):
+        self._tipos = tipos; self._dono = dono; self._marca = marca
+        self._indices = _INDICES_DE_TIPOS.get(tipos) or _INDICES_DE_TIPOS.setdefault(tipos, {t: i for i, t in enumerate(tipos)})
+        self._pilhas = [None] * len(tipos); self._valores = [0.0] * len(tipos); self._ativos = 0; self._vivos = 0; self._periodicos = set()
+        self._relogio = 0; self._agenda = []; self._sequencia = 0  # agenda: heap de (tique, sequência, Efeito)
+        if dados: self.update(dados)
+    def _mudou(self):
+        dono = self._dono  # Buffs não entram no cache de atributos: só há o que fazer se alguém observa o dono
+        if dono is not None and dono._observadores is not None: dono._mudou(self._marca)
+    def _indice(self, tipo):
+        try: return self._indices[tipo]
+        except KeyError: raise KeyError(f"tipo desconhecido: {tipo} (esperado um de {self._tipos})") from None
+
+    # --- Pilhas e agenda ---
+    def _agendar(self, efeito):
+        agenda = self._agenda; self._sequencia += 1; heapq.heappush(agenda, (efeito.expira, self._sequencia, efeito))
+        if len(agenda) > 16 and len(agenda) > 4 * self._vivos:  # Muitas entradas vencidas por renovação: compacta
+            self._agenda = [(t, s, e) for t, s, e in agenda if e.ativo and e.expira == t]; heapq.heapify(self._agenda)
+    def _empilhar(self, i, valor, turnos):
+        pilha = self._pilhas[i]
+        if pilha is None:
+            pilha = self._pilhas[i] = []; self._ativos += 1
+            if self._tipos[i] in EFEITOS_PERIODICOS: self._periodicos.add(i)
+        efeito = Efeito(self._tipos[i], valor, self._relogio + turnos); pilha.append(efeito); self._valores[i] += valor; self._vivos += 1; self._agendar(efeito)
+    def _esvaziar(self, i):
+        pilha = self._pilhas[i]
+        for efeito in pilha: efeito.ativo = False  # As entradas delas na agenda viram lixo, descartado ao sair do heap
+        self._vivos -= len(pilha); self._pilhas[i] = None; self._valores[i] = 0.0; self._ativos -= 1; self._periodicos.discard(i)
+    def _restantes(self, i): return max(e.expira for e in self._pilhas[i]) - self._relogio
+    def _reagendar(self, i, turnos):
+        for efeito in self._pilhas[i]:
+            expira = self._relogio + turnos
+            if expira != efeito.expira: efeito.expira = expira; self._agendar(efeito)
+    def _renovar(self, i, valor, turnos):
+        """Troca valor e duração de um tipo ativo; com uma pilha só (o caso comum) reaproveita o Efeito."""
+        pilha = self._pilhas[i]
+        if len(pilha) > 1: self._esvaziar(i); self._empilhar(i, valor, turnos); return
+        efeito = pilha[0]; efeito.valor = self._valores[i] = valor; expira = self._relogio + turnos
+        if expira != efeito.expira: efeito.expira = expira; self._agendar(efeito)  # A entrada antiga na agenda fica vencida
+    def _definir_valor(self, i, valor):
+        turnos = self._restantes(i); self._esvaziar(i); self._empilhar(i, valor, turnos); self._mudou()
+
+    def aplicar(self, tipo, valor, turnos):
+        """Aplica um buff/efeito seguindo a regra de acúmulo do tipo (REGRAS_DE_ACUMULO; 'renovar' se o tipo não estiver lá)."""
+        i = self._indice(tipo); pilha = self._pilhas[i]; regra = REGRAS_DE_ACUMULO.get(tipo, "renovar")
+        if pilha is None: self._empilhar(i, valor, turnos)
+        elif regra == "renovar": self._renovar(i, valor, turnos)
+        elif regra == "maior":
+            if len(pilha) > 1: self._definir_valor(i, self._valores[i]); pilha = self._pilhas[i]
+            efeito = pilha[0]; expira = self._relogio + turnos
+            if valor > efeito.valor: self._valores[i] = efeito.valor = valor
+            if expira > efeito.expira: efeito.expira = expira; self._agendar(efeito)
+        elif regra == "acumular":
+            if len(pilha) >= MAX_PILHAS_DE_EFEITO:
+                antiga = min(pilha, key=lambda e: e.expira); antiga.ativo = False; pilha.remove(antiga); self._valores[i] -= antiga.valor; self._vivos -= 1
+            self._empilhar(i, valor, turnos)
+        else: raise ValueError(f"regra de acúmulo desconhecida para {tipo}: {regra}")
+        self._mudou()
+    def empilhar(self, tipo, valor, turnos):
+        """Acrescenta uma pilha sem olhar a regra do tipo (para reconstruir um estado pilha por pilha, como em pilhas())."""
+        self._empilhar(self._indice(tipo), valor, turnos); self._mudou()
+    def pilhas(self):
+        """(tipo, turnos restantes, valor) de cada pilha ativa, na ordem dos tipos."""
+        relogio = self._relogio
+        return tuple((e.tipo, e.expira - relogio, e.valor) for pilha in self._pilhas if pilha for e in pilha)
+
+    # --- Interface de dict ---
+    def __getitem__(self, tipo):
+        i = self._indice(tipo)
+        if self._pilhas[i] is None: raise KeyError(tipo)
+        return _Registro(self, i)
+    def __setitem__(self, tipo, data):
+        i = self._indice(tipo); valor = data.get('valor', data.get('dano', 0))
+        if self._pilhas[i] is None: self._empilhar(i, valor, data['turnos_restantes'])
+        else: self._renovar(i, valor, data['turnos_restantes'])
+        self._mudou()
+    def __delitem__(self, tipo):
+        i = self._indice(tipo)
+        if self._pilhas[i] is None: raise KeyError(tipo)
+        self._esvaziar(i); self._mudou()
+    def __iter__(self): return iter(self.keys())
+    def keys(self): return [t for t, pilha in zip(self._tipos, self._pilhas) if pilha is not None]
+    def items(self): return [(t, _Registro(self, i)) for i, t in enumerate(self._tipos) if self._pilhas[i] is not None]
+    def __len__(self): return self._ativos
+    def __contains__(self, tipo): i = self._indices.get(tipo); return i is not None and self._pilhas[i] is not None
+    def get(self, tipo, padrao=None): return self[tipo] if tipo in self else padrao
+    def valor(self, tipo):
+        """Valor do buff/efeito ativo (soma das pilhas), ou 0 se inativo (atalho sem criar o _Registro)."""
+        i = self._indices.get(tipo)
+        return 0 if i is None else self._valores[i]
+    def avancar_turno(self):
+        """
+        Anda um tique e devolve [(tipo, valor, expirou)] de quem disparou, na ordem dos tipos: cada periódico ativo
+        (com o valor do começo do tique, mesmo no tique em que expira) e cada tipo que perdeu pilhas. O resto não aparece.
+        """
+        self._relogio = relogio = self._relogio + 1; agenda = self._agenda; periodicos = self._periodicos
+        if not agenda or agenda[0][0] > relogio:  # Nada vence neste tique: só os periódicos disparam
+            if not periodicos: return []
+            return [(self._tipos[i], self._valores[i], False) for i in (periodicos if len(periodicos) == 1 else sorted(periodicos))]
+        pilhas = self._pilhas; valores = self._valores; antes = {i: valores[i] for i in periodicos} if periodicos else {}; venceu = False
+        while agenda and agenda[0][0] <= relogio:
+            expira, _, efeito = heapq.heappop(agenda)
+            if not efeito.ativo or efeito.expira != expira: continue  # Removido ou renovado depois de agendado
+            i = self._indices[efeito.tipo]; pilha = pilhas[i]
+            if i not in antes: antes[i] = valores[i]
+            efeito.ativo = False; pilha.remove(efeito); valores[i] -= efeito.valor; self._vivos -= 1; venceu = True
+            if not pilha: pilhas[i] = None; valores[i] = 0.0; self._ativos -= 1; periodicos.discard(i)
+        if venceu: self._mudou()
+        return [(self._tipos[i], antes[i], pilhas[i] is None) for i in (antes if len(antes) == 1 else sorted(antes))]
+    def clear(self):
+        if self._ativos:
+            for i, pilha in enumerate(self._pilhas):
+                if pilha is not None: self._esvaziar(i)
+            self._agenda = []; self._vivos = 0; self._mudou()
+    def __repr__(self): return repr({t: self[t] for t in self})
+
 class Personagem:
+    __slots__ = ('nome', 'nivel', '_vida_atual', '_caos_atual', '_base', '_agregado', '_bonus_equip', '_equipamentos', '_buffs_ativos', '_efeitos_status', '_observadores', '__weakref__')
+    vida_base = _AtributoBase(0); forca_base = _AtributoBase(1); defesa_base = _AtributoBase(2); agilidade_base = _AtributoBase(3); caos_base = _AtributoBase(4)
+
     def __init__(self, nome, vida_base, forca_base, defesa_base, agilidade_base, caos_base, nivel=1):
-        self.nome = nome; self.vida_base = float(vida_base); self.forca_base = float(forca_base); self.defesa_base = float(defesa_base); self.agilidade_base = float(agilidade_base); self.caos_base = float(caos_base); self.nivel = nivel
-        self.vida_atual = self.vida_base; self.caos_atual = self.caos_base
-        self.equipamentos = {"arma": None, "capacete": None, "armadura": None, "calca": None, "bota": None}
-        self.buffs_ativos = {}
-        self.efeitos_status = {}
+        self._base = [float(vida_base), float(forca_base), float(defesa_base), float(agilidade_base), float(caos_base)]
+        self._agregado = None; self._bonus_equip = (0.0, 0.0, 0.0, 0.0, 0.0); self._observadores = None
+        self.nome = nome; self.nivel = nivel
+        self._vida_atual = self._base[0]; self._caos_atual = self._base[4]
+        self._equipamentos = _SlotsDeEquipamento(self)
+        self._buffs_ativos = _TabelaDeEfeitos(TIPOS_BUFF, self, marca=MUDOU_BUFFS | MUDOU_ATRIBUTOS)
+        self._efeitos_status = _TabelaDeEfeitos(TIPOS_EFEITO, self, marca=MUDOU_EFEITOS)
+
+    # --- Observadores ---
+    # Quem exibe o personagem (os painéis de status da GUI) se inscreve com observar(callback) e recebe
+    # callback(personagem, marca) a cada mudança, com as marcas MUDOU_*. Sem observadores, avisar custa um teste de None.
+    def observar(self, callback):
+        if self._observadores is None: self._observadores = []
+        self._observadores.append(callback)
+
+    def deixar_de_observar(self, callback):
+        if self._observadores and callback in self._observadores: self._observadores.remove(callback)
+        if not self._observadores: self._observadores = None
+
+    def _mudou(self, marca):
+        """Avisa os observadores (quem muda base ou equipamento zera o cache de atributos antes de chamar)."""
+        if self._observadores is not None:
+            for callback in tuple(self._observadores): callback(self, marca)
+
+    @property
+    def vida_atual(self): return self._vida_atual
+    @vida_atual.setter
+    def vida_atual(self, valor):
+        if valor != self._vida_atual:
+            self._vida_atual = valor
+            if self._observadores is not None: self._mudou(MUDOU_VIDA)
+    @property
+    def caos_atual(self): return self._caos_atual
+    @caos_atual.setter
+    def caos_atual(self, valor):
+        if valor != self._caos_atual:
+            self._caos_atual = valor
+            if self._observadores is not None: self._mudou(MUDOU_CAOS)
+
+    # --- Atributos derivados em cache ---
+    # `_bonus_equip` guarda a soma dos cinco slots e só muda quando o equipamento muda; `_agregado` junta base + equipamento
+    # e é zerado por mudanças de base ou equipamento (o descritor da base e a tabela de slots cuidam disso, inclusive ao
+    # reatribuir a tabela inteira). Buffs ficam fora do cache: mudam a cada turno de combate, então força, defesa e
+    # agilidade somam na leitura o valor corrente da tabela de buffs, e aplicar ou vencer um buff não invalida nada.
+    @property
+    def equipamentos(self): return self._equipamentos
+    @equipamentos.setter
+    def equipamentos(self, valor): self._equipamentos = _SlotsDeEquipamento(self, valor); self._bonus_equip = self._agregado = None; self._mudou(MUDOU_ATRIBUTOS)
+    @property
+    def buffs_ativos(self): return self._buffs_ativos
+    @buffs_ativos.setter
+    def buffs_ativos(self, valor): self._buffs_ativos = _TabelaDeEfeitos(TIPOS_BUFF, self, valor, MUDOU_BUFFS | MUDOU_ATRIBUTOS); self._mudou(MUDOU_BUFFS | MUDOU_ATRIBUTOS)
+    @property
+    def efeitos_status(self): return self._efeitos_status
+    @efeitos_status.setter
+    def efeitos_status(self, valor): self._efeitos_status = _TabelaDeEfeitos(TIPOS_EFEITO, self, valor, MUDOU_EFEITOS); self._mudou(MUDOU_EFEITOS)
+
+    def _somar_equipamentos(self):
+        forca = defesa = agilidade = vida = caos = 0.0
+        for eq in self._equipamentos._itens:
+            if eq: forca += eq.bonus_forca; defesa += eq.bonus_defesa; agilidade += eq.bonus_agilidade; vida += eq.bonus_vida; caos += eq.bonus_caos
+        return forca, defesa, agilidade, vida, caos
+
+    def _somar_atributos(self):
+        """(força, defesa, agilidade, vida máxima, caos máximo) sem buffs, a partir da base e do bônus de equipamento em cache."""
+        eq = self._bonus_equip
+        if eq is None: eq = self._bonus_equip = self._somar_equipamentos()
+        base = self._base
+        return (base[1] + eq[0], base[2] + eq[1], base[3] + eq[2], base[0] + eq[3], base[4] + eq[4])
+
+    def _recalcular_do_zero(self):
+        """Recálculo completo, sem nenhum cache; usado pelo modo VERIFICAR_CACHE_ATRIBUTOS."""
+        itens = [eq for eq in self._equipamentos.values() if eq]
+        return (self.forca_base + sum(eq.bonus_forca for eq in itens),
+                self.defesa_base + sum(eq.bonus_defesa for eq in itens),
+                self.agilidade_base + sum(eq.bonus_agilidade for eq in itens),
+                self.vida_base + sum(eq.bonus_vida for eq in itens),
+                self.caos_base + sum(eq.bonus_caos for eq in itens))
+
+    def _atributos(self):
+        agregado = self._agregado
+        if agregado is None: agregado = self._agregado = self._somar_atributos()
+        if VERIFICAR_CACHE_ATRIBUTOS:
+            esperado = self._recalcular_do_zero()
+            if any(abs(a - b) > 1e-9 for a, b in zip(agregado, esperado)): raise AssertionError(f"Cache de atributos desatualizado em {self.nome}: {agregado} != {esperado}")
+        return agregado
+
+    def invalidar_atributos(self):
+        """Força o recálculo dos atributos derivados na próxima leitura (para quem altera um item no lugar)."""
+        self._bonus_equip = self._agregado = None; self._mudou(MUDOU_ATRIBUTOS)
 
+    # _valores da tabela de buffs segue a ordem de TIPOS_BUFF: 0 força, 1 defesa, 2 agilidade.
     @property
-    def forca(self): return self.forca_base + sum(eq.bonus_forca for eq in self.equipamentos.values() if eq) + self.buffs_ativos.get('forca', {'valor': 0})['valor']
+    def forca(self): return self._atributos()[0] + self._buffs_ativos._valores[0]
     @property
-    def defesa(self): return self.defesa_base + sum(eq.bonus_defesa for eq in self.equipamentos.values() if eq) + self.buffs_ativos.get('defesa', {'valor': 0})['valor']
+    def defesa(self): return self._atributos()[1] + self._buffs_ativos._valores[1]
     @property
-    def agilidade(self): return self.agilidade_base + sum(eq.bonus_agilidade for eq in self.equipamentos.values() if eq) + self.buffs_ativos.get('agilidade', {'valor': 0})['valor']
+    def agilidade(self): return self._atributos()[2] + self._buffs_ativos._valores[2]
     @property
-    def vida_maxima(self): return self.vida_base + sum(eq.bonus_vida for eq in self.equipamentos.values() if eq)
+    def vida_maxima(self): return self._atributos()[3]
     @property
-    def caos_maximo(self): return self.caos_base + sum(eq.bonus_caos for eq in self.equipamentos.values() if eq)
+    def caos_maximo(self): return self._atributos()[4]
 
     def atacar(self, alvo):
         if 'congelado' in self.efeitos_status:
-            print(f"🥶 {self.nome} está congelado e não pode se mover!"); time.sleep(1); return
+            print(f"🥶 {self.nome} está congelado e não pode se mover!"); RITMO.pausar(1); return
 
         print(f"\n💥 {self.nome} usa um Ataque Básico contra {alvo.nome}!")
-        time.sleep(1); chance_acerto = 90 - (alvo.agilidade - self.agilidade); chance_acerto = max(20, min(100, chance_acerto))
-        if random.randint(1, 100) > chance_acerto: print(f"   💨 ERROU!"); time.sleep(1); return
-        reducao_de_dano = alvo.defesa * 0.3; dano = max(1.0, self.forca - reducao_de_dano)
-        print(f"   🎯 Acertou! Dano Físico causado: {dano:.1f}!"); alvo.receber_dano(dano); time.sleep(1)
+        RITMO.pausar(1); dano = resolver_ataque(self, alvo)
+        if dano is None: print(f"   💨 ERROU!"); RITMO.pausar(1); return
+        print(f"   🎯 Acertou! Dano Físico causado: {dano:.1f}!"); RITMO.pausar(1)
 
-    def receber_dano(self, dano): self.vida_atual -= dano; self.vida_atual = max(0.0, self.vida_atual)
-    def esta_vivo(self): return self.vida_atual > 0
+    def receber_dano(self, dano): self.vida_atual = max(0.0, self._vida_atual - dano)
+    def esta_vivo(self): return self._vida_atual > 0
 
     def processar_efeitos_e_buffs(self):
-        for tipo, data in list(self.buffs_ativos.items()):
-            data['turnos_restantes'] -= 1
-            if data['turnos_restantes'] <= 0: print(f"O efeito do buff de {tipo.upper()} acabou."); del self.buffs_ativos[tipo]; time.sleep(1)
-        
-        for tipo, data in list(self.efeitos_status.items()):
-            if tipo == 'veneno':
-                dano_veneno = data['dano']
-                print(f"🐍 {self.nome} sofre {dano_veneno:.1f} de dano de veneno.")
-                self.receber_dano(dano_veneno); time.sleep(1)
-            
-            data['turnos_restantes'] -= 1
-            if data['turnos_restantes'] <= 0:
-                print(f"O efeito de {tipo.upper()} em {self.nome} acabou."); del self.efeitos_status[tipo]; time.sleep(1)
+        for evento, tipo, valor in resolver_efeitos(self):
+            if evento == 'buff_expirou': print(f"O efeito do buff de {tipo.upper()} acabou.")
+            elif evento == 'dano_efeito': print(f"🐍 {self.nome} sofre {valor:.1f} de dano de veneno.")
+            else: print(f"O efeito de {tipo.upper()} em {self.nome} acabou.")
+            RITMO.pausar(1)
 
 
     def mostrar_status(self):
@@ -140,11 +569,13 @@ class Personagem:
 
 
 class Chefao(Personagem):
+    __slots__ = ()
     def __init__(self, nome, vida_base, forca_base, defesa_base, agilidade_base, caos_base, nivel=1):
         super().__init__(nome, vida_base, forca_base, defesa_base, agilidade_base, caos_base, nivel)
         self.nome = f"🔥 {nome} 🔥"
 
 class Heroi(Personagem):
+    __slots__ = ('classe', 'xp_atual', 'xp_proximo_nivel', 'inventario_pocoes', 'proficiencia')
     def __init__(self, nome, classe, vida_base, forca_base, defesa_base, agilidade_base, caos_base):
         super().__init__(nome, vida_base, forca_base, defesa_base, agilidade_base, caos_base, nivel=1)
         self.classe = classe; self.xp_atual = 0; self.xp_proximo_nivel = XP_PARA_NIVEL[self.nivel]; self.inventario_pocoes = []; self.proficiencia = 0.0
@@ -152,74 +583,50 @@ class Heroi(Personagem):
     def ganhar_xp(self, quantidade):
         if self.nivel >= 5: return
         self.xp_atual += quantidade
-        print(f"\n✨ Você ganhou {quantidade} de XP! ({self.xp_atual:.0f}/{self.xp_proximo_nivel})"); time.sleep(1)
+        print(f"\n✨ Você ganhou {quantidade} de XP! ({self.xp_atual:.0f}/{self.xp_proximo_nivel})"); RITMO.pausar(1)
         while self.xp_atual >= self.xp_proximo_nivel and self.nivel < 5: self.subir_de_nivel()
 
     def subir_de_nivel(self):
-        xp_excedente = self.xp_atual - self.xp_proximo_nivel; self.nivel += 1; self.xp_atual = xp_excedente
-        self.xp_proximo_nivel = XP_PARA_NIVEL.get(self.nivel, float('inf'))
-        self.proficiencia += 0.05
-        # MODIFICAÇÃO: Aumento de vida e caos por nível
-        self.vida_base += 20
-        self.caos_base += 10
+        resolver_subida_de_nivel(self)
         limpar_tela()
-        print("\n🎉🎉🎉 LEVEL UP! 🎉🎉🎉"); print(f"Você alcançou o Nível {self.nivel}!"); time.sleep(2)
+        print("\n🎉🎉🎉 LEVEL UP! 🎉🎉🎉"); print(f"Você alcançou o Nível {self.nivel}!"); RITMO.pausar(2)
         print(f"Sua proficiência com habilidades aumentou! Vida e Caos base também aumentaram.")
         distribuir_pontos_nivel(self, PONTOS_POR_NIVEL)
         self.vida_atual = self.vida_maxima; self.caos_atual = self.caos_maximo
-        print("Seus atributos foram fortalecidos e sua Vida/Caos foram restaurados!"); time.sleep(3)
+        print("Seus atributos foram fortalecidos e sua Vida/Caos foram restaurados!"); RITMO.pausar(3)
 
     def usar_habilidade(self, alvo, habilidade):
-        custo = habilidade['custo']
-        if self.caos_atual < custo: print("Caos insuficiente para usar esta habilidade!"); time.sleep(2); return False
-        
-        self.caos_atual -= custo
-        multiplicador = habilidade['multiplicador'] + self.proficiencia
-        dano_magico = self.forca * multiplicador
+        resultado = resolver_habilidade(self, alvo, habilidade)
+        if resultado is None: print("Caos insuficiente para usar esta habilidade!"); RITMO.pausar(2); return False
+        dano_magico, efeito_aplicado = resultado
 
         print(f"\n✨ {self.nome} usa {habilidade['nome']}!")
-        time.sleep(1)
+        RITMO.pausar(1)
         
         if dano_magico > 0:
-            print(f"   Dano Mágico causado: {dano_magico:.1f}! (Ignora defesa)"); alvo.receber_dano(dano_magico)
+            print(f"   Dano Mágico causado: {dano_magico:.1f}! (Ignora defesa)")
         
-        efeito = habilidade.get('efeito')
-        if efeito and random.random() < efeito['chance']:
-            if efeito['tipo'] in ['veneno', 'congelado']:
-                print(f"   � O alvo foi afetado por {efeito['tipo'].upper()}!")
-                alvo.efeitos_status[efeito['tipo']] = {'turnos_restantes': efeito['duracao'] + 1, 'dano': efeito.get('dano', 0)}
-            elif efeito['tipo'] == 'buff_forca':
-                print(f"   💪 Você se sente mais forte!")
-                self.buffs_ativos['forca'] = {'valor': efeito['valor'], 'turnos_restantes': efeito['duracao'] + 1}
+        if efeito_aplicado in ['veneno', 'congelado']:
+            print(f"   � O alvo foi afetado por {efeito_aplicado.upper()}!")
+        elif efeito_aplicado == 'buff_forca':
+            print(f"   💪 Você se sente mais forte!")
         
-        time.sleep(1); return True
+        RITMO.pausar(1); return True
 
     def usar_pocao(self, pocao_index):
-        pocao = self.inventario_pocoes.pop(pocao_index); print(f"\nVocê usou {pocao.nome_formatado()}!")
-        if pocao.tipo == 'cura':
-            vida_curada = min(self.vida_maxima - self.vida_atual, pocao.valor); self.vida_atual += vida_curada
-            print(f"   Você recuperou {vida_curada:.1f} de vida.")
-        # MODIFICAÇÃO: Lógica para a poção de caos
-        elif pocao.tipo == 'restaura_caos':
-            caos_recuperado = min(self.caos_maximo - self.caos_atual, pocao.valor); self.caos_atual += caos_recuperado
-            print(f"   Você recuperou {caos_recuperado:.1f} de caos.")
-        else:
-            tipo_buff = pocao.tipo.split('_')[1]; self.buffs_ativos[tipo_buff] = {'valor': pocao.valor, 'turnos_restantes': pocao.duracao + 1}
-            print(f"   Seu atributo {tipo_buff.upper()} aumentou em {pocao.valor:.1f} por {pocao.duracao} turnos!")
-        time.sleep(2)
+        pocao, quantidade = resolver_pocao(self, pocao_index); print(f"\nVocê usou {pocao.nome_formatado()}!")
+        if pocao.tipo == 'cura': print(f"   Você recuperou {quantidade:.1f} de vida.")
+        elif pocao.tipo == 'restaura_caos': print(f"   Você recuperou {quantidade:.1f} de caos.")
+        else: print(f"   Seu atributo {pocao.tipo.split('_')[1].upper()} aumentou em {pocao.valor:.1f} por {pocao.duracao} turnos!")
+        RITMO.pausar(2)
 
     def avaliar_e_equipar_item(self, novo_equip):
         limpar_tela(); print("✨ AVALIANDO ITEM ✨"); print(f"Item novo: {novo_equip}"); item_atual = self.equipamentos[novo_equip.slot]
         print(f"Equipado atualmente: {item_atual if item_atual else 'Nada'}")
-        escolha = input("\nDeseja equipar o novo item? (S/N) ").upper()
+        escolha = entrada("\nDeseja equipar o novo item? (S/N) ").upper()
         if escolha == 'S':
-            bonus_vida_antigo = item_atual.bonus_vida if item_atual else 0.0
-            bonus_caos_antigo = item_atual.bonus_caos if item_atual else 0.0
             if item_atual: print(f"   Substituindo {item_atual.nome_formatado()}...")
-            self.equipamentos[novo_equip.slot] = novo_equip
-            delta_vida = novo_equip.bonus_vida - bonus_vida_antigo; delta_caos = novo_equip.bonus_caos - bonus_caos_antigo
-            self.vida_atual += delta_vida; self.caos_atual += delta_caos
-            self.vida_atual = min(self.vida_maxima, self.vida_atual); self.caos_atual = min(self.caos_maximo, self.caos_atual)
+            resolver_equipar(self, novo_equip)
             print(f"   {self.nome} equipou {novo_equip.nome_formatado()}."); return True
         else: print("Você decidiu não equipar este item."); return False
 
@@ -234,43 +641,272 @@ class Heroi(Personagem):
         else: print("   Vazio")
         print("--------------------")
 
+# --- RITMO DO CONSOLE (PAUSAS) ---
+# As pausas dramáticas do console passam todas por RITMO.pausar(); as regras (resolver_*) nunca esperam.
+# O modo vem de RPG_RITMO (normal, rapido, instantaneo) e pode ser trocado no menu principal.
+def _tecla_pressionada():
+    """Verifica, sem bloquear, se o jogador apertou uma tecla (ENTER fora do Windows) e a consome."""
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            if msvcrt.kbhit(): msvcrt.getwch(); return True
+            return False
+        import select
+        if not sys.stdin.isatty(): return False
+        pronto, _, _ = select.select([sys.stdin], [], [], 0)
+        if pronto: sys.stdin.readline(); return True
+    except (OSError, ValueError): pass
+    return False
+
+class Ritmo:
+    """Serviço de pausas do console. `relogio` e `tecla_pressionada` podem ser trocados (testes, servidor, GUI)."""
+    MODOS = {"normal": 1.0, "rapido": 0.25, "instantaneo": 0.0}
+    INTERVALO_DE_CHECAGEM = 0.05
+
+    def __init__(self, modo="normal", relogio=time.sleep, tecla_pressionada=_tecla_pressionada):
+        if modo not in self.MODOS: modo = "normal"
+        self.modo = modo; self._dormir = relogio; self._tecla_pressionada = tecla_pressionada; self.pulando = False
+
+    def pausar(self, segundos):
+        """Espera `segundos` escalados pelo modo. Uma tecla durante a espera pula esta e as próximas pausas até a próxima entrada."""
+        restante = segundos * self.MODOS[self.modo]
+        if restante <= 0 or self.pulando: return
+        sys.stdout.flush()  # A Tela do console apresenta o quadro antes de esperar
+        fim = time.monotonic() + restante
+        while True:
+            if self._tecla_pressionada(): self.pulando = True; return
+            falta = fim - time.monotonic()
+            if falta <= 0: return
+            self._dormir(min(falta, self.INTERVALO_DE_CHECAGEM))
+
+    def retomar(self): self.pulando = False
+
+    def proximo_modo(self):
+        modos = list(self.MODOS); self.modo = modos[(modos.index(self.modo) + 1) % len(modos)]; return self.modo
+
+RITMO = Ritmo(os.environ.get("RPG_RITMO", "normal"))
+
+def definir_ritmo(ritmo):
+    """Injeta outro serviço de pausas no motor do console."""
+    global RITMO
+    RITMO = ritmo
+
+def entrada(prompt=""):
+    """input() do jogo: cada nova pergunta ao jogador encerra o "pular pausas" pedido na tela anterior."""
+    RITMO.retomar(); return input(prompt) if TELA is None else TELA.entrada(prompt)
+
+# --- TELA DO CONSOLE ---
+# O main() do console instala uma tela.Tela como sys.stdout: cada limpar_tela() começa um quadro fora da tela, e só as
+# linhas que mudaram são escritas, num único write, quando o jogo espera o jogador. Sem ela, limpar_tela() é um escape ANSI.
+TELA = None
+
+def definir_tela(tela_nova):
+    """Troca o renderizador do console (None volta ao stdout de antes)."""
+    global TELA
+    if TELA is not None: TELA.desinstalar()
+    TELA = tela_nova
+    if TELA is not None: TELA.instalar()
+
+def limpar_tela(): TELA.limpar() if TELA is not None else tela.limpar(sys.stdout)
+
 # --- BANCO DE DADOS E FUNÇÕES GLOBAIS ---
-HEROIS_CRIADOS = {}
-def limpar_tela(): os.system('cls' if os.name == 'nt' else 'clear')
-def obter_raridade():
-    roll = random.random(); cumulative_chance = 0
-    for raridade in ["comum", "incomum", "raro"]:
-        data = RARIDADES[raridade]
-        cumulative_chance += data['chance'];
-        if roll < cumulative_chance: return raridade
-    return "comum"
-
-def gerar_inimigo(nivel_heroi):
-    nome_template = random.choice(list(INIMIGO_TEMPLATES.keys())); stats_base = INIMIGO_TEMPLATES[nome_template]
+# Heróis ficam em SQLite (RPG_BANCO_HEROIS, padrão herois.db ao lado do jogo); o repositório tem a interface de um dict.
+CAMINHO_BANCO_HEROIS = os.environ.get("RPG_BANCO_HEROIS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "herois.db"))
+HEROIS_CRIADOS = persistencia.RepositorioDeHerois(sys.modules[__name__], CAMINHO_BANCO_HEROIS)
+atexit.register(HEROIS_CRIADOS.fechar)
+# Diário da masmorra em andamento (RPG_DIARIO, padrão masmorra.diario ao lado do jogo), para retomar depois de uma queda.
+CAMINHO_DIARIO = os.environ.get("RPG_DIARIO", os.path.join(os.path.dirname(os.path.abspath(__file__)), "masmorra.diario"))
+# Métricas por fase do turno (RPG_METRICAS: arquivo .json, ou .prom para o Prometheus, reescrito no fim de cada masmorra).
+# Sem a variável ficam desligadas e nenhuma função do jogo é embrulhada.
+CAMINHO_METRICAS = os.environ.get("RPG_METRICAS")
+METRICAS = None
+# Eventos de combate em JSON Lines (RPG_EVENTOS: arquivo, girado por tamanho), para análise offline. Sem a variável, nenhum evento é montado.
+CAMINHO_EVENTOS = os.environ.get("RPG_EVENTOS")
+
+def definir_metricas(metricas_novas, alvos_extras=()):
+    """Liga (ou desliga, com None) a instrumentação por fase; `alvos_extras` são (dono, atributo, fase) da interface."""
+    global METRICAS
+    if METRICAS is not None: METRICAS.desinstrumentar()
+    METRICAS = metricas_novas
+    if METRICAS is not None: METRICAS.instrumentar(metricas.alvos_do_jogo(sys.modules[__name__]) + list(alvos_extras))
+
+def escalar_inimigo(stats_base, nivel_heroi):
+    """Atributos finais (vida, força, defesa, agilidade, caos) de um inimigo comum no nível do herói."""
     pontos_extras = (nivel_heroi - 1) * 8
-    vida_final = stats_base["vida"] + pontos_extras * 2; forca_final = stats_base["forca"] + pontos_extras * 0.5; defesa_final = stats_base["defesa"] + pontos_extras * 0.3; agilidade_final = stats_base["agilidade"] + pontos_extras * 0.2; caos_final = stats_base["caos"]
-    return Personagem(f"{nome_template} (N{nivel_heroi})", vida_final, forca_final, defesa_final, agilidade_final, caos_final, nivel=nivel_heroi)
+    return stats_base["vida"] + pontos_extras * 2, stats_base["forca"] + pontos_extras * 0.5, stats_base["defesa"] + pontos_extras * 0.3, stats_base["agilidade"] + pontos_extras * 0.2, stats_base["caos"]
 
-def gerar_chefe(nivel_heroi):
-    nome_template = random.choice(list(CHEFE_TEMPLATES.keys())); stats_base = CHEFE_TEMPLATES[nome_template]
+def escalar_chefe(stats_base, nivel_heroi):
+    """Atributos finais (vida, força, defesa, agilidade, caos) de um chefe no nível do herói."""
     pontos_extras = (nivel_heroi - 1) * 12
-    vida_final = stats_base["vida"] + pontos_extras * 4; forca_final = stats_base["forca"] + pontos_extras * 0.6; defesa_final = stats_base["defesa"] + pontos_extras * 0.4; agilidade_final = stats_base["agilidade"] + pontos_extras * 0.2; caos_final = stats_base["caos"]
-    return Chefao(f"{nome_template} (N{nivel_heroi})", vida_final, forca_final, defesa_final, agilidade_final, caos_final, nivel=nivel_heroi)
-
-def gerar_recompensa_aleatoria(nivel_batalha=1):
-    if random.random() > 0.4:
-        raridade = obter_raridade(); multiplicador = RARIDADES[raridade]['multiplicador']; slot = random.choice(list(NOMES_EQUIPAMENTOS.keys())); bonus_base = nivel_batalha * 2
-        prefixo = random.choice(NOMES_EQUIPAMENTOS[slot]["prefixos"]); sufixo = random.choice(NOMES_EQUIPAMENTOS[slot]["sufixos"]); nome_item = f"{prefixo} {sufixo}"
-        bonus_caos = (random.uniform(bonus_base, bonus_base + 2) * multiplicador) if random.random() < 0.2 else 0
-        if slot == "arma": return Equipamento(nome_item, slot, raridade, bonus_forca=random.uniform(bonus_base, bonus_base + 3) * multiplicador, bonus_caos=bonus_caos)
-        if slot == "capacete": return Equipamento(nome_item, slot, raridade, bonus_defesa=random.uniform(bonus_base, bonus_base + 2) * multiplicador, bonus_agilidade=-random.uniform(1, 2), bonus_caos=bonus_caos)
-        if slot == "armadura": return Equipamento(nome_item, slot, raridade, bonus_defesa=random.uniform(bonus_base, bonus_base + 5) * multiplicador, bonus_vida=bonus_base*2*multiplicador)
-        if slot == "calca": return Equipamento(nome_item, slot, raridade, bonus_agilidade=random.uniform(bonus_base, bonus_base + 2) * multiplicador, bonus_vida=bonus_base*multiplicador)
-        if slot == "bota": return Equipamento(nome_item, slot, raridade, bonus_agilidade=random.uniform(bonus_base, bonus_base + 2) * multiplicador, bonus_defesa=-random.uniform(1, 2))
-    else:
-        raridade = obter_raridade(); multiplicador = RARIDADES[raridade]['multiplicador']; tipo_pocao = random.choice(list(POCA_TEMPLATES.keys())); template = POCA_TEMPLATES[tipo_pocao]
-        valor_final = template.get('valor', 0) * multiplicador
-        return Pocao(template['nome'], raridade, tipo_pocao, valor_final, template.get('duracao', 0))
+    return stats_base["vida"] + pontos_extras * 4, stats_base["forca"] + pontos_extras * 0.6, stats_base["defesa"] + pontos_extras * 0.4, stats_base["agilidade"] + pontos_extras * 0.2, stats_base["caos"]
+
+# Linhas escaladas por nível: (nome passado ao construtor, nome exibido, atributos), calculadas uma vez por nível.
+_LINHAS_INIMIGOS = {}; _LINHAS_CHEFES = {}
+
+def montar_linhas_de_inimigos(templates, nivel_heroi):
+    # O mesmo objeto nos dois nomes: o pickle do cache de conteúdo grava cada nome uma vez só.
+    return tuple((nome, nome, tuple(map(float, escalar_inimigo(s, nivel_heroi)))) for nome, s in ((f"{t} (N{nivel_heroi})", s) for t, s in templates.items()))
+
+def montar_linhas_de_chefes(templates, nivel_heroi):
+    return tuple((f"{t} (N{nivel_heroi})", f"🔥 {t} (N{nivel_heroi}) 🔥", tuple(map(float, escalar_chefe(s, nivel_heroi)))) for t, s in templates.items())
+
+def linhas_de_inimigos(nivel_heroi):
+    linhas = _LINHAS_INIMIGOS.get(nivel_heroi)
+    if linhas is None: linhas = _LINHAS_INIMIGOS[nivel_heroi] = montar_linhas_de_inimigos(INIMIGO_TEMPLATES, nivel_heroi)
+    return linhas
+
+def linhas_de_chefes(nivel_heroi):
+    linhas = _LINHAS_CHEFES.get(nivel_heroi)
+    if linhas is None: linhas = _LINHAS_CHEFES[nivel_heroi] = montar_linhas_de_chefes(CHEFE_TEMPLATES, nivel_heroi)
+    return linhas
+
+def limpar_tabelas_de_escala():
+    """Descarta as linhas escaladas (necessário se INIMIGO_TEMPLATES/CHEFE_TEMPLATES mudarem; definir_conteudo já faz isso)."""
+    _LINHAS_INIMIGOS.clear(); _LINHAS_CHEFES.clear()
+
+def gerar_inimigo(nivel_heroi, rng=random):
+    nome, _, atributos = rng.choice(linhas_de_inimigos(nivel_heroi))
+    return Personagem(nome, *atributos, nivel=nivel_heroi)
+
+def gerar_chefe(nivel_heroi, rng=random):
+    nome, _, atributos = rng.choice(linhas_de_chefes(nivel_heroi))
+    return Chefao(nome, *atributos, nivel=nivel_heroi)
+
+class PoolDeInimigos:
+    """
+    Reaproveita inimigos entre encontros em simulações longas: `liberar` devolve o inimigo ao pool e os `gerar_*`
+    reiniciam um livre (atributos, vida, caos, buffs e efeitos) em vez de alocar outro. Só aceita de volta inimigos
+    gerados por ele, e quem libera não pode mais usar o objeto.
+    """
+    def __init__(self): self._livres = {Personagem: [], Chefao: []}
+
+    def _obter(self, classe, linha, nivel):
+        nome, nome_exibido, atributos = linha; livres = self._livres[classe]
+        if not livres: return classe(nome, *atributos, nivel=nivel)
+        inimigo = livres.pop()
+        # Inimigo não tem equipamento: os atributos derivados são a própria linha, sem passar pelo recálculo.
+        inimigo._base[:] = atributos; inimigo._agregado = (atributos[1], atributos[2], atributos[3], atributos[0], atributos[4]); inimigo._observadores = None
+        inimigo.nome = nome_exibido; inimigo.nivel = nivel; inimigo._vida_atual = atributos[0]; inimigo._caos_atual = atributos[4]
+        inimigo._buffs_ativos.clear(); inimigo._efeitos_status.clear()
+        return inimigo
+
+    def gerar_inimigo(self, nivel_heroi, rng=random): return self._obter(Personagem, rng.choice(linhas_de_inimigos(nivel_heroi)), nivel_heroi)
+
+    def gerar_chefe(self, nivel_heroi, rng=random): return self._obter(Chefao, rng.choice(linhas_de_chefes(nivel_heroi)), nivel_heroi)
+
+    def gerar_andares(self, nivel_heroi, andares, rng=random):
+        """Os `andares` inimigos comuns e o chefe de uma masmorra inteira no mesmo nível, sorteados de uma vez com rng.choices."""
+        return [self._obter(Personagem, linha, nivel_heroi) for linha in rng.choices(linhas_de_inimigos(nivel_heroi), k=andares)] + [self.gerar_chefe(nivel_heroi, rng)]
+
+    def liberar(self, *inimigos):
+        for inimigo in inimigos: self._livres[type(inimigo)].append(inimigo)
+
+# --- TABELAS DE LOOT COMPILADAS ---
+class AmostradorAlias:
+    """Sorteio por peso em O(1) (método de alias de Vose): um rng.random() escolhe a coluna e decide entre ela e seu apelido."""
+    __slots__ = ('valores', '_limiares', '_apelidos', '_n')
+
+    def __init__(self, valores, pesos):
+        self.valores = tuple(valores); n = self._n = len(self.valores); total = float(sum(pesos))
+        escalados = [p * n / total for p in pesos]
+        self._limiares = [1.0] * n; self._apelidos = list(range(n))
+        pequenos = [i for i, p in enumerate(escalados) if p < 1.0]; grandes = [i for i, p in enumerate(escalados) if p >= 1.0]
+        while pequenos and grandes:
+            menor = pequenos.pop(); maior = grandes[-1]
+            self._limiares[menor] = escalados[menor]; self._apelidos[menor] = maior
+            escalados[maior] -= 1.0 - escalados[menor]
+            if escalados[maior] < 1.0: grandes.pop(); pequenos.append(maior)
+        # O que sobrar nas listas fica com limiar 1.0 (só erro de arredondamento separa esses pesos de 1).
+
+    def sortear(self, rng=random):
+        u = rng.random() * self._n; i = int(u)
+        return self.valores[i] if u - i < self._limiares[i] else self.valores[self._apelidos[i]]
+
+class TabelaDeLoot:
+    """
+    RARIDADES, NOMES_EQUIPAMENTOS, BONUS_POR_SLOT e POCA_TEMPLATES pré-processados para gerar recompensas
+    sem montar listas nem percorrer probabilidades acumuladas a cada item. Recompile com compilar_tabela_de_loot()
+    se o conteúdo mudar.
+    """
+    _POSICAO_BONUS = {"bonus_vida": 0, "bonus_forca": 1, "bonus_defesa": 2, "bonus_agilidade": 3, "bonus_caos": 4}
+
+    def __init__(self):
+        self.raridades = AmostradorAlias([(nome, dados['multiplicador']) for nome, dados in RARIDADES.items()], [dados['chance'] for dados in RARIDADES.values()])
+        # Slots e poções são equiprováveis: o alias degenera em um índice, então guardamos só a tupla.
+        self.slots = tuple((slot, tuple(f"{p} {s}" for p in nomes["prefixos"] for s in nomes["sufixos"]), tuple(self._compilar_termo(*termo) for termo in BONUS_POR_SLOT[slot]))
+                           for slot, nomes in NOMES_EQUIPAMENTOS.items())
+        self.pocoes = tuple((t['nome'], tipo, t.get('valor', 0), t.get('duracao', 0)) for tipo, t in POCA_TEMPLATES.items())
+
+    @classmethod
+    def _compilar_termo(cls, atributo, regra, parametro):
+        """Regra de BONUS_POR_SLOT -> (posição, fator da base, constante, largura, escala com a raridade, chance): valor = fator*base + constante + largura*U."""
+        posicao = cls._POSICAO_BONUS[atributo]
+        if regra == "faixa": return posicao, 1.0, 0.0, float(parametro), True, 1.0
+        if regra == "fixo": return posicao, float(parametro), 0.0, 0.0, True, 1.0
+        if regra == "penalidade": return posicao, 0.0, -1.0, -1.0, False, 1.0
+        if regra == "talvez": return posicao, 1.0, 0.0, float(parametro), True, CHANCE_BONUS_CAOS
+        raise ValueError(f"regra de bônus desconhecida: {regra}")
+
+    def gerar(self, nivel_batalha, quantidade, rng=random):
+        bonus_base = nivel_batalha * 2; aleatorio = rng.random; sortear_raridade = self.raridades.sortear
+        slots = self.slots; pocoes = self.pocoes; itens = []
+        for _ in range(quantidade):
+            raridade, multiplicador = sortear_raridade(rng)
+            if aleatorio() < CHANCE_EQUIPAMENTO:
+                slot, nomes, termos = slots[int(aleatorio() * len(slots))]
+                bonus = [0.0, 0.0, 0.0, 0.0, 0.0]
+                for posicao, fator, constante, largura, escala, chance in termos:
+                    if chance < 1.0 and aleatorio() >= chance: continue
+                    valor = fator * bonus_base + constante
+                    if largura: valor += largura * aleatorio()
+                    bonus[posicao] = valor * multiplicador if escala else valor
+                itens.append(Equipamento(nomes[int(aleatorio() * len(nomes))], slot, raridade, *bonus))
+            else:
+                nome, tipo, valor, duracao = pocoes[int(aleatorio() * len(pocoes))]
+                itens.append(Pocao(nome, raridade, tipo, valor * multiplicador, duracao))
+        return itens
+
+TABELA_DE_LOOT = TabelaDeLoot()
+
+def compilar_tabela_de_loot():
+    """Remonta TABELA_DE_LOOT a partir dos dados de conteúdo atuais."""
+    global TABELA_DE_LOOT
+    TABELA_DE_LOOT = TabelaDeLoot(); return TABELA_DE_LOOT
+
+def obter_raridade(rng=random): return TABELA_DE_LOOT.raridades.sortear(rng)[0]
+
+def gerar_recompensas(nivel_batalha=1, quantidade=3, rng=random):
+    """As `quantidade` opções de recompensa de uma batalha, geradas de uma vez pela tabela de loot compilada."""
+    return TABELA_DE_LOOT.gerar(nivel_batalha, quantidade, rng)
+
+def gerar_recompensa_aleatoria(nivel_batalha=1, rng=random): return TABELA_DE_LOOT.gerar(nivel_batalha, 1, rng)[0]
+
+# --- PACOTES DE CONTEÚDO ---
+# RPG_CONTEUDO: pacotes JSON/TOML (ver conteudo.py) separados por os.pathsep, aplicados em ordem sobre o conteúdo embutido.
+CAMINHO_CONTEUDO = os.environ.get("RPG_CONTEUDO")
+CAMINHO_CACHE_CONTEUDO = os.environ.get("RPG_CACHE_CONTEUDO", os.path.join(os.path.dirname(os.path.abspath(__file__)), "conteudo.cache"))
+# Cópia intocada do conteúdo acima: base dos pacotes e o que definir_conteudo(None) restaura.
+CONTEUDO_EMBUTIDO = copy.deepcopy({"classes": CLASSES_BASE, "inimigos": INIMIGO_TEMPLATES, "chefes": CHEFE_TEMPLATES, "equipamentos": NOMES_EQUIPAMENTOS, "pocoes": POCA_TEMPLATES, "raridades": RARIDADES})
+# Habilidades de cada classe, já em tupla: o que os menus e as políticas percorrem.
+HABILIDADES_POR_CLASSE = {classe: tuple(dados['habilidades']) for classe, dados in CLASSES_BASE.items()}
+
+def definir_conteudo(compilado):
+    """
+    Troca o conteúdo do jogo pelo de um conteudo.ConteudoCompilado (None volta ao embutido). As tabelas globais mudam
+    no lugar, então quem importou CLASSES_BASE & cia. por nome vê o conteúdo novo; as linhas escaladas de todos os
+    níveis vêm prontas do compilado e a tabela de loot é recompilada.
+    """
+    secoes = compilado.secoes if compilado is not None else copy.deepcopy(CONTEUDO_EMBUTIDO)
+    for tabela, secao in ((CLASSES_BASE, "classes"), (INIMIGO_TEMPLATES, "inimigos"), (CHEFE_TEMPLATES, "chefes"), (NOMES_EQUIPAMENTOS, "equipamentos"), (POCA_TEMPLATES, "pocoes"), (RARIDADES, "raridades")):
+        tabela.clear(); tabela.update(secoes[secao])
+    HABILIDADES_POR_CLASSE.clear(); HABILIDADES_POR_CLASSE.update(compilado.habilidades if compilado is not None else {classe: tuple(dados['habilidades']) for classe, dados in CLASSES_BASE.items()})
+    limpar_tabelas_de_escala()
+    if compilado is not None: _LINHAS_INIMIGOS.update(compilado.linhas_inimigos); _LINHAS_CHEFES.update(compilado.linhas_chefes)
+    compilar_tabela_de_loot()
+
+if CAMINHO_CONTEUDO:
+    import conteudo  # Só com pacotes: o carregador (hashlib, pickle, tomllib) fica fora da partida do jogo
+    definir_conteudo(conteudo.carregar(CAMINHO_CONTEUDO.split(os.pathsep), sys.modules[__name__], CAMINHO_CACHE_CONTEUDO))
 
 # --- TELAS E MENUS DO JOGO ---
 def distribuir_pontos_nivel(jogador, pontos):
@@ -278,56 +914,56 @@ def distribuir_pontos_nivel(jogador, pontos):
         limpar_tela(); print(f"--- DISTRIBUA SEUS PONTOS DE ATRIBUTO ---"); jogador.mostrar_status_completo()
         print(f"\nVocê tem {pontos} pontos restantes para distribuir.")
         print("Qual atributo você quer aumentar?\n1. Força\n2. Defesa\n3. Agilidade\n4. Terminei")
-        attr_escolha = input("> ")
+        attr_escolha = entrada("> ")
         if attr_escolha == '4': break
         try:
-            pontos_gastar = int(input(f"Quantos pontos (de {pontos})? "));
-            if pontos_gastar <= 0 or pontos_gastar > pontos: print("Valor inválido."); time.sleep(1); continue
+            pontos_gastar = int(entrada(f"Quantos pontos (de {pontos})? "));
+            if pontos_gastar <= 0 or pontos_gastar > pontos: print("Valor inválido."); RITMO.pausar(1); continue
             if attr_escolha == '1': jogador.forca_base += pontos_gastar
             elif attr_escolha == '2': jogador.defesa_base += pontos_gastar
             elif attr_escolha == '3': jogador.agilidade_base += pontos_gastar
-            else: print("Escolha inválida."); time.sleep(1); continue
+            else: print("Escolha inválida."); RITMO.pausar(1); continue
             pontos -= pontos_gastar
             jogador.vida_atual = jogador.vida_maxima; jogador.caos_atual = jogador.caos_maximo
-        except ValueError: print("Entrada inválida."); time.sleep(1)
+        except ValueError: print("Entrada inválida."); RITMO.pausar(1)
 
 def criar_novo_heroi():
-    limpar_tela(); print("--- CRIAÇÃO DE HERÓI ---"); nome = input("Qual o nome do seu Herói? ")
+    limpar_tela(); print("--- CRIAÇÃO DE HERÓI ---"); nome = entrada("Qual o nome do seu Herói? ")
     print("\nEscolha a sua classe:"); [print(f"{i + 1}. {c.capitalize()} - {d['desc']}") for i, (c, d) in enumerate(CLASSES_BASE.items())]
     escolha_classe_nome = "";
     while escolha_classe_nome not in CLASSES_BASE:
-        try: index = int(input("> ")) - 1; escolha_classe_nome = list(CLASSES_BASE.keys())[index] if 0 <= index < len(CLASSES_BASE) else ""
+        try: index = int(entrada("> ")) - 1; escolha_classe_nome = list(CLASSES_BASE.keys())[index] if 0 <= index < len(CLASSES_BASE) else ""
         except(ValueError, IndexError): print("Escolha inválida.")
     stats_iniciais = CLASSES_BASE[escolha_classe_nome]["stats"]; heroi = Heroi(nome, escolha_classe_nome, **stats_iniciais)
     distribuir_pontos_nivel(heroi, PONTOS_DISTRIBUICAO_INICIAL)
-    HEROIS_CRIADOS[nome] = heroi; limpar_tela(); print(f"--- Herói {nome} - O {escolha_classe_nome.capitalize()} foi criado! ---"); heroi.mostrar_status_completo(); input("\nPressione ENTER para continuar..."); return heroi
+    HEROIS_CRIADOS[nome] = heroi; HEROIS_CRIADOS.salvar(); limpar_tela(); print(f"--- Herói {nome} - O {escolha_classe_nome.capitalize()} foi criado! ---"); heroi.mostrar_status_completo(); entrada("\nPressione ENTER para continuar..."); return heroi
 
 def selecionar_heroi():
     limpar_tela()
-    if not HEROIS_CRIADOS: print("Nenhum herói criado."); time.sleep(2); return criar_novo_heroi()
-    print("--- SELECIONE SEU HERÓI ---"); nomes_herois = list(HEROIS_CRIADOS.keys())
-    for i, nome in enumerate(nomes_herois): heroi_obj = HEROIS_CRIADOS[nome]; print(f"{i + 1}. {heroi_obj.nome} - {heroi_obj.classe.capitalize()} (Nível {heroi_obj.nivel})")
+    if not HEROIS_CRIADOS: print("Nenhum herói criado."); RITMO.pausar(2); return criar_novo_heroi()
+    print("--- SELECIONE SEU HERÓI ---"); resumos = HEROIS_CRIADOS.resumos(); nomes_herois = [nome for nome, _, _ in resumos]
+    for i, (nome, classe, nivel) in enumerate(resumos): print(f"{i + 1}. {nome} - {classe.capitalize()} (Nível {nivel})")
     while True:
         try:
-            escolha = int(input("> ")) - 1
-            if 0 <= escolha < len(nomes_herois): nome_escolhido = nomes_herois[escolha]; print(f"Você selecionou {nome_escolhido}!"); time.sleep(1); return HEROIS_CRIADOS[nome_escolhido]
+            escolha = int(entrada("> ")) - 1
+            if 0 <= escolha < len(nomes_herois): nome_escolhido = nomes_herois[escolha]; print(f"Você selecionou {nome_escolhido}!"); RITMO.pausar(1); return HEROIS_CRIADOS[nome_escolhido]
             else: print("Escolha inválida.")
         except (ValueError, IndexError): print("Por favor, digite um número.")
 
 def usar_pocao_em_batalha(jogador):
     limpar_tela();
-    if not jogador.inventario_pocoes: print("Seu inventário de poções está vazio."); time.sleep(2); return False
+    if not jogador.inventario_pocoes: print("Seu inventário de poções está vazio."); RITMO.pausar(2); return False
     print("--- INVENTÁRIO DE POÇÕES ---"); [print(f"{i + 1}. {p}") for i,p in enumerate(jogador.inventario_pocoes)]; print(f"{len(jogador.inventario_pocoes) + 1}. Voltar")
     while True:
         try:
-            escolha = int(input("> "))
+            escolha = int(entrada("> "))
             if 1 <= escolha <= len(jogador.inventario_pocoes): jogador.usar_pocao(escolha - 1); return True
             elif escolha == len(jogador.inventario_pocoes) + 1: return False
             else: print("Escolha inválida.")
         except ValueError: print("Por favor, digite um número.")
 
 def menu_de_habilidades(jogador, inimigo):
-    habilidades = CLASSES_BASE[jogador.classe]['habilidades']
+    habilidades = HABILIDADES_POR_CLASSE[jogador.classe]
     while True:
         limpar_tela()
         print("--- ESCOLHA UMA HABILIDADE ---")
@@ -336,7 +972,7 @@ def menu_de_habilidades(jogador, inimigo):
         print(f"{len(habilidades) + 1}. Voltar")
 
         try:
-            escolha = int(input("> "))
+            escolha = int(entrada("> "))
             if 1 <= escolha <= len(habilidades):
                 habilidade_escolhida = habilidades[escolha - 1]
                 if jogador.usar_habilidade(inimigo, habilidade_escolhida):
@@ -346,15 +982,15 @@ def menu_de_habilidades(jogador, inimigo):
             elif escolha == len(habilidades) + 1:
                 return False
             else:
-                print("Escolha inválida."); time.sleep(1)
+                print("Escolha inválida."); RITMO.pausar(1)
         except ValueError:
-            print("Entrada inválida."); time.sleep(1)
+            print("Entrada inválida."); RITMO.pausar(1)
 
 def menu_de_ataque(jogador, inimigo):
     while True:
         limpar_tela(); print("Escolha seu tipo de ataque:"); print("1. Ataque Básico (Dano Físico, usa Força vs Defesa)")
         print(f"2. Habilidades de Classe (Usa Caos)"); print("3. Voltar")
-        escolha = input("> ")
+        escolha = entrada("> ")
         if escolha == '1': 
             jogador.atacar(inimigo)
             return True
@@ -370,29 +1006,30 @@ def menu_de_ataque(jogador, inimigo):
 
 def tela_de_recompensa(jogador):
     limpar_tela(); print("🏆 RECOMPENSAS DA BATALHA 🏆"); print("Você encontrou alguns tesouros! Escolha sabiamente:")
-    recompensas = [gerar_recompensa_aleatoria(jogador.nivel) for _ in range(3)]
+    recompensas = gerar_recompensas(jogador.nivel)
     while True:
         limpar_tela(); print("Escolha uma recompensa:")
         for i, item in enumerate(recompensas):
             if item: print(f"{i + 1}. {item}")
         print(f"{len(recompensas) + 1}. Não quero nenhum item.")
         try:
-            escolha = int(input("> "))
+            escolha = int(entrada("> "))
             if 1 <= escolha <= len(recompensas):
                 item_escolhido = recompensas[escolha - 1]
-                if not item_escolhido: print("Você já pegou este item."); time.sleep(1); continue
+                if not item_escolhido: print("Você já pegou este item."); RITMO.pausar(1); continue
                 if isinstance(item_escolhido, Equipamento):
                     if jogador.avaliar_e_equipar_item(item_escolhido): break
                 elif isinstance(item_escolhido, Pocao):
-                    if len(jogador.inventario_pocoes) < MAX_POCOES_INVENTARIO:
-                        jogador.inventario_pocoes.append(item_escolhido); print(f"Você guardou {item_escolhido.nome_formatado()} no inventário."); time.sleep(2); break
-                    else: print("Seu inventário de poções está cheio!"); time.sleep(2)
-            elif escolha == len(recompensas) + 1: print("Você decide não levar nenhum tesouro."); time.sleep(2); break
+                    if resolver_guardar_pocao(jogador, item_escolhido):
+                        print(f"Você guardou {item_escolhido.nome_formatado()} no inventário."); RITMO.pausar(2); break
+                    else: print("Seu inventário de poções está cheio!"); RITMO.pausar(2)
+            elif escolha == len(recompensas) + 1: print("Você decide não levar nenhum tesouro."); RITMO.pausar(2); break
             else: print("Escolha inválida.")
         except ValueError: print("Por favor, digite um número.")
 
 def iniciar_batalha(jogador, inimigo):
-    limpar_tela(); print(f"⚔️  Um {inimigo.nome} apareceu! ⚔️"); time.sleep(2)
+    if EVENTOS is not None: EVENTOS.emitir(eventos.InicioDeBatalha(jogador.nome, inimigo.nome, inimigo.nivel))
+    limpar_tela(); print(f"⚔️  Um {inimigo.nome} apareceu! ⚔️"); RITMO.pausar(2)
     while jogador.esta_vivo() and inimigo.esta_vivo():
         limpar_tela(); print(f"--- BATALHA: {jogador.nome} vs {inimigo.nome} ---"); jogador.mostrar_status(); print("\nVS\n"); inimigo.mostrar_status()
         
@@ -401,21 +1038,22 @@ def iniciar_batalha(jogador, inimigo):
 
         turno_usado = False
         while not turno_usado:
-            print("\nSua vez de agir!"); acao = input("1. Atacar\n2. Usar Poção\n3. Tentar Fugir\n4. Ver Status Detalhado\n> ")
+            print("\nSua vez de agir!"); acao = entrada("1. Atacar\n2. Usar Poção\n3. Tentar Fugir\n4. Ver Status Detalhado\n> ")
             if acao == "1":
                 if menu_de_ataque(jogador, inimigo): turno_usado = True
             elif acao == "2": 
                 if usar_pocao_em_batalha(jogador): turno_usado = True
             elif acao == "3":
-                chance_fuga = 50 + (jogador.agilidade - inimigo.agilidade); chance_fuga = max(10, min(90, chance_fuga))
-                print(f"\nTentando fugir... (Chance: {chance_fuga:.1f}%)"); time.sleep(1)
-                if random.randint(1, 100) <= chance_fuga: print("...Você conseguiu escapar!"); time.sleep(2); return "fugiu"
+                escapou, chance_fuga, quebrado = resolver_fuga(jogador, inimigo)
+                print(f"\nTentando fugir... (Chance: {chance_fuga:.1f}%)"); RITMO.pausar(1)
+                if escapou:
+                    print("...Você conseguiu escapar!"); RITMO.pausar(2)
+                    if EVENTOS is not None: EVENTOS.emitir(eventos.FimDeBatalha(jogador.nome, inimigo.nome, "fugiu", None))
+                    return "fugiu"
                 else: 
                     print("...A fuga falhou!"); turno_usado = True
-                    if random.random() < CHANCE_QUEBRA_AO_FUGIR:
-                            itens_equipados = [s for s, e in jogador.equipamentos.items() if e]
-                            if itens_equipados: slot_quebrado = random.choice(itens_equipados); print(f"🔥 Oh não! Seu item '{jogador.equipamentos[slot_quebrado].nome_formatado()}' foi destruído!"); jogador.equipamentos[slot_quebrado] = None; time.sleep(2)
-            elif acao == "4": jogador.mostrar_status_completo(); input("\nPressione ENTER para continuar..."); limpar_tela(); jogador.mostrar_status(); print("\nVS\n"); inimigo.mostrar_status()
+                    if quebrado: print(f"🔥 Oh não! Seu item '{quebrado.nome_formatado()}' foi destruído!"); RITMO.pausar(2)
+            elif acao == "4": jogador.mostrar_status_completo(); entrada("\nPressione ENTER para continuar..."); limpar_tela(); jogador.mostrar_status(); print("\nVS\n"); inimigo.mostrar_status()
             else: print("Ação inválida.")
         
         if not inimigo.esta_vivo(): break
@@ -428,53 +1066,122 @@ def iniciar_batalha(jogador, inimigo):
     
     if jogador.esta_vivo(): 
         jogador.buffs_ativos = {}; jogador.efeitos_status = {}
-        print(f"\nVocê venceu a batalha contra {inimigo.nome}!"); time.sleep(1); xp_ganho = inimigo.nivel * 5 + random.randint(1, 5); jogador.ganhar_xp(xp_ganho); tela_de_recompensa(jogador); return "vitoria"
-    else: return "derrota"
+        if DIARIO is not None: DIARIO.fim_de_batalha("vitoria")
+        if EVENTOS is not None: EVENTOS.emitir(eventos.FimDeBatalha(jogador.nome, inimigo.nome, "vitoria", None))
+        print(f"\nVocê venceu a batalha contra {inimigo.nome}!"); RITMO.pausar(1); xp_ganho = inimigo.nivel * 5 + random.randint(1, 5); jogador.ganhar_xp(xp_ganho)
+        if DIARIO is not None: DIARIO.registrar_heroi()
+        tela_de_recompensa(jogador); return "vitoria"
+    else:
+        if EVENTOS is not None: EVENTOS.emitir(eventos.FimDeBatalha(jogador.nome, inimigo.nome, "derrota", None))
+        return "derrota"
 
-def iniciar_masmorra(jogador, andares_base=3):
+def iniciar_masmorra(jogador, andares_base=3, andar_inicial=1, inimigo_inicial=None):
+    """`andar_inicial` e `inimigo_inicial` retomam uma masmorra recuperada do diário (o andar do chefe é andares_base + 1)."""
     total_andares = andares_base
-    for andar_atual in range(1, total_andares + 1):
-        limpar_tela(); print(f"--- MASMORRA - ANDAR {andar_atual}/{total_andares} ---"); inimigo = gerar_inimigo(jogador.nivel); input("Pressione ENTER para prosseguir..."); resultado_batalha = iniciar_batalha(jogador, inimigo)
+    for andar_atual in range(andar_inicial, total_andares + 1):
+        limpar_tela(); print(f"--- MASMORRA - ANDAR {andar_atual}/{total_andares} ---"); inimigo = inimigo_inicial or gerar_inimigo(jogador.nivel); inimigo_inicial = None; entrada("Pressione ENTER para prosseguir...")
+        if DIARIO is not None: DIARIO.iniciar_batalha(inimigo, andar_atual)
+        resultado_batalha = iniciar_batalha(jogador, inimigo)
         if resultado_batalha in ["derrota", "fugiu"]: return resultado_batalha
+        if DIARIO is not None: DIARIO.fim_de_andar()
+    if andar_inicial > total_andares + 1: return "venceu_masmorra"  # Caiu depois de derrotar o chefe.
     
-    limpar_tela(); print(f"--- ANDAR FINAL - O Covil do Chefe ---"); chefe = gerar_chefe(jogador.nivel); input("Pressione ENTER para enfrentar o desafio final..."); resultado_chefe = iniciar_batalha(jogador, chefe)
+    limpar_tela(); print(f"--- ANDAR FINAL - O Covil do Chefe ---"); chefe = inimigo_inicial or gerar_chefe(jogador.nivel); entrada("Pressione ENTER para enfrentar o desafio final...")
+    if DIARIO is not None: DIARIO.iniciar_batalha(chefe, total_andares + 1)
+    resultado_chefe = iniciar_batalha(jogador, chefe)
     return "venceu_masmorra" if resultado_chefe == "vitoria" else "perdeu_masmorra"
 
+def oferecer_retomada():
+    """Se o diário tem uma masmorra interrompida, pergunta se o jogador quer retomá-la. Devolve a Recuperacao ou None."""
+    recuperacao = diario.recuperar(CAMINHO_DIARIO, sys.modules[__name__])
+    if recuperacao is None: return None
+    limpar_tela(); contexto = recuperacao.contexto
+    print(f"Uma masmorra de {recuperacao.heroi.nome} foi interrompida no andar {contexto.get('andar', 1)}/{contexto['andares']}.")
+    if entrada("Deseja retomá-la de onde parou? (S/N) ").upper() != 'S': return None
+    HEROIS_CRIADOS[recuperacao.heroi.nome] = recuperacao.heroi
+    return recuperacao
+
 def main():
     heroi_selecionado = None; vidas_heroi = 3; andares_masmorra = 3
+    definir_diario(diario.DiarioDeBatalha(CAMINHO_DIARIO))
+    definir_tela(tela.Tela()); atexit.register(definir_tela, None)
+    if CAMINHO_METRICAS: definir_metricas(metricas.Metricas(CAMINHO_METRICAS))
+    if CAMINHO_EVENTOS: definir_eventos(eventos.ArquivoDeEventos(CAMINHO_EVENTOS)); atexit.register(EVENTOS.fechar)
+    retomada = oferecer_retomada()
+    if retomada: heroi_selecionado = retomada.heroi; vidas_heroi = retomada.contexto['vidas']; andares_masmorra = retomada.contexto['andares']
     while True:
         limpar_tela(); print("====== RPG DE MASMORRA ======"); print(f"Vidas restantes: {'❤️' * vidas_heroi if vidas_heroi > 0 else '☠️'}")
         if heroi_selecionado: print(f"Herói Ativo: {heroi_selecionado.nome} - {heroi_selecionado.classe.capitalize()} (Nível {heroi_selecionado.nivel})")
         print("\n1. Criar Novo Herói\n2. Selecionar Herói Existente");
         if heroi_selecionado and vidas_heroi > 0: print("3. Entrar na Masmorra")
         print("4. Sair do Jogo")
+        print(f"5. Velocidade: {RITMO.modo.capitalize()} (ENTER durante uma pausa pula as esperas)")
         
-        escolha = input("> ")
+        escolha = '3' if retomada else entrada("> ")
         if escolha == '1': heroi_selecionado = criar_novo_heroi()
         elif escolha == '2': heroi_selecionado = selecionar_heroi()
         elif escolha == '3' and heroi_selecionado and vidas_heroi > 0:
             while vidas_heroi > 0:
-                heroi_selecionado.vida_atual = heroi_selecionado.vida_maxima; heroi_selecionado.caos_atual = heroi_selecionado.caos_maximo; heroi_selecionado.buffs_ativos = {}; heroi_selecionado.efeitos_status = {}
-                resultado_final = iniciar_masmorra(heroi_selecionado, andares_masmorra)
+                if retomada:
+                    # Batalha já vencida (caiu nas recompensas) continua no próximo andar; senão, volta para a luta interrompida.
+                    andar_inicial = retomada.contexto.get('andar', 1); inimigo_inicial = retomada.inimigo
+                    if retomada.contexto.get('vencida'): andar_inicial += 1; inimigo_inicial = None
+                    DIARIO.continuar_masmorra(heroi_selecionado, inimigo_inicial, **retomada.contexto); retomada = None
+                else:
+                    heroi_selecionado.vida_atual = heroi_selecionado.vida_maxima; heroi_selecionado.caos_atual = heroi_selecionado.caos_maximo; heroi_selecionado.buffs_ativos = {}; heroi_selecionado.efeitos_status = {}
+                    andar_inicial = 1; inimigo_inicial = None
+                    DIARIO.iniciar_masmorra(heroi_selecionado, andares=andares_masmorra, vidas=vidas_heroi)
+                resultado_final = iniciar_masmorra(heroi_selecionado, andares_masmorra, andar_inicial, inimigo_inicial)
+                HEROIS_CRIADOS.salvar(); DIARIO.encerrar(resultado_final)
+                if METRICAS is not None: METRICAS.fim_de_masmorra(resultado_final)
                 
                 if resultado_final in ["derrota", "perdeu_masmorra"]:
                     vidas_heroi -= 1; xp_perdido = heroi_selecionado.xp_atual * PENALIDADE_XP_MORTE; heroi_selecionado.xp_atual -= xp_perdido
                     print(f"Você foi derrotado... Perdeu uma vida e {xp_perdido:.0f} de XP.")
-                    if vidas_heroi <= 0: print("GAME OVER."); time.sleep(4); break
-                    else: print(f"Você tem {vidas_heroi} vidas restantes."); time.sleep(4); break
+                    if vidas_heroi <= 0: print("GAME OVER."); RITMO.pausar(4); break
+                    else: print(f"Você tem {vidas_heroi} vidas restantes."); RITMO.pausar(4); break
                 
                 elif resultado_final == "fugiu":
                     xp_perdido = (heroi_selecionado.xp_atual * PENALIDADE_XP_MORTE) / 2
                     heroi_selecionado.xp_atual -= xp_perdido
-                    print(f"Você fugiu da masmorra, perdendo {xp_perdido:.0f} de XP."); time.sleep(4); break
+                    print(f"Você fugiu da masmorra, perdendo {xp_perdido:.0f} de XP."); RITMO.pausar(4); break
 
                 elif resultado_final == "venceu_masmorra": 
-                    print("\n🏆🏆🏆 VOCÊ CONQUISTOU A MASMORRA! 🏆🏆🏆"); time.sleep(2)
+                    print("\n🏆🏆🏆 VOCÊ CONQUISTOU A MASMORRA! 🏆🏆🏆"); RITMO.pausar(2)
                     andares_masmorra += 1
-                    print(f"A próxima masmorra terá {andares_masmorra} andares. Prepare-se!"); time.sleep(4)
+                    print(f"A próxima masmorra terá {andares_masmorra} andares. Prepare-se!"); RITMO.pausar(4)
 
         elif escolha == '4': print("Obrigado por jogar!"); break
-        else: print("Opção inválida!"); time.sleep(1)
+        elif escolha == '5': RITMO.proximo_modo()
+        else: print("Opção inválida!"); RITMO.pausar(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # `python -m rpg_dinamico simulate ...` roda o simulador de batalhas em lote sem interface; `simulate-masmorra ...`, o de masmorras completas; `optimize ...`, o otimizador de distribuição de pontos;
+    # `exact ...`, a probabilidade exata de vitória conferida contra o simulador; `simulate-grupo ...`, batalhas de grupo contra hordas;
+    # `serve ...`, o servidor de sessões por TCP; `conteudo ...`, valida e compila pacotes de conteúdo.
+    # Os subcomandos fazem `import rpg_dinamico`: sem isto o módulo rodaria de novo com outro nome (outro repositório de heróis,
+    # outro atexit, outra carga dos pacotes de conteúdo) e as regras ligadas por eles não seriam as deste processo.
+    sys.modules.setdefault("rpg_dinamico", sys.modules["__main__"])
+    if sys.argv[1:2] == ["simulate"]:
+        import simulador
+        simulador.main(sys.argv[2:])
+    elif sys.argv[1:2] == ["simulate-masmorra"]:
+        import simulador_masmorra
+        simulador_masmorra.main(sys.argv[2:])
+    elif sys.argv[1:2] == ["optimize"]:
+        import otimizador
+        otimizador.main(sys.argv[2:])
+    elif sys.argv[1:2] == ["exact"]:
+        import probabilidade
+        probabilidade.main(sys.argv[2:])
+    elif sys.argv[1:2] == ["simulate-grupo"]:
+        import batalha_em_grupo
+        batalha_em_grupo.main(sys.argv[2:])
+    elif sys.argv[1:2] == ["serve"]:
+        import servidor
+        servidor.main(sys.argv[2:])
+    elif sys.argv[1:2] == ["conteudo"]:
+        import conteudo
+        conteudo.main(sys.argv[2:])
+    else:
+        main()
\ No newline at end of file
@@ -2,7 +2,503 @@
 import tkinter as tk
 from tkinter import messagebox, simpledialog, font
 import rpg_dinamico  # Your game logic file
-import traceback
+from rpg_dinamico import MUDOU_VIDA, MUDOU_CAOS, MUDOU_ATRIBUTOS, MUDOU_BUFFS, MUDOU_EFEITOS, MUDOU_TUDO
+import atexit
+import diario
+import eventos
+import metricas
+import time
+
+class LogDeBatalha:
+    """
+    Battle log sink. Messages are queued and written to the Text widget in one batch per UI frame,
+    so a burst of lines costs a single insert/see/state toggle. The widget keeps only the last `max_linhas`
+    lines (older ones are trimmed from the top); the whole battle is kept in `historico()`.
+    A message is either a string or a combat event (eventos.py), whose text is only formatted when it
+    reaches the widget or the history popup.
+    """
+    INTERVALO_MS = 16 # One flush per frame (~60 fps)
+
+    def __init__(self, master, max_linhas=200):
+        self.master = master
+        self.max_linhas = max_linhas
+        self.widget = None
+        self._pendentes = []
+        self._historico = []
+        self._linhas_no_widget = 0
+        self._agendado = None
+
+    def anexar(self, widget):
+        """Starts a new battle log on `widget`, clearing whatever it showed (the battle window is reused between floors)."""
+        self.cancelar()
+        self.widget = widget
+        self._pendentes = []
+        self._historico = []
+        self._linhas_no_widget = 0
+        widget.config(state='normal')
+        widget.delete('1.0', tk.END)
+        widget.config(state='disabled')
+
+    def __call__(self, msg):
+        self._pendentes.append(msg)
+        self._historico.append(msg)
+        if self._agendado is None:
+            self._agendado = self.master.after(self.INTERVALO_MS, self.descarregar)
+
+    def descarregar(self):
+        """Writes every queued message to the widget now."""
+        self._agendado = None
+        pendentes, self._pendentes = self._pendentes, []
+        if not pendentes or not self.widget or not self.widget.winfo_exists():
+            return
+        texto = "\n".join(map(str, pendentes[-self.max_linhas:])) + "\n"
+        self._linhas_no_widget += texto.count("\n")
+        self.widget.config(state='normal')
+        self.widget.insert(tk.END, texto)
+        excesso = self._linhas_no_widget - self.max_linhas
+        if excesso > 0:
+            self.widget.delete('1.0', f'{excesso + 1}.0')
+            self._linhas_no_widget -= excesso
+        self.widget.see(tk.END)
+        self.widget.config(state='disabled')
+
+    def cancelar(self):
+        if self._agendado is not None:
+            self.master.after_cancel(self._agendado)
+            self._agendado = None
+
+    def historico(self):
+        """Every message of the current battle, including the ones already trimmed from the widget."""
+        return list(map(str, self._historico))
+
+class PainelDeStatus:
+    """
+    Status panel bound to one Personagem, one Label per field. The panel observes the character
+    (Personagem.observar) and only re-formats the fields whose change marks arrived; a Label is only
+    reconfigured when its text actually changed. Renders are coalesced to one per frame.
+    """
+    INTERVALO_MS = 16
+
+    # (change marks that affect the field, formatter). An empty string hides the line.
+    CAMPOS_HEROI = [
+        (MUDOU_VIDA | MUDOU_ATRIBUTOS, lambda p: f"❤️ {p.vida_atual:<5.1f} / {p.vida_maxima:.1f}"),
+        (MUDOU_CAOS | MUDOU_ATRIBUTOS, lambda p: f"🔮 {p.caos_atual:<5.1f} / {p.caos_maximo:.1f}"),
+        (MUDOU_ATRIBUTOS, lambda p: f"💪 {p.forca:<5.1f}  🛡️ {p.defesa:<5.1f}  👟 {p.agilidade:<5.1f}"),
+        (MUDOU_BUFFS, lambda p: " ".join(f"⬆️{k[0].upper()}" for k in p.buffs_ativos.keys())),
+        (MUDOU_EFEITOS, lambda p: " ".join(f"⬇️{k[0].upper()}" for k in p.efeitos_status.keys())),
+    ]
+    CAMPOS_INIMIGO = [
+        (MUDOU_VIDA | MUDOU_ATRIBUTOS, lambda p: f"❤️ {p.vida_atual:<5.1f} / {p.vida_maxima:.1f}"),
+        (MUDOU_ATRIBUTOS, lambda p: f"💪 {p.forca:<5.1f}  🛡️ {p.defesa:<5.1f}  👟 {p.agilidade:<5.1f}"),
+        (MUDOU_EFEITOS, lambda p: " ".join(f"⬇️{k[0].upper()}" for k in p.efeitos_status.keys())),
+    ]
+
+    def __init__(self, master, parent, personagem, campos, **label_style):
+        self.master = master
+        self.personagem = personagem
+        self.campos = campos
+        self.frame = tk.Frame(parent, bg=label_style.get('bg'))
+        self.frame.pack(padx=5, pady=5)
+        self._labels = [tk.Label(self.frame, text="", justify='left', **label_style) for _ in campos]
+        self._textos = [""] * len(campos)
+        self._sujo = MUDOU_TUDO
+        self._agendado = None
+        personagem.observar(self._notificado)
+        self.frame.bind("<Destroy>", lambda event: self.desligar())
+        self.renderizar()
+
+    def _notificado(self, personagem, marca):
+        self._sujo |= marca
+        if self._agendado is None:
+            self._agendado = self.master.after(self.INTERVALO_MS, self.renderizar)
+
+    def renderizar(self):
+        """Re-renders the dirty fields now (no-op if nothing changed since the last render)."""
+        if self._agendado is not None:
+            self.master.after_cancel(self._agendado)
+            self._agendado = None
+        sujo, self._sujo = self._sujo, 0
+        if not sujo:
+            return
+        for i, (marcas, formatar) in enumerate(self.campos):
+            if not sujo & marcas:
+                continue
+            texto = formatar(self.personagem)
+            if texto == self._textos[i]:
+                continue
+            label = self._labels[i]
+            if not texto:
+                label.grid_remove()
+            else:
+                label.config(text=texto)
+                if not self._textos[i]:
+                    label.grid(row=i, column=0, sticky='w')
+            self._textos[i] = texto
+
+    def vincular(self, personagem):
+        """Points the panel at another character (or the same one, for a new battle) and re-renders every field."""
+        if personagem is not self.personagem:
+            self.personagem.deixar_de_observar(self._notificado)
+            self.personagem = personagem
+            personagem.observar(self._notificado)
+        self._sujo = MUDOU_TUDO
+        self.renderizar()
+
+    def desligar(self):
+        """Stops observing the character (the panel's window is going away)."""
+        self.personagem.deixar_de_observar(self._notificado)
+        if self._agendado is not None:
+            self.master.after_cancel(self._agendado)
+            self._agendado = None
+
+class AgendadorDeTurnos:
+    """
+    Every delayed step of the battle flow goes through here instead of a bare master.after(ms, ...).
+    Delays are scaled by the speed mode (the same modes as the console's rpg_dinamico.Ritmo); a zero delay
+    ('instantaneo', or while skipping) queues the step to run in the same tick as the step that scheduled it,
+    so a whole enemy phase resolves at once. `pular()` (hotkey) runs every pending step now and keeps skipping
+    until `retomar()` (the player's next input).
+
+    Steps never overlap: a timer that fires while another step is running (e.g. inside a messagebox's modal loop)
+    waits for it to finish. `cancelar()` (battle window hidden or closed) drops every pending step, and callbacks
+    Tk already queued from before the cancel become no-ops instead of acting on a battle that is gone.
+    """
+    MODOS = rpg_dinamico.Ritmo.MODOS
+    NOMES_MODOS = {"normal": "Normal", "rapido": "Rápido", "instantaneo": "Instantâneo"}
+
+    def __init__(self, master, modo="normal"):
+        self.master = master
+        self.modo = modo if modo in self.MODOS else "normal"
+        self.pulando = False
+        self._timers = {} # Tk after id -> (due time, callback)
+        self._prontos = []
+        self._geracao = 0
+        self._executando = False
+        self._agendado_ocioso = None
+
+    def agendar(self, ms, callback):
+        """Runs `callback` after `ms` milliseconds, scaled by the current mode."""
+        atraso = 0 if self.pulando else int(ms * self.MODOS[self.modo])
+        if atraso <= 0:
+            self._prontos.append(callback)
+            if not self._executando and self._agendado_ocioso is None:
+                self._agendado_ocioso = self.master.after_idle(self._ocioso)
+            return
+        geracao = self._geracao
+        id_timer = self.master.after(atraso, lambda: self._disparar(id_timer, geracao))
+        self._timers[id_timer] = (time.monotonic() + atraso / 1000, callback)
+
+    def ocupado(self):
+        """True while some step of the battle flow is still pending."""
+        return bool(self._timers or self._prontos)
+
+    def pular(self):
+        """Skip-animation hotkey: runs every pending step now, in order, and keeps skipping until retomar()."""
+        self.pulando = True
+        for id_timer in self._timers:
+            self.master.after_cancel(id_timer)
+        self._prontos.extend(callback for _, callback in sorted(self._timers.values(), key=lambda t: t[0]))
+        self._timers.clear()
+        self._drenar()
+
+    def retomar(self):
+        """The player is being asked for input: stop skipping."""
+        self.pulando = False
+
+    def cancelar(self):
+        """Drops every pending step; callbacks from before this call will not run."""
+        for id_timer in self._timers:
+            self.master.after_cancel(id_timer)
+        self._timers.clear()
+        if self._agendado_ocioso is not None:
+            self.master.after_cancel(self._agendado_ocioso)
+            self._agendado_ocioso = None
+        self._prontos.clear()
+        self._geracao += 1
+        self.pulando = False
+
+    def proximo_modo(self):
+        modos = list(self.MODOS)
+        self.modo = modos[(modos.index(self.modo) + 1) % len(modos)]
+        return self.modo
+
+    def _ocioso(self):
+        self._agendado_ocioso = None
+        self._drenar()
+
+    def _disparar(self, id_timer, geracao):
+        if geracao != self._geracao or id_timer not in self._timers:
+            return # Cancelled (window hidden/closed) after Tk had already queued this timer
+        self._prontos.append(self._timers.pop(id_timer)[1])
+        self._drenar()
+
+    def _drenar(self):
+        if self._executando:
+            return # Re-entrant call (a modal loop inside the running step): the outer loop picks the step up
+        self._executando = True
+        try:
+            while self._prontos:
+                self._prontos.pop(0)()
+        finally:
+            self._executando = False
+
+class GerenciadorDeTelas:
+    """
+    Screens of the main window, each built once. A screen is registered with a builder (called the first time it is
+    shown, fills the screen's Frame) and an optional refresher (called on every visit, updates only what can change).
+    Every screen sits in the same grid cell of the container; switching hides the current frame and shows the cached
+    target instead of destroying and rebuilding widgets.
+    """
+    def __init__(self, container):
+        self.container = container
+        self.container.grid_rowconfigure(0, weight=1)
+        self.container.grid_columnconfigure(0, weight=1)
+        self._telas = {}
+        self._frames = {}
+        self.atual = None
+
+    def registrar(self, nome, construir, atualizar=None):
+        self._telas[nome] = (construir, atualizar)
+
+    def mostrar(self, nome):
+        """Switches to screen `nome`, building it on the first visit. Returns its frame."""
+        construir, atualizar = self._telas[nome]
+        frame = self._frames.get(nome)
+        if frame is None:
+            frame = self._frames[nome] = tk.Frame(self.container, bg=self.container.cget('bg'))
+            construir(frame)
+        if atualizar:
+            atualizar(frame)
+        if self.atual != nome:
+            if self.atual is not None:
+                self._frames[self.atual].grid_remove()
+            frame.grid(row=0, column=0, sticky='nsew')
+            self.atual = nome
+        return frame
+
+class ArenaDeGrupo:
+    """
+    Party-vs-horde battle window on top of batalha_em_grupo. Turn order comes from the engine's initiative queue:
+    on a hero's turn the player picks the action and, optionally, a target in the enemy list (otherwise the engine
+    picks one); every other turn is played by the engine. Each combatant is one Listbox row that is re-rendered only
+    when that combatant changes (observer notifications, coalesced to one pass per frame), so a horde of hundreds
+    costs the same per turn as a handful.
+    """
+    INTERVALO_MS = 16
+
+    def __init__(self, app, batalha):
+        import batalha_em_grupo # Imported on first use, like the win-chance model
+        self.descrever = batalha_em_grupo.descrever
+        self.app = app
+        self.master = app.master
+        self.batalha = batalha
+        self.agendador = AgendadorDeTurnos(app.master, app.agendador.modo)
+        self.registro = LogDeBatalha(app.master)
+        self.ator = None # Hero waiting for the player's action
+        self.automatico = False
+        self._linhas = {} # combatant -> (listbox, row)
+        self._sujos = set()
+        self._agendado = None
+
+        self.construir()
+        for lista, lado in ((self.lista_herois, batalha.herois), (self.lista_inimigos, batalha.inimigos)):
+            for linha, combatente in enumerate(lado.membros):
+                self._linhas[combatente] = (lista, linha)
+                lista.insert(tk.END, self.texto_da_linha(combatente))
+                combatente.observar(self._notificado)
+        self.log(f"⚔️ {len(batalha.herois)} herói(s) contra uma horda de {len(batalha.inimigos)}!")
+        self.agendador.agendar(500, self.proximo_turno)
+
+    def construir(self):
+        colors = self.app.colors
+        self.janela = tk.Toplevel(self.master)
+        self.janela.title("Arena em Grupo")
+        self.janela.geometry("1280x720")
+        self.janela.configure(bg=colors["bg_main"])
+        self.janela.protocol("WM_DELETE_WINDOW", self.fechar)
+        self.janela.bind("<space>", lambda event: self.agendador.pular())
+
+        listas_frame = tk.Frame(self.janela, bg=colors["bg_main"])
+        listas_frame.pack(side='top', expand=True, fill='both', padx=10, pady=10)
+        lista_style = {'font': self.app.stats_font, 'bg': colors["bg_widget"], 'selectbackground': colors["accent"], 'exportselection': False, 'relief': 'flat', 'highlightthickness': 0}
+        self.lista_herois = self._lista(listas_frame, "Heróis", colors["fg_title"], 'left', fg=colors["fg_success"], **lista_style)
+        self.lista_inimigos = self._lista(listas_frame, "Horda (clique para escolher o alvo)", colors["fg_danger"], 'right', fg=colors["fg_normal"], **lista_style)
+
+        botoes_frame = tk.Frame(self.janela, bg=colors["bg_main"])
+        botoes_frame.pack(side='bottom', fill='x', pady=10)
+        self.vez_label = tk.Label(self.janela, font=self.app.label_font, fg=colors["fg_title"], bg=colors["bg_main"])
+        self.vez_label.pack(side='bottom', fill='x')
+
+        log_frame = tk.Frame(self.janela, bg=colors["bg_widget"])
+        log_frame.pack(side='top', fill='both', padx=10)
+        log_widget = tk.Text(log_frame, height=10, bg=colors["bg_widget"], fg=colors["fg_normal"], font=self.app.stats_font, wrap='word', bd=0)
+        log_widget.pack(side='left', expand=True, fill='both', padx=5, pady=5)
+        scrollbar = tk.Scrollbar(log_frame, command=log_widget.yview, relief='flat')
+        scrollbar.pack(side='right', fill='y')
+        log_widget.config(yscrollcommand=scrollbar.set)
+        self.registro.anexar(log_widget)
+
+        btn_style = {'font': self.app.button_font, 'bg': colors["bg_frame"], 'fg': colors["fg_normal"], 'width': 14, 'pady': 5, 'relief': 'flat'}
+        self.btn_ataque = tk.Button(botoes_frame, text="Ataque Básico", command=lambda: self.jogar(None), **btn_style)
+        self.btn_habilidade = tk.Button(botoes_frame, text="Habilidades", command=self.menu_habilidades, **btn_style)
+        self.btn_automatico = tk.Button(botoes_frame, command=self.alternar_automatico, **btn_style)
+        self.btn_velocidade = tk.Button(botoes_frame, command=self.alternar_velocidade, **btn_style)
+        for coluna, botao in enumerate((self.btn_ataque, self.btn_habilidade, self.btn_automatico, self.btn_velocidade)):
+            botoes_frame.columnconfigure(coluna, weight=1)
+            botao.grid(row=0, column=coluna, padx=5)
+        self.atualizar_botoes('disabled')
+        self.janela.transient(self.master)
+        self.janela.grab_set()
+
+    def _lista(self, parent, titulo, cor_titulo, lado, **lista_style):
+        frame = tk.Frame(parent, bg=self.app.colors["bg_frame"], bd=2, relief='sunken')
+        frame.pack(side=lado, expand=True, fill='both', padx=5)
+        tk.Label(frame, text=titulo, font=self.app.button_font, fg=cor_titulo, bg=self.app.colors["bg_frame"]).pack()
+        lista = tk.Listbox(frame, **lista_style)
+        lista.pack(side='left', expand=True, fill='both', padx=5, pady=5)
+        scrollbar = tk.Scrollbar(frame, orient='vertical', command=lista.yview, relief='flat')
+        scrollbar.pack(side='right', fill='y')
+        lista.config(yscrollcommand=scrollbar.set)
+        return lista
+
+    # --- Rows ---
+    def texto_da_linha(self, combatente):
+        if combatente.vida_atual <= 0:
+            return f"☠️ {combatente.nome}"
+        marcas = [f"⬆️{k[0].upper()}" for k in combatente.buffs_ativos.keys()] + [f"⬇️{k[0].upper()}" for k in combatente.efeitos_status.keys()]
+        return "  ".join([combatente.nome, f"❤️ {combatente.vida_atual:.1f}/{combatente.vida_maxima:.1f}", *marcas])
+
+    def _notificado(self, combatente, marca):
+        self._sujos.add(combatente)
+        if self._agendado is None:
+            self._agendado = self.master.after(self.INTERVALO_MS, self.renderizar)
+
+    def renderizar(self):
+        """Rewrites the rows of the combatants that changed since the last render."""
+        if self._agendado is not None:
+            self.master.after_cancel(self._agendado)
+            self._agendado = None
+        sujos, self._sujos = self._sujos, set()
+        for combatente in sujos:
+            lista, linha = self._linhas[combatente]
+            selecionada = linha in lista.curselection()
+            lista.delete(linha)
+            lista.insert(linha, self.texto_da_linha(combatente))
+            if combatente.vida_atual <= 0:
+                lista.itemconfig(linha, fg=self.app.colors["disabled"])
+            elif selecionada:
+                lista.selection_set(linha)
+
+    def log(self, msg):
+        self.registro(msg)
+
+    # --- Turn flow ---
+    def proximo_turno(self):
+        """Pops the next combatant from the initiative queue and plays its turn (or waits for the player on a hero's turn)."""
+        ator = self.batalha.proximo()
+        if ator is None:
+            self.fim_da_batalha()
+            return
+        eventos, pode_agir = self.batalha.inicio_do_turno(ator)
+        for evento in eventos:
+            self.log(self.descrever(evento))
+        if not pode_agir:
+            self.agendador.agendar(600, self.proximo_turno)
+        elif self.batalha.eh_heroi(ator) and not self.automatico:
+            self.ator = ator
+            self.vez_label.config(text=f"Vez de {ator.nome}: escolha a ação (sem alvo marcado, ataca o inimigo mais ferido)")
+            self.agendador.retomar()
+            self.atualizar_botoes('normal')
+        else:
+            alvo = self.batalha.escolher_alvo(ator)
+            self.concluir_turno(ator, alvo, self.batalha.escolher_habilidade(ator, alvo))
+
+    def concluir_turno(self, ator, alvo, habilidade):
+        for evento in self.batalha.agir(ator, alvo, habilidade):
+            self.log(self.descrever(evento))
+        self.agendador.agendar(800, self.proximo_turno)
+
+    def alvo_marcado(self):
+        """The enemy selected in the list, if it is still standing; otherwise the one the engine would pick."""
+        selecao = self.lista_inimigos.curselection()
+        if selecao:
+            alvo = self.batalha.inimigos.membros[selecao[0]]
+            if alvo in self.batalha.inimigos:
+                return alvo
+        return self.batalha.escolher_alvo(self.ator)
+
+    def jogar(self, habilidade):
+        """The player's action for the hero whose turn it is (None: Basic Attack)."""
+        if self.ator is None:
+            return
+        alvo = self.alvo_marcado()
+        ator, self.ator = self.ator, None
+        self.atualizar_botoes('disabled')
+        self.vez_label.config(text="")
+        self.concluir_turno(ator, alvo, habilidade)
+
+    def menu_habilidades(self):
+        if self.ator is None:
+            return
+        ator = self.ator
+        popup = tk.Toplevel(self.janela)
+        popup.title(f"Habilidades de {ator.nome}")
+        popup.geometry("500x300")
+        popup.configure(bg=self.app.colors["bg_frame"])
+
+        def usar(habilidade):
+            popup.destroy()
+            self.jogar(habilidade)
+
+        for hab in rpg_dinamico.HABILIDADES_POR_CLASSE[ator.classe]:
+            btn = tk.Button(popup, text=f"{hab['nome']} (Custo: {hab['custo']})\n{hab['desc']}", command=lambda h=hab: usar(h),
+                            wraplength=380, justify='left', bg=self.app.colors["bg_frame"], fg=self.app.colors["fg_normal"], font=self.app.default_font, relief='flat')
+            if ator.caos_atual < hab['custo']:
+                btn.config(state='disabled', bg=self.app.colors["bg_widget"], fg=self.app.colors["disabled"])
+            btn.pack(fill='x', padx=10, pady=5)
+        popup.transient(self.janela)
+        popup.grab_set()
+
+    def alternar_automatico(self):
+        """Toggles the heroes between player control and the simulator's greedy policy. Does not take a turn."""
+        self.automatico = not self.automatico
+        self.atualizar_botoes('normal' if self.ator is not None else 'disabled')
+        if self.automatico and self.ator is not None: # Hand the pending hero turn to the engine too
+            ator, self.ator = self.ator, None
+            self.vez_label.config(text="")
+            alvo = self.batalha.escolher_alvo(ator)
+            self.concluir_turno(ator, alvo, self.batalha.escolher_habilidade(ator, alvo))
+
+    def alternar_velocidade(self):
+        self.agendador.proximo_modo()
+        self.atualizar_botoes('normal' if self.ator is not None else 'disabled')
+
+    def atualizar_botoes(self, state):
+        self.btn_ataque.config(state=state)
+        self.btn_habilidade.config(state=state)
+        self.btn_automatico.config(text=f"🤖 Automático: {'Sim' if self.automatico else 'Não'}")
+        self.btn_velocidade.config(text=f"⏩ {AgendadorDeTurnos.NOMES_MODOS[self.agendador.modo]}")
+
+    def fim_da_batalha(self):
+        vitoria = self.batalha.resultado() == "vitoria"
+        self.log(f"🎉 A horda foi derrotada em {self.batalha.turnos} turnos!" if vitoria else f"❌ O grupo caiu em {self.batalha.turnos} turnos.")
+        self.renderizar()
+        self.registro.descarregar()
+        messagebox.showinfo("Arena em Grupo", "Vitória do grupo!" if vitoria else "O grupo foi derrotado.", parent=self.janela)
+        self.fechar()
+
+    def fechar(self):
+        """Closes the arena. The party fought with copies, so the saved heroes are untouched."""
+        self.agendador.cancelar()
+        self.registro.cancelar()
+        if self._agendado is not None:
+            self.master.after_cancel(self._agendado)
+            self._agendado = None
+        for combatente in self._linhas:
+            combatente.deixar_de_observar(self._notificado)
+        self.janela.grab_release()
+        self.janela.destroy()
+        self.app.tela_inicial()
 
 class RPGApp:
     """
@@ -12,7 +508,10 @@ class RPGApp:
     def __init__(self, master):
         self.master = master
         self.master.title("RPG de Masmorra Dinâmica")
-        self.master.state('zoomed') 
+        try:
+            self.master.state('zoomed')
+        except tk.TclError:
+            self.master.attributes('-zoomed', True) # X11 has no 'zoomed' state
 
         # --- Cores e Estilo ---
         self.colors = {
@@ -33,20 +532,25 @@ class RPGApp:
         self.vidas_heroi = 3
         
         # --- Battle State ---
-        self.batalha_win = None
+        self.batalha_win = None # Built on the first battle, then hidden and reset in place between floors
         self.log_text_widget = None
-        self.heroi_stats_label = None
-        self.inimigo_stats_label = None
+        self.titulo_heroi_label = None
+        self.titulo_inimigo_label = None
+        self.registro_batalha = LogDeBatalha(master)
+        self.painel_heroi = None
+        self.painel_inimigo = None
         self.inimigo_atual = None
+        self.modelo_batalha = None
         self.botoes_acao_frame = None
+        self.btn_velocidade = None
+        self.agendador = AgendadorDeTurnos(master, rpg_dinamico.RITMO.modo) # Same RPG_RITMO setting as the console
 
         # --- Dungeon State ---
         self.andar_atual = 0
         self.total_andares = 3 # Começa com 3 andares
 
         # --- Styling ---
-        self.default_font = font.nametofont("TkDefaultFont")
-        self.default_font.configure(family="Segoe UI", size=10)
+        self.default_font = font.nametofont("TkDefaultFont") # Reconfigured after the first frame: the title screen only uses explicit fonts
         self.title_font = ("Segoe UI", 20, "bold")
         self.button_font = ("Segoe UI", 12)
         self.label_font = ("Segoe UI", 12)
@@ -54,49 +558,69 @@ class RPGApp:
 
         self.main_frame = tk.Frame(master, bg=self.colors["bg_main"])
         self.main_frame.pack(fill='both', expand=True, padx=20, pady=20)
-
+        self.telas = GerenciadorDeTelas(self.main_frame)
+        self.telas.registrar("menu", self.construir_menu, self.atualizar_menu)
+
+        # Only the title screen is built before the first frame; everything else is deferred or built on first use.
+        rpg_dinamico.definir_diario(diario.DiarioDeBatalha(rpg_dinamico.CAMINHO_DIARIO))
+        if rpg_dinamico.CAMINHO_EVENTOS: # Opt-in (RPG_EVENTOS): JSON Lines of every combat event, for offline analysis
+            rpg_dinamico.definir_eventos(eventos.ArquivoDeEventos(rpg_dinamico.CAMINHO_EVENTOS))
+            atexit.register(rpg_dinamico.EVENTOS.fechar)
+        if rpg_dinamico.CAMINHO_METRICAS: # Opt-in (RPG_METRICAS); the GUI renders status and log through its own widgets
+            rpg_dinamico.definir_metricas(metricas.Metricas(rpg_dinamico.CAMINHO_METRICAS), [(PainelDeStatus, "renderizar", "status"), (LogDeBatalha, "descarregar", "log")])
         self.tela_inicial()
+        self.master.after_idle(self.depois_do_primeiro_quadro)
 
-    def limpar_tela(self):
-        """Destroys all widgets in the main frame to prepare for a new screen."""
-        for widget in self.main_frame.winfo_children():
-            widget.destroy()
+    def depois_do_primeiro_quadro(self):
+        """Startup work that the title screen does not need: default font for popups and the interrupted-run check."""
+        self.default_font.configure(family="Segoe UI", size=10)
+        self.master.after(100, self.oferecer_retomada)
 
     def tela_inicial(self):
         """Displays the main menu screen."""
-        self.limpar_tela()
+        rpg_dinamico.HEROIS_CRIADOS.salvar() # Back at the menu: persist whatever changed during the run
+        self.telas.mostrar("menu")
 
-        tk.Label(self.main_frame, text="RPG de Masmorra", font=self.title_font, fg=self.colors["fg_title"], bg=self.colors["bg_main"]).pack(pady=(0, 20))
-        
-        vidas_texto = "❤️ " * self.vidas_heroi if self.vidas_heroi > 0 else "☠️ GAME OVER"
-        tk.Label(self.main_frame, text=f"Vidas restantes: {vidas_texto}", font=self.stats_font, fg=self.colors["fg_normal"], bg=self.colors["bg_main"]).pack(pady=5)
+    def construir_menu(self, frame):
+        """Builds the main menu widgets once; atualizar_menu fills in what depends on the game state."""
+        tk.Label(frame, text="RPG de Masmorra", font=self.title_font, fg=self.colors["fg_title"], bg=self.colors["bg_main"]).pack(pady=(0, 20))
 
-        if self.heroi_selecionado:
-            hero_info = f"Herói Ativo: {self.heroi_selecionado.nome} - {self.heroi_selecionado.classe} (Nível {self.heroi_selecionado.nivel})"
-            tk.Label(self.main_frame, text=hero_info, font=self.label_font, fg=self.colors["fg_success"], bg=self.colors["bg_main"]).pack(pady=10)
+        self.menu_vidas_label = tk.Label(frame, font=self.stats_font, fg=self.colors["fg_normal"], bg=self.colors["bg_main"])
+        self.menu_vidas_label.pack(pady=5)
+        self.menu_heroi_label = tk.Label(frame, font=self.label_font, fg=self.colors["fg_success"], bg=self.colors["bg_main"]) # Packed only while a hero is selected
 
-        button_frame = tk.Frame(self.main_frame, bg=self.colors["bg_main"])
-        button_frame.pack(pady=10)
+        self.menu_botoes_frame = tk.Frame(frame, bg=self.colors["bg_main"])
+        self.menu_botoes_frame.pack(pady=10)
 
         btn_style = {'font': self.button_font, 'bg': self.colors["bg_frame"], 'fg': self.colors["fg_normal"], 'activebackground': self.colors["accent"], 'activeforeground': 'white', 'width': 25, 'pady': 5, 'relief': 'flat', 'bd': 0}
 
-        tk.Button(button_frame, text="Criar Novo Herói", command=self.tela_criar_heroi, **btn_style).pack(pady=5)
-        tk.Button(button_frame, text="Selecionar Herói", command=self.tela_selecionar_heroi, **btn_style).pack(pady=5)
+        tk.Button(self.menu_botoes_frame, text="Criar Novo Herói", command=self.tela_criar_heroi, **btn_style).pack(pady=5)
+        tk.Button(self.menu_botoes_frame, text="Selecionar Herói", command=self.tela_selecionar_heroi, **btn_style).pack(pady=5)
 
-        if self.heroi_selecionado and self.vidas_heroi > 0:
-            dungeon_btn_style = btn_style.copy()
-            dungeon_btn_style['fg'] = self.colors["fg_success"]
-            tk.Button(button_frame, text="Entrar na Masmorra", command=self.iniciar_masmorra, **dungeon_btn_style).pack(pady=5)
-        else:
-            disabled_btn_style = btn_style.copy()
-            disabled_btn_style['state'] = 'disabled'
-            disabled_btn_style['bg'] = self.colors["bg_widget"]
-            disabled_btn_style['fg'] = self.colors["disabled"]
-            tk.Button(button_frame, text="Entrar na Masmorra", **disabled_btn_style).pack(pady=5)
+        self.btn_masmorra = tk.Button(self.menu_botoes_frame, text="Entrar na Masmorra", command=self.iniciar_masmorra, **btn_style)
+        self.btn_masmorra.pack(pady=5)
+        tk.Button(self.menu_botoes_frame, text="Arena em Grupo", command=self.tela_arena_em_grupo, **btn_style).pack(pady=5)
 
         exit_btn_style = btn_style.copy()
         exit_btn_style['fg'] = self.colors["fg_danger"]
-        tk.Button(button_frame, text="Sair do Jogo", command=self.master.quit, **exit_btn_style).pack(pady=10)
+        tk.Button(self.menu_botoes_frame, text="Sair do Jogo", command=self.master.quit, **exit_btn_style).pack(pady=10)
+
+    def atualizar_menu(self, frame):
+        """Refreshes the lives, the active hero line and the dungeon button."""
+        vidas_texto = "❤️ " * self.vidas_heroi if self.vidas_heroi > 0 else "☠️ GAME OVER"
+        self.menu_vidas_label.config(text=f"Vidas restantes: {vidas_texto}")
+
+        if self.heroi_selecionado:
+            hero_info = f"Herói Ativo: {self.heroi_selecionado.nome} - {self.heroi_selecionado.classe} (Nível {self.heroi_selecionado.nivel})"
+            self.menu_heroi_label.config(text=hero_info)
+            self.menu_heroi_label.pack(pady=10, before=self.menu_botoes_frame)
+        else:
+            self.menu_heroi_label.pack_forget()
+
+        if self.heroi_selecionado and self.vidas_heroi > 0:
+            self.btn_masmorra.config(state='normal', bg=self.colors["bg_frame"], fg=self.colors["fg_success"])
+        else:
+            self.btn_masmorra.config(state='disabled', bg=self.colors["bg_widget"], disabledforeground=self.colors["disabled"])
 
     def tela_criar_heroi(self):
         """Handles the hero creation process in a new window."""
@@ -141,7 +665,7 @@ class RPGApp:
         """Opens a window to distribute attribute points."""
         popup = tk.Toplevel(self.master)
         popup.title("Distribuir Pontos de Atributo")
-        popup.geometry("500x300")
+        popup.geometry("500x380")
         popup.configure(bg=self.colors["bg_frame"])
 
         pontos_restantes = tk.IntVar(value=pontos)
@@ -175,6 +699,23 @@ class RPGApp:
             tk.Label(frame, text=stat.replace('_base', '').capitalize(), fg=self.colors["fg_normal"], bg=self.colors["bg_frame"], width=10, anchor='w').pack(side='left')
             tk.Scale(frame, from_=0, to=pontos, variable=var, orient='horizontal', length=200, bg=self.colors["disabled"], fg=self.colors["fg_title"], troughcolor=self.colors["bg_widget"], highlightthickness=0, relief='flat').pack(side='left', expand=True, fill='x')
 
+        def sugerir_pontos():
+            """Fills the sliders with the optimizer's best split for this hero (simulated against the dungeon's enemy mix)."""
+            import otimizador # Imported on first use: keeps the simulator out of the startup path
+            popup.config(cursor='watch')
+            popup.update_idletasks()
+            try:
+                (forca, defesa, agilidade), pontuacao = otimizador.sugerir_distribuicao(heroi, pontos)
+            finally:
+                popup.config(cursor='')
+            stats_vars["forca_base"].set(forca)
+            stats_vars["defesa_base"].set(defesa)
+            stats_vars["agilidade_base"].set(agilidade)
+            sugestao_label.config(text=f"Sugestão: {forca} FOR / {defesa} DEF / {agilidade} AGI (~{pontuacao:.0%} de vitórias simuladas)")
+
+        sugestao_label = tk.Label(popup, text="", fg=self.colors["fg_success"], bg=self.colors["bg_frame"], font=self.stats_font)
+        sugestao_label.pack(pady=(10, 0))
+
         def confirmar_pontos():
             gastos = sum(var.get() for var in stats_vars.values())
             if gastos > pontos:
@@ -200,7 +741,10 @@ class RPGApp:
             else:
                 self.tela_inicial()
 
-        tk.Button(popup, text="Confirmar", command=confirmar_pontos, font=self.button_font, bg=self.colors["accent"], fg='white', relief='flat').pack(pady=20)
+        botoes = tk.Frame(popup, bg=self.colors["bg_frame"])
+        botoes.pack(pady=20)
+        tk.Button(botoes, text="Sugerir distribuição", command=sugerir_pontos, font=self.button_font, bg=self.colors["bg_widget"], fg=self.colors["fg_normal"], relief='flat').pack(side='left', padx=5)
+        tk.Button(botoes, text="Confirmar", command=confirmar_pontos, font=self.button_font, bg=self.colors["accent"], fg='white', relief='flat').pack(side='left', padx=5)
         popup.transient(self.master)
         popup.grab_set()
         self.master.wait_window(popup)
@@ -240,10 +784,11 @@ class RPGApp:
         status_text.insert(tk.END, "Selecione um herói para ver os detalhes.")
         status_text.config(state='disabled')
 
-        nomes_herois = list(rpg_dinamico.HEROIS_CRIADOS.keys())
-        for nome in nomes_herois:
-            heroi = rpg_dinamico.HEROIS_CRIADOS[nome]
-            listbox.insert(tk.END, f"{heroi.nome} - {heroi.classe} (Nível {heroi.nivel})")
+        # Only name/class/level are read for the list; the full hero is loaded when selected.
+        resumos = rpg_dinamico.HEROIS_CRIADOS.resumos()
+        nomes_herois = [nome for nome, _, _ in resumos]
+        for nome, classe, nivel in resumos:
+            listbox.insert(tk.END, f"{nome} - {classe} (Nível {nivel})")
 
         btn_confirmar = tk.Button(popup, text="Selecionar", font=self.button_font, bg=self.colors["accent"], fg='white', relief='flat', state='disabled')
         
@@ -274,6 +819,51 @@ class RPGApp:
         btn_confirmar.config(command=confirmar_selecao)
         btn_confirmar.pack(pady=10)
 
+    def tela_arena_em_grupo(self):
+        """Picks a party from the saved heroes and a horde size, then opens the party-vs-horde arena (copies of the heroes fight; no XP or loot)."""
+        if not rpg_dinamico.HEROIS_CRIADOS:
+            messagebox.showinfo("Aviso", "Nenhum herói foi criado ainda. Crie um primeiro!")
+            self.tela_criar_heroi()
+            return
+
+        popup = tk.Toplevel(self.master)
+        popup.title("Arena em Grupo")
+        popup.geometry("500x450")
+        popup.configure(bg=self.colors["bg_frame"])
+
+        tk.Label(popup, text="Escolha os heróis do grupo:", fg=self.colors["fg_normal"], bg=self.colors["bg_frame"], font=self.label_font).pack(pady=10)
+        listbox = tk.Listbox(popup, selectmode='multiple', font=self.label_font, bg=self.colors["bg_widget"], fg=self.colors["fg_normal"], selectbackground=self.colors["accent"], exportselection=False, relief='flat', highlightthickness=0)
+        listbox.pack(expand=True, fill='both', padx=10)
+        resumos = rpg_dinamico.HEROIS_CRIADOS.resumos()
+        for nome, classe, nivel in resumos:
+            listbox.insert(tk.END, f"{nome} - {classe} (Nível {nivel})")
+
+        tk.Label(popup, text="Tamanho da horda:", fg=self.colors["fg_normal"], bg=self.colors["bg_frame"], font=self.label_font).pack(pady=(10, 0))
+        tamanho_entry = tk.Entry(popup, width=10, font=self.label_font, bg=self.colors["bg_widget"], fg=self.colors["fg_normal"], insertbackground='white', relief='flat', justify='center')
+        tamanho_entry.insert(0, "8")
+        tamanho_entry.pack(pady=5)
+
+        def confirmar():
+            selecao = listbox.curselection()
+            if not selecao:
+                messagebox.showerror("Erro", "Escolha pelo menos um herói.", parent=popup)
+                return
+            try:
+                tamanho = int(tamanho_entry.get())
+                if tamanho < 1: raise ValueError
+            except ValueError:
+                messagebox.showerror("Erro", "O tamanho da horda deve ser um número inteiro positivo.", parent=popup)
+                return
+            import batalha_em_grupo
+            grupo = batalha_em_grupo.montar_grupo([resumos[i][0] for i in selecao])
+            horda = batalha_em_grupo.montar_horda(tamanho, max(heroi.nivel for heroi in grupo))
+            popup.destroy()
+            ArenaDeGrupo(self, batalha_em_grupo.BatalhaEmGrupo(grupo, horda))
+
+        tk.Button(popup, text="Lutar!", command=confirmar, font=self.button_font, bg=self.colors["accent"], fg='white', relief='flat').pack(pady=10)
+        popup.transient(self.master)
+        popup.grab_set()
+
     def iniciar_masmorra(self):
         """Prepares the hero and starts the first floor of the dungeon."""
         jogador = self.heroi_selecionado
@@ -283,6 +873,7 @@ class RPGApp:
         jogador.efeitos_status = {}
 
         self.andar_atual = 1
+        rpg_dinamico.DIARIO.iniciar_masmorra(jogador, andares=self.total_andares, vidas=self.vidas_heroi)
         
         messagebox.showinfo("Masmorra", f"Você entra na masmorra. Ela tem {self.total_andares} andares antes do chefe.")
         
@@ -298,18 +889,78 @@ class RPGApp:
             self.inimigo_atual = rpg_dinamico.gerar_inimigo(jogador.nivel)
             messagebox.showinfo("Novo Andar", f"Andar {self.andar_atual}/{self.total_andares}\nUm {self.inimigo_atual.nome} apareceu!")
         
+        rpg_dinamico.DIARIO.iniciar_batalha(self.inimigo_atual, self.andar_atual)
         self.iniciar_batalha_visual()
 
+    def oferecer_retomada(self):
+        """Offers to resume a dungeon run that was interrupted (crash or closed window), rebuilt from the battle journal."""
+        recuperacao = diario.recuperar(rpg_dinamico.CAMINHO_DIARIO, rpg_dinamico)
+        if recuperacao is None: return
+        contexto = recuperacao.contexto
+        if not messagebox.askyesno("Masmorra Interrompida", f"A masmorra de {recuperacao.heroi.nome} foi interrompida no andar {contexto.get('andar', 1)}/{contexto['andares']}.\nDeseja retomá-la de onde parou?"):
+            return
+
+        rpg_dinamico.HEROIS_CRIADOS[recuperacao.heroi.nome] = recuperacao.heroi
+        self.heroi_selecionado = recuperacao.heroi
+        self.vidas_heroi = contexto['vidas']
+        self.total_andares = contexto['andares']
+        self.andar_atual = contexto.get('andar', 1)
+
+        if contexto.get('vencida'): # Battle already won (interrupted during the rewards): go on from the next floor
+            rpg_dinamico.DIARIO.continuar_masmorra(self.heroi_selecionado, **contexto)
+            if self.andar_atual > self.total_andares:
+                self.vitoria_masmorra()
+            else:
+                self.andar_atual += 1
+                self.proximo_andar()
+        elif recuperacao.inimigo is None:
+            rpg_dinamico.DIARIO.continuar_masmorra(self.heroi_selecionado, **contexto)
+            self.proximo_andar()
+        else:
+            self.inimigo_atual = recuperacao.inimigo
+            rpg_dinamico.DIARIO.continuar_masmorra(self.heroi_selecionado, self.inimigo_atual, **contexto)
+            self.iniciar_batalha_visual()
+
     def iniciar_batalha_visual(self):
-        """Creates the battle window UI."""
+        """Shows the battle window for the current enemy and starts the first turn."""
+        if rpg_dinamico.EVENTOS is not None:
+            rpg_dinamico.EVENTOS.emitir(eventos.InicioDeBatalha(self.heroi_selecionado.nome, self.inimigo_atual.nome, self.inimigo_atual.nivel))
+        self.preparar_janela_batalha()
+        self.turno_do_jogador_inicio()
+
+    def preparar_janela_batalha(self):
+        """Builds the battle window on the first battle; afterwards resets the same window in place for the new enemy."""
+        if self.batalha_win is None or not self.batalha_win.winfo_exists():
+            self.construir_janela_batalha()
+
+        self.batalha_win.title(f"Batalha contra {self.inimigo_atual.nome}")
+        self.titulo_heroi_label.config(text=f"Herói: {self.heroi_selecionado.nome} ({self.heroi_selecionado.classe})")
+        self.titulo_inimigo_label.config(text=f"Inimigo: {self.inimigo_atual.nome}")
+        self.painel_heroi.vincular(self.heroi_selecionado)
+        self.painel_inimigo.vincular(self.inimigo_atual)
+        self.registro_batalha.anexar(self.log_text_widget)
+        self.modelo_batalha = None # Exact win-chance model of this matchup, built on the first turn
+        self.atualizar_botoes_acao('disabled') # The turn flow enables them when it is the player's turn
+
+        self.batalha_win.deiconify()
+        self.batalha_win.transient(self.master)
+        self.batalha_win.grab_set()
+
+    def esconder_batalha(self):
+        """Hides the battle window between floors (it is reset, not rebuilt, for the next battle)."""
+        self.agendador.cancelar()
         if self.batalha_win and self.batalha_win.winfo_exists():
-            self.batalha_win.destroy()
+            self.batalha_win.grab_release()
+            self.batalha_win.withdraw()
 
+    def construir_janela_batalha(self):
+        """Creates the battle window widgets. Called once; preparar_janela_batalha fills them for each battle."""
         self.batalha_win = tk.Toplevel(self.master)
-        self.batalha_win.title(f"Batalha contra {self.inimigo_atual.nome}")
+        self.batalha_win.withdraw()
         self.batalha_win.geometry("1280x720")
         self.batalha_win.configure(bg=self.colors["bg_main"])
-        self.batalha_win.protocol("WM_DELETE_WINDOW", self.acao_fugir)
+        self.batalha_win.protocol("WM_DELETE_WINDOW", self.fechar_batalha)
+        self.batalha_win.bind("<space>", lambda event: self.agendador.pular())
 
         # --- Layout Responsivo ---
         stats_frame = tk.Frame(self.batalha_win, bg=self.colors["bg_main"])
@@ -318,6 +969,9 @@ class RPGApp:
         self.botoes_acao_frame = tk.Frame(self.batalha_win, bg=self.colors["bg_main"])
         self.botoes_acao_frame.pack(side='bottom', fill='x', pady=20) # Posição ajustada
         
+        self.previsao_label = tk.Label(self.batalha_win, font=self.stats_font, fg=self.colors["fg_success"], bg=self.colors["bg_main"])
+        self.previsao_label.pack(side='bottom', fill='x')
+
         log_frame = tk.Frame(self.batalha_win, bg=self.colors["bg_widget"])
         log_frame.pack(side='top', expand=True, fill='both', padx=10, pady=10)
 
@@ -327,23 +981,24 @@ class RPGApp:
         inimigo_frame = tk.Frame(stats_frame, bg=self.colors["bg_frame"], bd=2, relief='sunken')
         inimigo_frame.pack(side='right', expand=True, fill='x', padx=(5, 0))
 
-        tk.Label(heroi_frame, text=f"Herói: {self.heroi_selecionado.nome} ({self.heroi_selecionado.classe})", font=self.button_font, fg=self.colors["fg_title"], bg=self.colors["bg_frame"]).pack()
-        self.heroi_stats_label = tk.Label(heroi_frame, text="", font=self.stats_font, fg=self.colors["fg_normal"], bg=self.colors["bg_frame"], justify='left')
-        self.heroi_stats_label.pack(fill='x', padx=5, pady=5)
+        self.titulo_heroi_label = tk.Label(heroi_frame, font=self.button_font, fg=self.colors["fg_title"], bg=self.colors["bg_frame"])
+        self.titulo_heroi_label.pack()
+        stats_style = {'font': self.stats_font, 'fg': self.colors["fg_normal"], 'bg': self.colors["bg_frame"]}
+        self.painel_heroi = PainelDeStatus(self.master, heroi_frame, self.heroi_selecionado, PainelDeStatus.CAMPOS_HEROI, **stats_style)
 
-        tk.Label(inimigo_frame, text=f"Inimigo: {self.inimigo_atual.nome}", font=self.button_font, fg=self.colors["fg_danger"], bg=self.colors["bg_frame"]).pack()
-        self.inimigo_stats_label = tk.Label(inimigo_frame, text="", font=self.stats_font, fg=self.colors["fg_normal"], bg=self.colors["bg_frame"], justify='left')
-        self.inimigo_stats_label.pack(fill='x', padx=5, pady=5)
+        self.titulo_inimigo_label = tk.Label(inimigo_frame, font=self.button_font, fg=self.colors["fg_danger"], bg=self.colors["bg_frame"])
+        self.titulo_inimigo_label.pack()
+        self.painel_inimigo = PainelDeStatus(self.master, inimigo_frame, self.inimigo_atual, PainelDeStatus.CAMPOS_INIMIGO, **stats_style)
 
         # --- Log de Batalha ---
         self.log_text_widget = tk.Text(log_frame, height=10, bg=self.colors["bg_widget"], fg=self.colors["fg_normal"], font=self.stats_font, wrap='word', bd=0)
         self.log_text_widget.pack(side='left', expand=True, fill='both', padx=5, pady=5)
         scrollbar = tk.Scrollbar(log_frame, command=self.log_text_widget.yview, relief='flat', bg=self.colors["bg_widget"])
         scrollbar.pack(side='right', fill='y')
-        self.log_text_widget.config(yscrollcommand=scrollbar.set)
+        self.log_text_widget.config(yscrollcommand=scrollbar.set, state='disabled')
 
         # --- Botões de Ação ---
-        self.botoes_acao_frame.columnconfigure((0, 1, 2, 3, 4), weight=1) # Centraliza os botões
+        self.botoes_acao_frame.columnconfigure((0, 1, 2, 3, 4, 5), weight=1) # Centraliza os botões
         btn_style = {'font': self.button_font, 'bg': self.colors["bg_frame"], 'fg': self.colors["fg_normal"], 'width': 12, 'pady': 5, 'relief':'flat'}
         
         tk.Button(self.botoes_acao_frame, text="Ataque Básico", command=self.acao_ataque, **btn_style).grid(row=0, column=0, padx=5)
@@ -351,11 +1006,12 @@ class RPGApp:
         tk.Button(self.botoes_acao_frame, text="Poção", command=self.acao_pocao, **btn_style).grid(row=0, column=2, padx=5)
         tk.Button(self.botoes_acao_frame, text="Fugir", command=self.acao_fugir, **btn_style).grid(row=0, column=3, padx=5)
         tk.Button(self.botoes_acao_frame, text="Status", command=self.tela_mostrar_status, **btn_style).grid(row=0, column=4, padx=5)
-
-        self.turno_do_jogador_inicio()
-        
-        self.batalha_win.transient(self.master)
-        self.batalha_win.grab_set()
+        tk.Button(self.botoes_acao_frame, text="Histórico", command=self.tela_historico_batalha, **btn_style).grid(row=0, column=5, padx=5)
+        self.btn_velocidade = tk.Button(self.botoes_acao_frame, command=self.alternar_velocidade, **btn_style)
+        self.btn_velocidade.grid(row=0, column=6, padx=5)
+        self.botoes_acao_frame.columnconfigure(6, weight=1)
+        self.atualizar_botao_velocidade()
+        tk.Label(self.botoes_acao_frame, text="Espaço: pular animação", font=self.default_font, fg=self.colors["disabled"], bg=self.colors["bg_main"]).grid(row=1, column=0, columnspan=7, pady=(5, 0))
 
     def tela_mostrar_status(self):
         """Displays a popup with the hero's detailed status. Does not take a turn."""
@@ -383,39 +1039,55 @@ class RPGApp:
         popup.transient(self.batalha_win)
         popup.grab_set()
 
-    def atualizar_status_batalha(self):
-        """Updates the hero and enemy stat labels in the battle window."""
-        jogador = self.heroi_selecionado
-        inimigo = self.inimigo_atual
-        
-        heroi_status_lines = [
-            f"❤️ {jogador.vida_atual:<5.1f} / {jogador.vida_maxima:.1f}",
-            f"🔮 {jogador.caos_atual:<5.1f} / {jogador.caos_maximo:.1f}",
-            f"💪 {jogador.forca:<5.1f}  🛡️ {jogador.defesa:<5.1f}  👟 {jogador.agilidade:<5.1f}"
-        ]
-        if jogador.buffs_ativos:
-            heroi_status_lines.append(" ".join([f"⬆️{k[0].upper()}" for k in jogador.buffs_ativos.keys()]))
-        if jogador.efeitos_status:
-            heroi_status_lines.append(" ".join([f"⬇️{k[0].upper()}" for k in jogador.efeitos_status.keys()]))
-        
-        self.heroi_stats_label.config(text="\n".join(heroi_status_lines))
-        
-        inimigo_status_lines = [
-            f"❤️ {inimigo.vida_atual:<5.1f} / {inimigo.vida_maxima:.1f}",
-            f"💪 {inimigo.forca:<5.1f}  🛡️ {inimigo.defesa:<5.1f}  👟 {inimigo.agilidade:<5.1f}"
-        ]
-        if inimigo.efeitos_status:
-            inimigo_status_lines.append(" ".join([f"⬇️{k[0].upper()}" for k in inimigo.efeitos_status.keys()]))
+    def tela_historico_batalha(self):
+        """Displays the full battle log, including lines already trimmed from the battle window. Does not take a turn."""
+        self.registro_batalha.descarregar()
+        popup = tk.Toplevel(self.batalha_win)
+        popup.title("Histórico da Batalha")
+        popup.geometry("600x600")
+        popup.configure(bg=self.colors["bg_frame"])
+
+        text_frame = tk.Frame(popup, bg=self.colors["bg_widget"])
+        text_frame.pack(expand=True, fill='both', padx=15, pady=15)
 
-        self.inimigo_stats_label.config(text="\n".join(inimigo_status_lines))
+        historico_widget = tk.Text(text_frame, bg=self.colors["bg_widget"], fg=self.colors["fg_normal"], font=self.stats_font, wrap='word', bd=0, highlightthickness=0)
+        historico_widget.insert(tk.END, "\n".join(self.registro_batalha.historico()))
+        historico_widget.see(tk.END)
+        historico_widget.config(state='disabled')
+        historico_widget.pack(side='left', expand=True, fill='both')
+
+        scrollbar = tk.Scrollbar(text_frame, command=historico_widget.yview, relief='flat')
+        scrollbar.pack(side='right', fill='y')
+        historico_widget.config(yscrollcommand=scrollbar.set)
+
+        tk.Button(popup, text="Fechar", command=popup.destroy, font=self.button_font, bg=self.colors["accent"], fg='white', relief='flat').pack(pady=10)
+
+        popup.transient(self.batalha_win)
+        popup.grab_set()
+
+    def alternar_velocidade(self):
+        """Cycles the animation speed (normal, fast, instant). Does not take a turn."""
+        self.agendador.proximo_modo()
+        self.atualizar_botao_velocidade()
+
+    def atualizar_botao_velocidade(self):
+        self.btn_velocidade.config(text=f"⏩ {AgendadorDeTurnos.NOMES_MODOS[self.agendador.modo]}")
+
+    def fechar_batalha(self):
+        """Battle window close button: tries to flee on the player's turn; while the battle flow is still playing out it just skips ahead."""
+        if self.agendador.ocupado():
+            self.agendador.pular()
+        else:
+            self.acao_fugir()
+
+    def atualizar_status_batalha(self):
+        """Brings the hero and enemy panels up to date now; only fields that changed since the last render are touched."""
+        self.painel_heroi.renderizar()
+        self.painel_inimigo.renderizar()
 
     def log_batalha(self, msg):
-        """Adds a message to the battle log."""
-        if self.log_text_widget and self.log_text_widget.winfo_exists():
-            self.log_text_widget.config(state='normal')
-            self.log_text_widget.insert(tk.END, msg + "\n")
-            self.log_text_widget.see(tk.END)
-            self.log_text_widget.config(state='disabled')
+        """Adds a message to the battle log (written to the widget on the next frame)."""
+        self.registro_batalha(msg)
 
     def atualizar_botoes_acao(self, state='normal'):
         """Updates the state of action buttons based on game state."""
@@ -424,14 +1096,15 @@ class RPGApp:
         
         try:
             for child in self.botoes_acao_frame.winfo_children():
-                child.config(state=state)
+                if child is not self.btn_velocidade and isinstance(child, tk.Button): # Speed stays usable during the enemy phase
+                    child.config(state=state)
 
             if state == 'normal':
                 jogador = self.heroi_selecionado
                 btn_habilidade = self.botoes_acao_frame.grid_slaves(row=0, column=1)[0]
                 btn_pocao = self.botoes_acao_frame.grid_slaves(row=0, column=2)[0]
 
-                if not rpg_dinamico.CLASSES_BASE[jogador.classe]['habilidades']:
+                if not rpg_dinamico.HABILIDADES_POR_CLASSE[jogador.classe]:
                     btn_habilidade.config(state='disabled')
                 if not jogador.inventario_pocoes:
                     btn_pocao.config(state='disabled')
@@ -440,6 +1113,7 @@ class RPGApp:
 
     def turno_do_jogador_inicio(self):
         """Processes start-of-turn effects for the player."""
+        self.atualizar_previsao()
         self.log_batalha("-" * 20)
         self.heroi_selecionado.processar_efeitos_e_buffs(self.log_batalha)
         self.atualizar_status_batalha()
@@ -447,12 +1121,24 @@ class RPGApp:
 
         if 'congelado' in self.heroi_selecionado.efeitos_status:
             self.log_batalha(f"🥶 {self.heroi_selecionado.nome} está congelado e perde o turno!")
-            self.master.after(1500, self.turno_inimigo)
+            self.agendador.agendar(1500, self.turno_inimigo)
         else:
             self.log_batalha("Sua vez de agir!")
+            self.agendador.retomar()
             self.atualizar_botoes_acao('normal')
 
 
+    def atualizar_previsao(self):
+        """Shows the exact win chance from the start of this turn, assuming the simulator's greedy policy from here on."""
+        import probabilidade # Imported on first use: keeps the simulator out of the startup path
+        if self.modelo_batalha is None:
+            self.modelo_batalha = probabilidade.ModeloDeBatalha(self.heroi_selecionado, self.inimigo_atual, "gulosa")
+        vitoria, _, turnos_vitoria = self.modelo_batalha.prever(self.heroi_selecionado, self.inimigo_atual)
+        texto = f"Chance de vitória: {vitoria:.1%}"
+        if vitoria > 0.0005:
+            texto += f" (vence em ~{turnos_vitoria:.1f} turnos)"
+        self.previsao_label.config(text=texto + " — jogando a melhor habilidade disponível a cada turno")
+
     def turno_jogador_fim(self, acao_jogador):
         """A generic handler for a player's turn with error handling."""
         try:
@@ -461,12 +1147,12 @@ class RPGApp:
             self.atualizar_status_batalha()
             if self.verificar_fim_batalha():
                 return
-            self.master.after(1500, self.turno_inimigo)
+            self.agendador.agendar(1500, self.turno_inimigo)
         except Exception as e:
+            import traceback # Error path only: not worth importing at startup
             traceback.print_exc()
             messagebox.showerror("Erro Crítico", f"Ocorreu um erro no turno do jogador:\n{e}")
-            if self.batalha_win and self.batalha_win.winfo_exists():
-                self.batalha_win.destroy()
+            self.esconder_batalha()
             self.tela_inicial()
 
     def acao_ataque(self):
@@ -474,7 +1160,7 @@ class RPGApp:
 
     def acao_habilidade_menu(self):
         jogador = self.heroi_selecionado
-        habilidades = rpg_dinamico.CLASSES_BASE[jogador.classe]['habilidades']
+        habilidades = rpg_dinamico.HABILIDADES_POR_CLASSE[jogador.classe]
 
         popup = tk.Toplevel(self.batalha_win)
         popup.title("Escolher Habilidade")
@@ -527,14 +1213,17 @@ class RPGApp:
 
     def acao_fugir(self):
         self.atualizar_botoes_acao('disabled')
-        chance = 50 + (self.heroi_selecionado.agilidade - self.inimigo_atual.agilidade)
-        if rpg_dinamico.random.randint(1, 100) <= chance:
+        escapou, chance, quebrado = rpg_dinamico.resolver_fuga(self.heroi_selecionado, self.inimigo_atual)
+        self.log_batalha(f"Tentando fugir... (Chance: {chance:.1f}%)")
+        if escapou:
             self.log_batalha("Você fugiu com sucesso!")
-            self.master.after(1500, lambda: messagebox.showinfo("Fuga", "Você conseguiu escapar da batalha."))
-            self.master.after(1500, self.fuga_masmorra)
+            self.emitir_fim_de_batalha("fugiu")
+            self.agendador.agendar(1500, lambda: messagebox.showinfo("Fuga", "Você conseguiu escapar da batalha."))
+            self.agendador.agendar(1500, self.fuga_masmorra)
         else:
             self.log_batalha("Fuga falhou!")
-            self.master.after(1500, self.turno_inimigo)
+            if quebrado: self.log_batalha(f"🔥 Oh não! Seu item '{quebrado.nome_formatado()}' foi destruído!")
+            self.agendador.agendar(1500, self.turno_inimigo)
 
     def turno_inimigo(self):
         """Handles the enemy's turn with error handling."""
@@ -553,12 +1242,12 @@ class RPGApp:
                 self.atualizar_status_batalha()
                 if self.verificar_fim_batalha(): return
                 
-                self.master.after(1000, self.turno_do_jogador_inicio)
+                self.agendador.agendar(1000, self.turno_do_jogador_inicio)
         except Exception as e:
+            import traceback
             traceback.print_exc()
             messagebox.showerror("Erro Crítico", f"Ocorreu um erro no turno do inimigo:\n{e}")
-            if self.batalha_win and self.batalha_win.winfo_exists():
-                self.batalha_win.destroy()
+            self.esconder_batalha()
             self.tela_inicial()
 
     def verificar_fim_batalha(self):
@@ -567,19 +1256,26 @@ class RPGApp:
         inimigo = self.inimigo_atual
 
         if not inimigo.esta_vivo():
+            rpg_dinamico.DIARIO.fim_de_batalha("vitoria")
+            self.emitir_fim_de_batalha("vitoria")
             self.log_batalha(f"🎉 Você venceu a batalha contra {inimigo.nome}!")
-            self.master.after(1500, self.vitoria_batalha)
+            self.agendador.agendar(1500, self.vitoria_batalha)
             return True
         elif not jogador.esta_vivo():
+            self.emitir_fim_de_batalha("derrota")
             self.log_batalha("❌ Você foi derrotado!")
-            self.master.after(1500, self.derrota_masmorra)
+            self.agendador.agendar(1500, self.derrota_masmorra)
             return True
         return False
 
+    def emitir_fim_de_batalha(self, resultado):
+        """Closes the battle in the combat event stream, if one is on (the GUI does not count turns)."""
+        if rpg_dinamico.EVENTOS is not None:
+            rpg_dinamico.EVENTOS.emitir(eventos.FimDeBatalha(self.heroi_selecionado.nome, self.inimigo_atual.nome, resultado, None))
+
     def vitoria_batalha(self):
         """Handles the rewards and progression after winning a battle."""
-        if self.batalha_win and self.batalha_win.winfo_exists():
-            self.batalha_win.destroy()
+        self.esconder_batalha()
         
         jogador = self.heroi_selecionado
         inimigo = self.inimigo_atual
@@ -590,6 +1286,7 @@ class RPGApp:
         xp_ganho = inimigo.nivel * 5 + rpg_dinamico.random.randint(1, 5)
         nivel_antes = jogador.nivel
         jogador.ganhar_xp(xp_ganho)
+        rpg_dinamico.DIARIO.registrar_heroi()
         messagebox.showinfo("Vitória!", f"Você ganhou {xp_ganho} de XP!")
         
         if jogador.nivel > nivel_antes:
@@ -600,12 +1297,12 @@ class RPGApp:
 
     def fuga_masmorra(self):
         """Handles the consequences of fleeing a battle."""
-        if self.batalha_win and self.batalha_win.winfo_exists():
-            self.batalha_win.destroy()
+        self.esconder_batalha()
 
         jogador = self.heroi_selecionado
         xp_perdido = (jogador.xp_atual * rpg_dinamico.PENALIDADE_XP_MORTE) / 2 # Perde metade da penalidade normal
         jogador.xp_atual -= xp_perdido
+        self.encerrar_masmorra("fugiu")
         
         messagebox.showinfo("Fuga da Masmorra", f"Você fugiu da masmorra!\nPerdeu {xp_perdido:.0f} de XP, mas manteve sua vida.")
         self.tela_inicial()
@@ -613,13 +1310,13 @@ class RPGApp:
 
     def derrota_masmorra(self):
         """Handles the consequences of losing a battle."""
-        if self.batalha_win and self.batalha_win.winfo_exists():
-            self.batalha_win.destroy()
+        self.esconder_batalha()
 
         self.vidas_heroi -= 1
         jogador = self.heroi_selecionado
         xp_perdido = jogador.xp_atual * rpg_dinamico.PENALIDADE_XP_MORTE
         jogador.xp_atual -= xp_perdido
+        self.encerrar_masmorra("derrota")
         
         messagebox.showinfo("Derrota", f"Você foi derrotado na masmorra!\nPerdeu uma vida e {xp_perdido:.0f} de XP!")
 
@@ -629,8 +1326,15 @@ class RPGApp:
         else:
             self.tela_inicial()
 
+    def encerrar_masmorra(self, resultado):
+        """End of a run: closes the journal and, when enabled, exports this run's metrics."""
+        rpg_dinamico.DIARIO.encerrar(resultado)
+        if rpg_dinamico.METRICAS is not None:
+            rpg_dinamico.METRICAS.fim_de_masmorra(resultado)
+
     def vitoria_masmorra(self):
         """Handles winning the entire dungeon."""
+        self.encerrar_masmorra("venceu_masmorra")
         messagebox.showinfo("Vitória!", "🏆 Você conquistou a masmorra! 🏆\nPrepare-se para um novo desafio ainda maior!")
         self.total_andares += 1
         self.iniciar_masmorra()
@@ -659,10 +1363,11 @@ class RPGApp:
         rewards_panel.pack(side='left', fill='y', padx=(5, 0), ipadx=10)
 
         tk.Label(rewards_panel, text="Escolha sua recompensa:", font=self.label_font, fg=self.colors["fg_normal"], bg=self.colors["bg_frame"]).pack(pady=10)
-        recompensas = [rpg_dinamico.gerar_recompensa_aleatoria(jogador.nivel) for _ in range(3)]
+        recompensas = rpg_dinamico.gerar_recompensas(jogador.nivel)
 
         def proximo_passo():
             popup.destroy()
+            rpg_dinamico.DIARIO.fim_de_andar()
             if self.andar_atual > self.total_andares:
                 self.vitoria_masmorra()
             else:
@@ -682,8 +1387,7 @@ class RPGApp:
                     messagebox.showinfo("Item Ignorado", "Você decidiu não equipar o item.", parent=popup)
 
             elif isinstance(item, rpg_dinamico.Pocao):
-                if len(jogador.inventario_pocoes) < rpg_dinamico.MAX_POCOES_INVENTARIO:
-                    jogador.inventario_pocoes.append(item)
+                if rpg_dinamico.resolver_guardar_pocao(jogador, item):
                     messagebox.showinfo("Poção", f"{item.nome_formatado()} adicionada ao inventário.", parent=popup)
                 else:
                     messagebox.showwarning("Inventário cheio", "Seu inventário de poções está cheio!", parent=popup)
@@ -702,124 +1406,86 @@ class RPGApp:
         popup.grab_set()
         self.master.wait_window(popup)
 
-if __name__ == "__main__":
-    def patch_rpg_dinamico():
-        """
-        Modifies the rpg_dinamico classes in memory to accept a logging function,
-        avoiding the need to change the original file. This makes the logic
-        compatible with the GUI without altering the console version.
-        """
-        rpg_dinamico.Item.nome_formatado = lambda self: f"{self.nome} [{self.raridade.capitalize()}] {'✨' if self.raridade == 'raro' else ''}".strip()
-        
-        def patched_equip_str(self):
-            bonus = [f"{b:+.1f} {s}" for s,b in [("FOR",self.bonus_forca), ("DEF",self.bonus_defesa), ("AGI",self.bonus_agilidade), ("VIDA",self.bonus_vida), ("CAOS", self.bonus_caos)] if b]
-            return f"{self.nome_formatado()} ({', '.join(bonus)})"
-        rpg_dinamico.Equipamento.__str__ = patched_equip_str
-
-        def patched_get_status_texto_com_itens(self):
-            lines = []
-            lines.append(f"--- {self.nome} (Nível {self.nivel}) ---")
-            lines.append(f"❤️ Vida: {self.vida_atual:.1f} / {self.vida_maxima:.1f}")
-            lines.append(f"🔮 Caos: {self.caos_atual:.1f} / {self.caos_maximo:.1f}")
-            if self.nivel < 5: lines.append(f"📊 XP: {self.xp_atual:.0f} / {self.xp_proximo_nivel}")
-            else: lines.append("📊 XP: MÁXIMO")
-            lines.append("\n--- Atributos Totais ---")
-            lines.append(f"💪 Força: {self.forca:.1f}")
-            lines.append(f"🛡️ Defesa: {self.defesa:.1f}")
-            lines.append(f"👟 Agilidade: {self.agilidade:.1f}")
-            lines.append("\n--- Equipamentos ---")
-            for slot, item in self.equipamentos.items():
-                item_str = str(item) if item else 'Vazio'
-                lines.append(f"   - {slot.capitalize()}: {item_str}")
-            lines.append("\n--- Inventário de Poções ---")
-            if self.inventario_pocoes: [lines.append(f"   - {pocao}") for pocao in self.inventario_pocoes]
-            else: lines.append("   Vazio")
-            if self.buffs_ativos: lines.append("\n--- Buffs Ativos ---"); lines.append("   " + ", ".join([f"{data['valor']:.1f} {tipo.upper()} ({data['turnos_restantes']}t)" for tipo, data in self.buffs_ativos.items()]))
-            if self.efeitos_status: lines.append("\n--- Efeitos de Status ---"); lines.append("   " + ", ".join([f"{tipo.upper()} ({data['turnos_restantes']}t)" for tipo, data in self.efeitos_status.items()]))
-            return "\n".join(lines)
-        rpg_dinamico.Heroi.get_status_texto_com_itens = patched_get_status_texto_com_itens
-
-        def patched_processar_efeitos(self, logger=print):
-            for tipo, data in list(self.buffs_ativos.items()):
-                data['turnos_restantes'] -= 1
-                if data['turnos_restantes'] <= 0: logger(f"O efeito do buff de {tipo.upper()} em {self.nome} acabou."); del self.buffs_ativos[tipo]
-            for tipo, data in list(self.efeitos_status.items()):
-                if tipo == 'veneno':
-                    dano_veneno = data['dano']
-                    logger(f"🐍 {self.nome} sofre {dano_veneno:.1f} de dano de veneno.")
-                    self.receber_dano(dano_veneno)
-                data['turnos_restantes'] -= 1
-                if data['turnos_restantes'] <= 0: logger(f"O efeito de {tipo.upper()} em {self.nome} acabou."); del self.efeitos_status[tipo]
-        rpg_dinamico.Personagem.processar_efeitos_e_buffs = patched_processar_efeitos
-
-        def patched_atacar(self, alvo, logger=print):
-            logger(f"💥 {self.nome} usa um Ataque Básico contra {alvo.nome}!")
-            chance_acerto = 90 - (alvo.agilidade - self.agilidade); chance_acerto = max(20, min(100, chance_acerto))
-            if rpg_dinamico.random.randint(1, 100) > chance_acerto: logger(f"   💨 ERROU!"); return
-            reducao_de_dano = alvo.defesa * 0.3; dano = max(1.0, self.forca - reducao_de_dano)
-            logger(f"   🎯 Acertou! Dano Físico: {dano:.1f}!"); alvo.receber_dano(dano)
-        rpg_dinamico.Personagem.atacar = patched_atacar
-
-        def patched_usar_habilidade(self, alvo, habilidade, logger=print):
-            self.caos_atual -= habilidade['custo']; multiplicador = habilidade['multiplicador'] + self.proficiencia; dano_magico = self.forca * multiplicador
-            logger(f"✨ {self.nome} usa {habilidade['nome']}!")
-            if dano_magico > 0: logger(f"   Dano Mágico: {dano_magico:.1f}!"); alvo.receber_dano(dano_magico)
-            efeito = habilidade.get('efeito')
-            if efeito and rpg_dinamico.random.random() < efeito['chance']:
-                if efeito['tipo'] in ['veneno', 'congelado']:
-                    logger(f"   🎯 O alvo foi afetado por {efeito['tipo'].upper()}!")
-                    alvo.efeitos_status[efeito['tipo']] = {'turnos_restantes': efeito['duracao'] + 1, 'dano': efeito.get('dano', 0)}
-                elif efeito['tipo'] == 'buff_forca':
-                    logger(f"   💪 Você se sente mais forte!")
-                    self.buffs_ativos['forca'] = {'valor': efeito['valor'], 'turnos_restantes': efeito['duracao'] + 1}
-            return True
-        rpg_dinamico.Heroi.usar_habilidade = patched_usar_habilidade
-
-        def patched_usar_pocao(self, pocao_index, logger=print):
-            pocao = self.inventario_pocoes.pop(pocao_index)
-            logger(f"Você usou {pocao.nome_formatado()}!")
-            if pocao.tipo == 'cura':
-                vida_curada = min(self.vida_maxima - self.vida_atual, pocao.valor)
-                self.vida_atual += vida_curada
-                logger(f"   Recuperou {vida_curada:.1f} de vida.")
-            elif pocao.tipo == 'restaura_caos':
-                caos_recuperado = min(self.caos_maximo - self.caos_atual, pocao.valor)
-                self.caos_atual += caos_recuperado
-                logger(f"   Recuperou {caos_recuperado:.1f} de caos.")
-            else:
-                tipo_buff = pocao.tipo.split('_')[1]
-                self.buffs_ativos[tipo_buff] = {'valor': pocao.valor, 'turnos_restantes': pocao.duracao + 1}
-                logger(f"   Seu {tipo_buff.upper()} aumentou em {pocao.valor:.1f} por {pocao.duracao} turnos!")
-        rpg_dinamico.Heroi.usar_pocao = patched_usar_pocao
-        
-        def patched_ganhar_xp(self, quantidade):
-            if self.nivel >= 5: return
-            self.xp_atual += quantidade
-            while self.xp_atual >= self.xp_proximo_nivel and self.nivel < 5:
-                xp_excedente = self.xp_atual - self.xp_proximo_nivel
-                self.nivel += 1
-                self.xp_atual = xp_excedente
-                self.xp_proximo_nivel = rpg_dinamico.XP_PARA_NIVEL.get(self.nivel, float('inf'))
-                self.proficiencia += 0.05
-                self.vida_base += 20
-                self.caos_base += 10
-        rpg_dinamico.Heroi.ganhar_xp = patched_ganhar_xp
-
-        def patched_equipar_item(self, novo_equip):
-            item_atual = self.equipamentos.get(novo_equip.slot)
-            bonus_vida_antigo = item_atual.bonus_vida if item_atual else 0.0
-            bonus_caos_antigo = item_atual.bonus_caos if item_atual else 0.0
-            self.equipamentos[novo_equip.slot] = novo_equip
-            delta_vida = novo_equip.bonus_vida - bonus_vida_antigo
-            delta_caos = novo_equip.bonus_caos - bonus_caos_antigo
-            self.vida_atual += delta_vida
-            self.caos_atual += delta_caos
-            self.vida_atual = min(self.vida_maxima, self.vida_atual)
-            self.caos_atual = min(self.caos_maximo, self.caos_atual)
-        rpg_dinamico.Heroi.equipar_item = patched_equipar_item
-
-
-    patch_rpg_dinamico()
+def patch_rpg_dinamico():
+    """
+    Modifies the rpg_dinamico classes in memory to accept a logging function,
+    avoiding the need to change the original file. This makes the logic
+    compatible with the GUI without altering the console version.
+    """
+    rpg_dinamico.Item.nome_formatado = lambda self: f"{self.nome} [{self.raridade.capitalize()}] {'✨' if self.raridade == 'raro' else ''}".strip()
+    
+    def patched_equip_str(self):
+        bonus = [f"{b:+.1f} {s}" for s,b in [("FOR",self.bonus_forca), ("DEF",self.bonus_defesa), ("AGI",self.bonus_agilidade), ("VIDA",self.bonus_vida), ("CAOS", self.bonus_caos)] if b]
+        return f"{self.nome_formatado()} ({', '.join(bonus)})"
+    rpg_dinamico.Equipamento.__str__ = patched_equip_str
+
+    def patched_get_status_texto_com_itens(self):
+        lines = []
+        lines.append(f"--- {self.nome} (Nível {self.nivel}) ---")
+        lines.append(f"❤️ Vida: {self.vida_atual:.1f} / {self.vida_maxima:.1f}")
+        lines.append(f"🔮 Caos: {self.caos_atual:.1f} / {self.caos_maximo:.1f}")
+        if self.nivel < 5: lines.append(f"📊 XP: {self.xp_atual:.0f} / {self.xp_proximo_nivel}")
+        else: lines.append("📊 XP: MÁXIMO")
+        lines.append("\n--- Atributos Totais ---")
+        lines.append(f"💪 Força: {self.forca:.1f}")
+        lines.append(f"🛡️ Defesa: {self.defesa:.1f}")
+        lines.append(f"👟 Agilidade: {self.agilidade:.1f}")
+        lines.append("\n--- Equipamentos ---")
+        for slot, item in self.equipamentos.items():
+            item_str = str(item) if item else 'Vazio'
+            lines.append(f"   - {slot.capitalize()}: {item_str}")
+        lines.append("\n--- Inventário de Poções ---")
+        if self.inventario_pocoes: [lines.append(f"   - {pocao}") for pocao in self.inventario_pocoes]
+        else: lines.append("   Vazio")
+        if self.buffs_ativos: lines.append("\n--- Buffs Ativos ---"); lines.append("   " + ", ".join([f"{data['valor']:.1f} {tipo.upper()} ({data['turnos_restantes']}t)" for tipo, data in self.buffs_ativos.items()]))
+        if self.efeitos_status: lines.append("\n--- Efeitos de Status ---"); lines.append("   " + ", ".join([f"{tipo.upper()} ({data['turnos_restantes']}t)" for tipo, data in self.efeitos_status.items()]))
+        return "\n".join(lines)
+    rpg_dinamico.Heroi.get_status_texto_com_itens = patched_get_status_texto_com_itens
+
+    # The combat methods hand typed events (eventos.py) to the logger; LogDeBatalha only formats the ones it shows.
+    def patched_processar_efeitos(self, logger=print):
+        for evento, tipo, valor in rpg_dinamico.resolver_efeitos(self):
+            if evento == 'dano_efeito': logger(eventos.DanoDeEfeito(self.nome, tipo, valor, self.vida_atual))
+            else: logger(eventos.EfeitoExpirou(self.nome, tipo, evento == 'buff_expirou'))
+    rpg_dinamico.Personagem.processar_efeitos_e_buffs = patched_processar_efeitos
+
+    def patched_atacar(self, alvo, logger=print):
+        dano = rpg_dinamico.resolver_ataque(self, alvo)
+        logger(eventos.Erro(self.nome, alvo.nome, None) if dano is None else eventos.Acerto(self.nome, alvo.nome, None, dano, alvo.vida_atual))
+    rpg_dinamico.Personagem.atacar = patched_atacar
+
+    def patched_usar_habilidade(self, alvo, habilidade, logger=print):
+        resultado = rpg_dinamico.resolver_habilidade(self, alvo, habilidade)
+        if resultado is None: logger("Caos insuficiente para usar esta habilidade!"); return False
+        dano_magico, efeito_aplicado = resultado
+        logger(eventos.Habilidade(self.nome, alvo.nome, habilidade['nome'], dano_magico, alvo.vida_atual, self.caos_atual))
+        if efeito_aplicado:
+            efeito = habilidade['efeito']
+            logger(eventos.EfeitoAplicado(self.nome if efeito_aplicado == 'buff_forca' else alvo.nome, efeito_aplicado, efeito.get('valor', efeito.get('dano', 0)), efeito['duracao'] + 1))
+        return True
+    rpg_dinamico.Heroi.usar_habilidade = patched_usar_habilidade
+
+    def patched_usar_pocao(self, pocao_index, logger=print):
+        pocao, quantidade = rpg_dinamico.resolver_pocao(self, pocao_index)
+        logger(eventos.Pocao(self.nome, pocao.nome, pocao.raridade, pocao.tipo, quantidade, pocao.duracao))
+    rpg_dinamico.Heroi.usar_pocao = patched_usar_pocao
+    
+    def patched_ganhar_xp(self, quantidade):
+        if self.nivel >= 5: return
+        self.xp_atual += quantidade
+        while self.xp_atual >= self.xp_proximo_nivel and self.nivel < 5:
+            rpg_dinamico.resolver_subida_de_nivel(self)
+    rpg_dinamico.Heroi.ganhar_xp = patched_ganhar_xp
+
+    def patched_equipar_item(self, novo_equip):
+        rpg_dinamico.resolver_equipar(self, novo_equip)
+    rpg_dinamico.Heroi.equipar_item = patched_equipar_item
+
+def main():
     root = tk.Tk()
     app = RPGApp(root)
-    root.mainloop()
\ No newline at end of file
+    root.after_idle(patch_rpg_dinamico) # Rebinding the game methods is not needed to paint the title screen
+    root.mainloop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+Servidor de masmorras em asyncio: muitas sessões independentes do jogo completo (criação de herói, distribuição de
+pontos, batalhas, recompensas) num só processo, por um socket TCP local.
+
+Protocolo em linhas JSON (UTF-8, uma mensagem por linha):
+    servidor -> cliente  {"texto": [linhas], "tela": "menu", "pergunta": "> "}   uma por pergunta; leva junto tudo o
+                         que a sessão escreveu desde a pergunta anterior. `tela` diz que pergunta é (para clientes
+                         automáticos). A última mensagem da sessão traz "fim": true no lugar da pergunta.
+    cliente -> servidor  {"resposta": "1"} ou só a linha de texto (dá para jogar com nc/telnet).
+
+Cada sessão é uma corrotina parada no readline() da sua conexão: uma sessão ociosa custa o socket e o quadro da
+corrotina, sem thread. As regras são as de rpg_dinamico.resolver_*, com um random.Random por sessão; os heróis vivem
+num dict da sessão, isolados de HEROIS_CRIADOS, e não há diário nem pausas dramáticas (o ritmo fica com o cliente).
+Os textos são os mesmos do console.
+
+Uso: python -m rpg_dinamico serve [--host 127.0.0.1] [--porta 7878]
+     python benchmarks/carga.py --ociosas 2000 --ativas 200   (gerador de carga)
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import random
+
+import rpg_dinamico
+from rpg_dinamico import CLASSES_BASE, Equipamento, Pocao
+
+PORTA_PADRAO = 7878
+LIMITE_DA_LINHA = 4096  # Respostas maiores que isso derrubam a sessão
+
+
+def elevar_limite_de_arquivos():
+    """Sobe o limite de descritores abertos ao máximo permitido (cada sessão é um socket). Sem efeito fora do Unix."""
+    try: import resource
+    except ImportError: return None
+    _, maximo = resource.getrlimit(resource.RLIMIT_NOFILE)
+    with contextlib.suppress(ValueError, OSError): resource.setrlimit(resource.RLIMIT_NOFILE, (maximo, maximo))
+    return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+
+
+class Sessao:
+    """Um jogador: o estado que no console vive em main() e em HEROIS_CRIADOS, aqui por conexão."""
+    def __init__(self, leitor, escritor, rng=None):
+        self.leitor = leitor; self.escritor = escritor; self.rng = rng or random.Random()
+        self.herois = {}  # nome -> Heroi, só desta sessão
+        self.heroi = None; self.vidas = 3; self.andares = 3
+        self._saida = []
+
+    # --- E/S ---
+    def escrever(self, *linhas): self._saida.extend(linhas)
+
+    def escrever_status(self, exibir):
+        """Reaproveita as telas de status do console (que usam print). Não há await no meio, então nenhuma outra sessão escreve junto."""
+        buffer = io.StringIO()
+        with contextlib.redirect_stdout(buffer): exibir()
+        self._saida.extend(buffer.getvalue().splitlines())
+
+    async def enviar(self, mensagem):
+        mensagem["texto"] = self._saida; self._saida = []
+        self.escritor.write(json.dumps(mensagem, ensure_ascii=False).encode("utf-8") + b"\n")
+        await self.escritor.drain()
+
+    async def perguntar(self, tela, pergunta="> "):
+        """Manda o que foi escrito e a pergunta, e espera a resposta. A conexão fechada vira EOFError, como o input() do console."""
+        await self.enviar({"tela": tela, "pergunta": pergunta})
+        linha = await self.leitor.readline()
+        if not linha: raise EOFError
+        texto = linha.decode("utf-8", "replace").strip()
+        if texto.startswith("{"):
+            with contextlib.suppress(ValueError, AttributeError): texto = str(json.loads(texto).get("resposta", ""))
+        return texto
+
+    async def perguntar_numero(self, tela, pergunta="> "):
+        """int da resposta, ou None (com o aviso do console) se não for um número."""
+        try: return int(await self.perguntar(tela, pergunta))
+        except ValueError: self.escrever("Por favor, digite um número."); return None
+
+    # --- Menu principal (main do console) ---
+    async def jogar(self):
+        while True:
+            self.escrever("====== RPG DE MASMORRA ======", f"Vidas restantes: {'❤️' * self.vidas if self.vidas > 0 else '☠️'}")
+            if self.heroi: self.escrever(f"Herói Ativo: {self.heroi.nome} - {self.heroi.classe.capitalize()} (Nível {self.heroi.nivel})")
+            self.escrever("", "1. Criar Novo Herói", "2. Selecionar Herói Existente")
+            if self.heroi and self.vidas > 0: self.escrever("3. Entrar na Masmorra")
+            self.escrever("4. Sair do Jogo")
+            escolha = await self.perguntar("menu")
+            if escolha == '1': self.heroi = await self.criar_heroi()
+            elif escolha == '2': self.heroi = await self.selecionar_heroi()
+            elif escolha == '3' and self.heroi and self.vidas > 0: await self.masmorras()
+            elif escolha == '4': self.escrever("Obrigado por jogar!"); await self.enviar({"fim": True}); return
+            else: self.escrever("Opção inválida!")
+
+    async def masmorras(self):
+        heroi = self.heroi
+        while self.vidas > 0:
+            heroi.vida_atual = heroi.vida_maxima; heroi.caos_atual = heroi.caos_maximo; heroi.buffs_ativos = {}; heroi.efeitos_status = {}
+            resultado = await self.masmorra()
+            if resultado in ("derrota", "perdeu_masmorra"):
+                self.vidas -= 1; xp_perdido = heroi.xp_atual * rpg_dinamico.PENALIDADE_XP_MORTE; heroi.xp_atual -= xp_perdido
+                self.escrever(f"Você foi derrotado... Perdeu uma vida e {xp_perdido:.0f} de XP.")
+                self.escrever("GAME OVER." if self.vidas <= 0 else f"Você tem {self.vidas} vidas restantes."); return
+            if resultado == "fugiu":
+                xp_perdido = (heroi.xp_atual * rpg_dinamico.PENALIDADE_XP_MORTE) / 2; heroi.xp_atual -= xp_perdido
+                self.escrever(f"Você fugiu da masmorra, perdendo {xp_perdido:.0f} de XP."); return
+            self.escrever("", "🏆🏆🏆 VOCÊ CONQUISTOU A MASMORRA! 🏆🏆🏆"); self.andares += 1
+            self.escrever(f"A próxima masmorra terá {self.andares} andares. Prepare-se!")
+
+    # --- Heróis ---
+    async def criar_heroi(self):
+        self.escrever("--- CRIAÇÃO DE HERÓI ---")
+        nome = await self.perguntar("nome", "Qual o nome do seu Herói? ")
+        while not nome or nome in self.herois:
+            self.escrever("Esse nome já existe nesta sessão." if nome else "O nome não pode ficar vazio.")
+            nome = await self.perguntar("nome", "Qual o nome do seu Herói? ")
+        classes = list(CLASSES_BASE)
+        self.escrever("", "Escolha a sua classe:", *(f"{i + 1}. {c.capitalize()} - {d['desc']}" for i, (c, d) in enumerate(CLASSES_BASE.items())))
+        while True:
+            escolha = await self.perguntar_numero("classe")
+            if escolha is not None and 1 <= escolha <= len(classes): break
+            if escolha is not None: self.escrever("Escolha inválida.")
+        classe = classes[escolha - 1]; heroi = rpg_dinamico.Heroi(nome, classe, **CLASSES_BASE[classe]["stats"])
+        await self.distribuir_pontos(heroi, rpg_dinamico.PONTOS_DISTRIBUICAO_INICIAL)
+        self.herois[nome] = heroi
+        self.escrever(f"--- Herói {nome} - O {classe.capitalize()} foi criado! ---"); self.escrever_status(heroi.mostrar_status_completo)
+        return heroi
+
+    async def selecionar_heroi(self):
+        if not self.herois: self.escrever("Nenhum herói criado."); return await self.criar_heroi()
+        nomes = list(self.herois)
+        self.escrever("--- SELECIONE SEU HERÓI ---", *(f"{i + 1}. {h.nome} - {h.classe.capitalize()} (Nível {h.nivel})" for i, h in enumerate(self.herois.values())))
+        while True:
+            escolha = await self.perguntar_numero("heroi")
+            if escolha is not None and 1 <= escolha <= len(nomes): self.escrever(f"Você selecionou {nomes[escolha - 1]}!"); return self.herois[nomes[escolha - 1]]
+            if escolha is not None: self.escrever("Escolha inválida.")
+
+    async def distribuir_pontos(self, heroi, pontos):
+        while pontos > 0:
+            self.escrever("--- DISTRIBUA SEUS PONTOS DE ATRIBUTO ---"); self.escrever_status(heroi.mostrar_status_completo)
+            self.escrever("", f"Você tem {pontos} pontos restantes para distribuir.", "Qual atributo você quer aumentar?", "1. Força", "2. Defesa", "3. Agilidade", "4. Terminei")
+            atributo = await self.perguntar("atributo")
+            if atributo == '4': break
+            if atributo not in ('1', '2', '3'): self.escrever("Escolha inválida."); continue
+            quantos = await self.perguntar_numero("pontos", f"Quantos pontos (de {pontos})? ")
+            if quantos is None: continue
+            if quantos <= 0 or quantos > pontos: self.escrever("Valor inválido."); continue
+            if atributo == '1': heroi.forca_base += quantos
+            elif atributo == '2': heroi.defesa_base += quantos
+            else: heroi.agilidade_base += quantos
+            pontos -= quantos; heroi.vida_atual = heroi.vida_maxima; heroi.caos_atual = heroi.caos_maximo
+
+    async def ganhar_xp(self, quantidade):
+        heroi = self.heroi
+        if heroi.nivel >= 5: return
+        heroi.xp_atual += quantidade; self.escrever("", f"✨ Você ganhou {quantidade} de XP! ({heroi.xp_atual:.0f}/{heroi.xp_proximo_nivel})")
+        while heroi.xp_atual >= heroi.xp_proximo_nivel and heroi.nivel < 5:
+            rpg_dinamico.resolver_subida_de_nivel(heroi)
+            self.escrever("", "🎉🎉🎉 LEVEL UP! 🎉🎉🎉", f"Você alcançou o Nível {heroi.nivel}!", "Sua proficiência com habilidades aumentou! Vida e Caos base também aumentaram.")
+            await self.distribuir_pontos(heroi, rpg_dinamico.PONTOS_POR_NIVEL)
+            heroi.vida_atual = heroi.vida_maxima; heroi.caos_atual = heroi.caos_maximo
+            self.escrever("Seus atributos foram fortalecidos e sua Vida/Caos foram restaurados!")
+
+    # --- Masmorra e batalha (iniciar_masmorra / iniciar_batalha do console) ---
+    async def masmorra(self):
+        heroi = self.heroi
+        for andar in range(1, self.andares + 1):
+            self.escrever(f"--- MASMORRA - ANDAR {andar}/{self.andares} ---"); inimigo = rpg_dinamico.gerar_inimigo(heroi.nivel, self.rng)
+            await self.perguntar("enter", "Pressione ENTER para prosseguir...")
+            resultado = await self.batalha(inimigo)
+            if resultado in ("derrota", "fugiu"): return resultado
+        self.escrever("--- ANDAR FINAL - O Covil do Chefe ---"); chefe = rpg_dinamico.gerar_chefe(heroi.nivel, self.rng)
+        await self.perguntar("enter", "Pressione ENTER para enfrentar o desafio final...")
+        return "venceu_masmorra" if await self.batalha(chefe) == "vitoria" else "perdeu_masmorra"
+
+    def efeitos(self, personagem):
+        for evento, tipo, valor in rpg_dinamico.resolver_efeitos(personagem):
+            if evento == 'buff_expirou': self.escrever(f"O efeito do buff de {tipo.upper()} acabou.")
+            elif evento == 'dano_efeito': self.escrever(f"🐍 {personagem.nome} sofre {valor:.1f} de dano de veneno.")
+            else: self.escrever(f"O efeito de {tipo.upper()} em {personagem.nome} acabou.")
+
+    def atacar(self, atacante, alvo):
+        if 'congelado' in atacante.efeitos_status: self.escrever(f"🥶 {atacante.nome} está congelado e não pode se mover!"); return
+        self.escrever("", f"💥 {atacante.nome} usa um Ataque Básico contra {alvo.nome}!")
+        dano = rpg_dinamico.resolver_ataque(atacante, alvo, self.rng)
+        self.escrever("   💨 ERROU!" if dano is None else f"   🎯 Acertou! Dano Físico causado: {dano:.1f}!")
+
+    async def batalha(self, inimigo):
+        heroi = self.heroi; self.escrever(f"⚔️  Um {inimigo.nome} apareceu! ⚔️")
+        while heroi.esta_vivo() and inimigo.esta_vivo():
+            self.escrever(f"--- BATALHA: {heroi.nome} vs {inimigo.nome} ---"); self.escrever_status(heroi.mostrar_status); self.escrever("", "VS", ""); self.escrever_status(inimigo.mostrar_status)
+            self.efeitos(heroi)
+            if not heroi.esta_vivo(): break
+            turno_usado = False
+            while not turno_usado:
+                self.escrever("", "Sua vez de agir!", "1. Atacar", "2. Usar Poção", "3. Tentar Fugir", "4. Ver Status Detalhado")
+                acao = await self.perguntar("acao")
+                if acao == "1": turno_usado = await self.menu_de_ataque(inimigo)
+                elif acao == "2": turno_usado = await self.usar_pocao()
+                elif acao == "3":
+                    escapou, chance, quebrado = rpg_dinamico.resolver_fuga(heroi, inimigo, self.rng)
+                    self.escrever("", f"Tentando fugir... (Chance: {chance:.1f}%)")
+                    if escapou: self.escrever("...Você conseguiu escapar!"); return "fugiu"
+                    self.escrever("...A fuga falhou!"); turno_usado = True
+                    if quebrado: self.escrever(f"🔥 Oh não! Seu item '{quebrado.nome_formatado()}' foi destruído!")
+                elif acao == "4": self.escrever_status(heroi.mostrar_status_completo)
+                else: self.escrever("Ação inválida.")
+            if not inimigo.esta_vivo(): break
+            self.efeitos(inimigo)
+            if not inimigo.esta_vivo(): break
+            self.atacar(inimigo, heroi)
+        if not heroi.esta_vivo(): return "derrota"
+        heroi.buffs_ativos = {}; heroi.efeitos_status = {}
+        self.escrever("", f"Você venceu a batalha contra {inimigo.nome}!")
+        await self.ganhar_xp(inimigo.nivel * 5 + self.rng.randint(1, 5))
+        await self.recompensa()
+        return "vitoria"
+
+    async def menu_de_ataque(self, inimigo):
+        """True se o turno foi usado (como menu_de_ataque do console)."""
+        while True:
+            self.escrever("Escolha seu tipo de ataque:", "1. Ataque Básico (Dano Físico, usa Força vs Defesa)", "2. Habilidades de Classe (Usa Caos)", "3. Voltar")
+            escolha = await self.perguntar("ataque")
+            if escolha == '1': self.atacar(self.heroi, inimigo); return True
+            if escolha == '2':
+                if await self.menu_de_habilidades(inimigo): return True
+            elif escolha == '3': return False
+            else: self.escrever("Opção inválida.")
+
+    async def menu_de_habilidades(self, inimigo):
+        heroi = self.heroi; habilidades = rpg_dinamico.HABILIDADES_POR_CLASSE[heroi.classe]
+        while True:
+            self.escrever("--- ESCOLHA UMA HABILIDADE ---", *(f"{i + 1}. {h['nome']} (Custo: {h['custo']} Caos) - {h['desc']}" for i, h in enumerate(habilidades)), f"{len(habilidades) + 1}. Voltar")
+            escolha = await self.perguntar_numero("habilidade")
+            if escolha is None: continue
+            if escolha == len(habilidades) + 1: return False
+            if not 1 <= escolha <= len(habilidades): self.escrever("Escolha inválida."); continue
+            habilidade = habilidades[escolha - 1]; resultado = rpg_dinamico.resolver_habilidade(heroi, inimigo, habilidade, self.rng)
+            if resultado is None: self.escrever("Caos insuficiente para usar esta habilidade!"); return False
+            dano, efeito = resultado; self.escrever("", f"✨ {heroi.nome} usa {habilidade['nome']}!")
+            if dano > 0: self.escrever(f"   Dano Mágico causado: {dano:.1f}! (Ignora defesa)")
+            if efeito in ('veneno', 'congelado'): self.escrever(f"   🎯 O alvo foi afetado por {efeito.upper()}!")
+            elif efeito == 'buff_forca': self.escrever("   💪 Você se sente mais forte!")
+            return True
+
+    async def usar_pocao(self):
+        heroi = self.heroi
+        if not heroi.inventario_pocoes: self.escrever("Seu inventário de poções está vazio."); return False
+        self.escrever("--- INVENTÁRIO DE POÇÕES ---", *(f"{i + 1}. {p}" for i, p in enumerate(heroi.inventario_pocoes)), f"{len(heroi.inventario_pocoes) + 1}. Voltar")
+        while True:
+            escolha = await self.perguntar_numero("pocao")
+            if escolha is None: continue
+            if escolha == len(heroi.inventario_pocoes) + 1: return False
+            if not 1 <= escolha <= len(heroi.inventario_pocoes): self.escrever("Escolha inválida."); continue
+            pocao, quantidade = rpg_dinamico.resolver_pocao(heroi, escolha - 1); self.escrever("", f"Você usou {pocao.nome_formatado()}!")
+            if pocao.tipo == 'cura': self.escrever(f"   Você recuperou {quantidade:.1f} de vida.")
+            elif pocao.tipo == 'restaura_caos': self.escrever(f"   Você recuperou {quantidade:.1f} de caos.")
+            else: self.escrever(f"   Seu atributo {pocao.tipo.split('_')[1].upper()} aumentou em {pocao.valor:.1f} por {pocao.duracao} turnos!")
+            return True
+
+    async def recompensa(self):
+        heroi = self.heroi; recompensas = rpg_dinamico.gerar_recompensas(heroi.nivel, rng=self.rng)
+        self.escrever("🏆 RECOMPENSAS DA BATALHA 🏆", "Você encontrou alguns tesouros! Escolha sabiamente:")
+        while True:
+            self.escrever("Escolha uma recompensa:", *(f"{i + 1}. {item}" for i, item in enumerate(recompensas)), f"{len(recompensas) + 1}. Não quero nenhum item.")
+            escolha = await self.perguntar_numero("recompensa")
+            if escolha is None: continue
+            if escolha == len(recompensas) + 1: self.escrever("Você decide não levar nenhum tesouro."); return
+            if not 1 <= escolha <= len(recompensas): self.escrever("Escolha inválida."); continue
+            item = recompensas[escolha - 1]
+            if isinstance(item, Equipamento):
+                atual = heroi.equipamentos[item.slot]
+                self.escrever("✨ AVALIANDO ITEM ✨", f"Item novo: {item}", f"Equipado atualmente: {atual if atual else 'Nada'}")
+                if (await self.perguntar("equipar", "Deseja equipar o novo item? (S/N) ")).upper() == 'S':
+                    if atual: self.escrever(f"   Substituindo {atual.nome_formatado()}...")
+                    rpg_dinamico.resolver_equipar(heroi, item); self.escrever(f"   {heroi.nome} equipou {item.nome_formatado()}."); return
+                self.escrever("Você decidiu não equipar este item.")
+            elif isinstance(item, Pocao):
+                if rpg_dinamico.resolver_guardar_pocao(heroi, item): self.escrever(f"Você guardou {item.nome_formatado()} no inventário."); return
+                self.escrever("Seu inventário de poções está cheio!")
+
+
+# --- SERVIDOR ---
+class Servidor:
+    """Aceita conexões e roda uma Sessao por conexão. `ativas` e `atendidas` contam as sessões."""
+    def __init__(self, seed=None):
+        self._sementes = random.Random(seed); self.ativas = 0; self.atendidas = 0
+
+    async def atender(self, leitor, escritor):
+        self.ativas += 1; self.atendidas += 1
+        sessao = Sessao(leitor, escritor, random.Random(self._sementes.getrandbits(64)))
+        try: await sessao.jogar()
+        except (EOFError, ConnectionError, ValueError): pass  # Cliente saiu no meio (ou mandou uma linha longa demais)
+        finally:
+            self.ativas -= 1; escritor.close()
+            with contextlib.suppress(ConnectionError): await escritor.wait_closed()
+
+    async def servir(self, host="127.0.0.1", porta=PORTA_PADRAO, pronto=None):
+        servidor = await asyncio.start_server(self.atender, host, porta, limit=LIMITE_DA_LINHA, backlog=4096)
+        endereco = servidor.sockets[0].getsockname()
+        if pronto: pronto(endereco)
+        async with servidor: await servidor.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m rpg_dinamico serve", description="Serve sessões independentes do jogo por TCP, em linhas JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO, help="0 escolhe uma porta livre")
+    parser.add_argument("--seed", type=int, default=None, help="semente das sessões (cada uma ganha a sua, derivada desta)")
+    args = parser.parse_args(argv)
+    limite = elevar_limite_de_arquivos()
+    # A primeira linha diz onde o servidor está ouvindo (o gerador de carga lê a porta dela).
+    pronto = lambda endereco: print(f"Servindo em {endereco[0]}:{endereco[1]} (até {limite or '?'} conexões abertas)", flush=True)
+    with contextlib.suppress(KeyboardInterrupt): asyncio.run(Servidor(args.seed).servir(args.host, args.porta, pronto))
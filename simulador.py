@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Simulador de batalhas em lote para balanceamento.
+Roda as mesmas regras de combate do jogo (rpg_dinamico.resolver_*) sem input(), limpar_tela() ou time.sleep(),
+com políticas de ação roteirizadas, e gera um relatório por classe e nível em CSV/JSON.
+
+Dois motores com as mesmas regras: o vetorizado (simulador_vetorizado.py, NumPy) resolve um turno de todas as batalhas
+de uma vez e é o padrão quando o NumPy está instalado; é ele que passa de 100 mil batalhas/s em um núcleo. O escalar
+(simular_batalha, abaixo) roda as funções resolver_* uma batalha por vez, na casa das dezenas de milhares por segundo;
+fica para quem não tem NumPy, para --eventos e como referência do --verificar.
+
+Com --eventos, cada acerto, erro, habilidade e efeito das batalhas vai para um arquivo JSON Lines (eventos.py).
+
+Uso: python -m rpg_dinamico simulate --batalhas 10000 --niveis 1-5 --politica gulosa --csv saida.csv [--eventos eventos.jsonl]
+"""
+import argparse
+import csv
+import importlib.util
+import json
+import random
+import time
+
+import eventos
+import rpg_dinamico
+
+MAX_TURNOS = 500  # Trava de segurança: conta como derrota se ninguém cair antes disso.
+
+# --- POLÍTICAS DE AÇÃO ---
+# Uma política recebe (heroi, inimigo) e devolve a habilidade a usar, ou None para o Ataque Básico.
+def politica_ataque(heroi, inimigo): return None
+
+def politica_habilidade(heroi, inimigo):
+    """Usa a primeira habilidade de dano que couber no caos atual."""
+    for hab in rpg_dinamico.HABILIDADES_POR_CLASSE[heroi.classe]:
+        if hab['multiplicador'] > 0 and heroi.caos_atual >= hab['custo']: return hab
+    return None
+
+def politica_gulosa(heroi, inimigo):
+    """Ativa o buff de força se não estiver ativo; senão usa a habilidade de maior dano que couber no caos."""
+    melhor = None
+    for hab in rpg_dinamico.HABILIDADES_POR_CLASSE[heroi.classe]:
+        if heroi.caos_atual < hab['custo']: continue
+        efeito = hab.get('efeito')
+        if efeito and efeito['tipo'] == 'buff_forca' and 'forca' not in heroi.buffs_ativos: return hab
+        if efeito and efeito['tipo'] in ['veneno', 'congelado'] and efeito['tipo'] not in inimigo.efeitos_status: return hab
+        if hab['multiplicador'] > 0 and (melhor is None or hab['multiplicador'] > melhor['multiplicador']): melhor = hab
+    return melhor
+
+POLITICAS = {"ataque": politica_ataque, "habilidade": politica_habilidade, "gulosa": politica_gulosa}
+
+# --- CRIAÇÃO DE HERÓIS SIMULADOS ---
+# Pesos (Força, Defesa, Agilidade) usados para repartir os pontos livres automaticamente.
+DISTRIBUICOES = {"equilibrada": (1, 1, 1), "forca": (1, 0, 0), "defesa": (0, 1, 0), "agilidade": (0, 0, 1), "ofensiva": (2, 0, 1)}
+
+def distribuir_automaticamente(heroi, pontos, pesos):
+    """Reparte `pontos` entre Força/Defesa/Agilidade na proporção de `pesos`; a sobra do arredondamento vai para o maior peso."""
+    total = sum(pesos); partes = [pontos * p // total for p in pesos]
+    partes[pesos.index(max(pesos))] += pontos - sum(partes)
+    heroi.forca_base += partes[0]; heroi.defesa_base += partes[1]; heroi.agilidade_base += partes[2]
+    heroi.vida_atual = heroi.vida_maxima; heroi.caos_atual = heroi.caos_maximo
+
+def criar_heroi_simulado(classe, nivel=1, distribuicao="equilibrada"):
+    """Monta um herói da classe no nível pedido, seguindo a mesma progressão do jogo (pontos iniciais + subidas de nível)."""
+    pesos = DISTRIBUICOES[distribuicao]
+    heroi = rpg_dinamico.Heroi(f"Sim-{classe}", classe, **rpg_dinamico.CLASSES_BASE[classe]["stats"])
+    distribuir_automaticamente(heroi, rpg_dinamico.PONTOS_DISTRIBUICAO_INICIAL, pesos)
+    while heroi.nivel < nivel:
+        heroi.xp_atual = heroi.xp_proximo_nivel; rpg_dinamico.resolver_subida_de_nivel(heroi)
+        distribuir_automaticamente(heroi, rpg_dinamico.PONTOS_POR_NIVEL, pesos)
+    return heroi
+
+def restaurar(personagem):
+    personagem.vida_atual = personagem.vida_maxima; personagem.caos_atual = personagem.caos_maximo
+    personagem.buffs_ativos.clear(); personagem.efeitos_status.clear()
+
+# --- MOTOR DE BATALHA ---
+def simular_turno(heroi, inimigo, politica=politica_ataque, rng=random):
+    """Um turno na mesma ordem de iniciar_batalha: efeitos e ação do herói, depois efeitos e ataque do inimigo, parando em quem cair."""
+    rpg_dinamico.resolver_efeitos(heroi)
+    if heroi.vida_atual <= 0: return
+    if 'congelado' not in heroi.efeitos_status:
+        habilidade = politica(heroi, inimigo)
+        if habilidade is None or rpg_dinamico.resolver_habilidade(heroi, inimigo, habilidade, rng) is None:
+            rpg_dinamico.resolver_ataque(heroi, inimigo, rng)
+    if inimigo.vida_atual <= 0: return
+    rpg_dinamico.resolver_efeitos(inimigo)
+    if inimigo.vida_atual <= 0: return
+    if 'congelado' not in inimigo.efeitos_status: rpg_dinamico.resolver_ataque(inimigo, heroi, rng)
+
+def simular_batalha(heroi, inimigo, politica=politica_ataque, rng=random):
+    """Roda uma batalha até o fim. Devolve (venceu, turnos, vida_restante_do_heroi)."""
+    turnos = 0
+    if rpg_dinamico.EVENTOS is not None: rpg_dinamico.EVENTOS.emitir(eventos.InicioDeBatalha(heroi.nome, inimigo.nome, inimigo.nivel))
+    while heroi.vida_atual > 0 and inimigo.vida_atual > 0 and turnos < MAX_TURNOS:
+        turnos += 1; simular_turno(heroi, inimigo, politica, rng)
+    venceu = inimigo.vida_atual <= 0 and heroi.vida_atual > 0
+    if rpg_dinamico.EVENTOS is not None: rpg_dinamico.EVENTOS.emitir(eventos.FimDeBatalha(heroi.nome, inimigo.nome, "vitoria" if venceu else "derrota", turnos))
+    return venceu, turnos, heroi.vida_atual
+
+def _percentil(valores_ordenados, p):
+    if not valores_ordenados: return 0.0
+    return valores_ordenados[min(len(valores_ordenados) - 1, int(p / 100 * len(valores_ordenados)))]
+
+def resumir(classe, nivel, resultados, vida_maxima):
+    """Agrega a lista de (venceu, turnos, vida_restante) de um grupo em uma linha do relatório."""
+    vitorias = [r for r in resultados if r[0]]
+    turnos = sorted(r[1] for r in vitorias)
+    vida_pct = sorted(r[2] / vida_maxima * 100 for r in vitorias)
+    histograma_turnos = {}
+    for t in turnos: histograma_turnos[t] = histograma_turnos.get(t, 0) + 1
+    histograma_vida = [0] * 10
+    for v in vida_pct: histograma_vida[min(9, int(v // 10))] += 1
+    return {
+        "classe": classe, "nivel": nivel, "batalhas": len(resultados), "vitorias": len(vitorias),
+        "taxa_vitoria": len(vitorias) / len(resultados) if resultados else 0.0,
+        "turnos_media": sum(turnos) / len(turnos) if turnos else 0.0,
+        "turnos_p10": _percentil(turnos, 10), "turnos_p50": _percentil(turnos, 50), "turnos_p90": _percentil(turnos, 90),
+        "vida_restante_pct_media": sum(vida_pct) / len(vida_pct) if vida_pct else 0.0,
+        "vida_restante_pct_p10": _percentil(vida_pct, 10), "vida_restante_pct_p50": _percentil(vida_pct, 50), "vida_restante_pct_p90": _percentil(vida_pct, 90),
+        "histograma_turnos": histograma_turnos, "histograma_vida_restante_pct": histograma_vida,
+    }
+
+def simular_lote(classes, niveis, batalhas, politica="gulosa", distribuicao="equilibrada", seed=None):
+    """Roda `batalhas` lutas para cada par (classe, nível) contra inimigos de gerar_inimigo. Devolve uma linha de resumo por par."""
+    rng = random.Random(seed); pool = rpg_dinamico.PoolDeInimigos(); linhas = []
+    for classe in classes:
+        for nivel in niveis:
+            heroi = criar_heroi_simulado(classe, nivel, distribuicao); resultados = []
+            for _ in range(batalhas):
+                restaurar(heroi); inimigo = pool.gerar_inimigo(nivel, rng)
+                resultados.append(simular_batalha(heroi, inimigo, POLITICAS[politica], rng)); pool.liberar(inimigo)
+            linhas.append(resumir(classe, nivel, resultados, heroi.vida_maxima))
+    return linhas
+
+# --- RELATÓRIOS ---
+CAMPOS_CSV = ["classe", "nivel", "batalhas", "vitorias", "taxa_vitoria", "turnos_media", "turnos_p10", "turnos_p50", "turnos_p90",
+              "vida_restante_pct_media", "vida_restante_pct_p10", "vida_restante_pct_p50", "vida_restante_pct_p90"]
+
+def salvar_csv(linhas, caminho):
+    with open(caminho, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.DictWriter(f, fieldnames=CAMPOS_CSV, extrasaction="ignore"); escritor.writeheader(); escritor.writerows(linhas)
+
+def salvar_json(linhas, caminho, parametros=None):
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump({"parametros": parametros or {}, "resultados": linhas}, f, ensure_ascii=False, indent=2)
+
+def _intervalo(texto):
+    """Aceita '1-5', '1,3,5' ou '2'."""
+    if "-" in texto: inicio, fim = texto.split("-"); return list(range(int(inicio), int(fim) + 1))
+    return [int(n) for n in texto.split(",")]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m rpg_dinamico simulate", description="Simula batalhas em lote e relata o balanceamento por classe e nível.")
+    parser.add_argument("--batalhas", type=int, default=10000, help="batalhas por classe e nível")
+    parser.add_argument("--classes", default=",".join(rpg_dinamico.CLASSES_BASE), help="classes separadas por vírgula")
+    parser.add_argument("--niveis", type=_intervalo, default=[1, 2, 3, 4, 5], help="ex.: 1-5 ou 1,3,5")
+    parser.add_argument("--politica", choices=sorted(POLITICAS), default="gulosa")
+    parser.add_argument("--distribuicao", choices=sorted(DISTRIBUICOES), default="equilibrada")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--motor", choices=["escalar", "vetorizado"], default=None, help="padrão: vetorizado se o NumPy estiver instalado (escalar com --eventos)")
+    parser.add_argument("--verificar", action="store_true", help="compara os dois motores estatisticamente e sai com erro se divergirem")
+    parser.add_argument("--csv", help="caminho do relatório CSV")
+    parser.add_argument("--json", help="caminho do relatório JSON (inclui os histogramas)")
+    parser.add_argument("--eventos", help="arquivo JSON Lines com os eventos de cada batalha (só o motor escalar)")
+    parser.add_argument("--eventos-max-mb", type=float, default=64.0, help="tamanho em que o arquivo de eventos gira (guarda 3 anteriores)")
+    args = parser.parse_args(argv)
+    classes = [c.strip() for c in args.classes.split(",")]
+    for classe in classes:
+        if classe not in rpg_dinamico.CLASSES_BASE: parser.error(f"classe desconhecida: {classe}")
+
+    if args.verificar:
+        import simulador_vetorizado
+        ok, linhas = simulador_vetorizado.verificar(classes, args.niveis, args.batalhas, args.politica, args.distribuicao, args.seed or 0)
+        for l in linhas:
+            print(f"{l['classe']:<22}{l['nivel']:>4}  {l['confronto']:<26}{l['vitoria_escalar']:>7.1%}{l['vitoria_vetorizado']:>7.1%}"
+                  f"  z vitória {l['z_vitoria']:+.2f}  z turnos {l['z_turnos']:+.2f}  z vida {l['z_vida']:+.2f}  {'ok' if l['passou'] else 'DIVERGIU'}")
+        raise SystemExit(0 if ok else 1)
+
+    if args.motor is None: args.motor = "escalar" if args.eventos or importlib.util.find_spec("numpy") is None else "vetorizado"
+    motor = simular_lote
+    if args.motor == "vetorizado":
+        if args.eventos: parser.error("--eventos só funciona com o motor escalar")
+        import simulador_vetorizado
+        motor = simulador_vetorizado.simular_lote
+    destino = eventos.ArquivoDeEventos(args.eventos, int(args.eventos_max_mb * 1024 * 1024)) if args.eventos else None
+    rpg_dinamico.definir_eventos(destino)
+    inicio = time.perf_counter()
+    try: linhas = motor(classes, args.niveis, args.batalhas, args.politica, args.distribuicao, args.seed)
+    finally:
+        rpg_dinamico.definir_eventos(None)
+        if destino is not None: destino.fechar()
+    decorrido = time.perf_counter() - inicio
+    total = sum(l["batalhas"] for l in linhas)
+
+    print(f"{'Classe':<22}{'Nív':>4}{'Vitória':>9}{'Turnos p50':>12}{'Vida% p50':>11}")
+    for l in linhas: print(f"{l['classe']:<22}{l['nivel']:>4}{l['taxa_vitoria']:>8.1%}{l['turnos_p50']:>12}{l['vida_restante_pct_p50']:>10.1f}%")
+    print(f"\n{total} batalhas em {decorrido:.2f}s ({total / decorrido:,.0f} batalhas/s, motor {args.motor})")
+    if destino is not None: print(f"{destino.emitidos} eventos em {args.eventos} ({destino.emitidos / decorrido:,.0f} eventos/s)")
+    if args.csv: salvar_csv(linhas, args.csv)
+    if args.json: salvar_json(linhas, args.json, vars(args))
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Monte Carlo de masmorras completas, em paralelo.
+Cada corrida segue o fluxo de rpg_dinamico.iniciar_masmorra: andares comuns, chefe, XP, subidas de nível com
+distribuição automática de pontos e escolha de recompensa, tudo sem E/S e com um `random.Random` explícito.
+
+As corridas são divididas em blocos de tamanho fixo; o bloco k sempre usa o gerador semeado com (seed, k) e os
+resumos parciais são somados na ordem dos blocos. Assim o resultado para uma seed é idêntico bit a bit com 1 ou N
+processos: o número de processos só muda quem roda cada bloco.
+
+Uso: python -m rpg_dinamico simulate-masmorra --corridas 20000 --processos 8 --seed 1
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import rpg_dinamico
+import simulador
+
+TAMANHO_DO_BLOCO = 250
+
+# --- UMA CORRIDA ---
+def _valor_do_item(equip):
+    """Peso de um equipamento para a escolha automática de recompensa (Vida e Caos valem menos por ponto)."""
+    if equip is None: return 0.0
+    return equip.bonus_forca + equip.bonus_defesa + equip.bonus_agilidade + equip.bonus_vida / 5 + equip.bonus_caos / 10
+
+def escolher_recompensa(heroi, recompensas):
+    """Pega o equipamento que mais melhora o slot; se nenhum melhora, guarda a primeira poção que couber."""
+    melhor = None; ganho = 0.0
+    for item in recompensas:
+        if isinstance(item, rpg_dinamico.Equipamento):
+            diferenca = _valor_do_item(item) - _valor_do_item(heroi.equipamentos[item.slot])
+            if diferenca > ganho: melhor = item; ganho = diferenca
+    if melhor is not None: rpg_dinamico.resolver_equipar(heroi, melhor); return
+    for item in recompensas:
+        if isinstance(item, rpg_dinamico.Pocao) and rpg_dinamico.resolver_guardar_pocao(heroi, item): return
+
+def ganhar_xp(heroi, quantidade, pesos):
+    """Heroi.ganhar_xp sem E/S: os pontos de cada nível são repartidos automaticamente."""
+    if heroi.nivel >= 5: return
+    heroi.xp_atual += quantidade
+    while heroi.xp_atual >= heroi.xp_proximo_nivel and heroi.nivel < 5:
+        rpg_dinamico.resolver_subida_de_nivel(heroi)
+        simulador.distribuir_automaticamente(heroi, rpg_dinamico.PONTOS_POR_NIVEL, pesos)
+
+def simular_masmorra(heroi, andares, politica, pesos, rng, pool):
+    """
+    Uma masmorra do começo ao fim, com inimigos do `pool` (rpg_dinamico.PoolDeInimigos). Devolve
+    (venceu, andar em que terminou, turnos somados); o andar do chefe é `andares + 1`.
+    """
+    simulador.restaurar(heroi); turnos_total = 0
+    for andar in range(1, andares + 2):
+        # No nível atual do herói, como em iniciar_masmorra: ele pode subir de nível entre um andar e outro.
+        inimigo = pool.gerar_inimigo(heroi.nivel, rng) if andar <= andares else pool.gerar_chefe(heroi.nivel, rng)
+        venceu, turnos, _ = simulador.simular_batalha(heroi, inimigo, politica, rng); turnos_total += turnos; nivel_inimigo = inimigo.nivel; pool.liberar(inimigo)
+        if not venceu: return False, andar, turnos_total
+        heroi.buffs_ativos.clear(); heroi.efeitos_status.clear()
+        ganhar_xp(heroi, nivel_inimigo * 5 + rng.randint(1, 5), pesos)
+        escolher_recompensa(heroi, rpg_dinamico.gerar_recompensas(heroi.nivel, 3, rng))
+    return True, andares + 1, turnos_total
+
+# --- BLOCOS E AGREGAÇÃO ---
+def _novo_resumo():
+    return {"corridas": 0, "vitorias": 0, "turnos": 0, "andar_final": {}, "nivel_final": {}}
+
+def _somar(total, parcial):
+    total["corridas"] += parcial["corridas"]; total["vitorias"] += parcial["vitorias"]; total["turnos"] += parcial["turnos"]
+    for chave in ("andar_final", "nivel_final"):
+        for valor, contagem in parcial[chave].items(): total[chave][valor] = total[chave].get(valor, 0) + contagem
+
+def rodar_bloco(tarefa):
+    """Roda um bloco de corridas de uma classe. Função de módulo para poder ir a outro processo."""
+    seed, indice, classe, quantidade, nivel, andares, politica, distribuicao = tarefa
+    rng = random.Random(f"{seed}/{classe}/{indice}")  # semente em texto: a mesma em qualquer processo (não depende de hash())
+    pesos = simulador.DISTRIBUICOES[distribuicao]; pool = rpg_dinamico.PoolDeInimigos(); resumo = _novo_resumo()
+    for _ in range(quantidade):
+        heroi = simulador.criar_heroi_simulado(classe, nivel, distribuicao)
+        venceu, andar, turnos = simular_masmorra(heroi, andares, simulador.POLITICAS[politica], pesos, rng, pool)
+        resumo["corridas"] += 1; resumo["vitorias"] += venceu; resumo["turnos"] += turnos
+        resumo["andar_final"][andar] = resumo["andar_final"].get(andar, 0) + 1
+        resumo["nivel_final"][heroi.nivel] = resumo["nivel_final"].get(heroi.nivel, 0) + 1
+    return classe, resumo
+
+def dividir_em_blocos(seed, classes, corridas, nivel, andares, politica, distribuicao, tamanho_do_bloco=TAMANHO_DO_BLOCO):
+    tarefas = []
+    for classe in classes:
+        for indice, inicio in enumerate(range(0, corridas, tamanho_do_bloco)):
+            tarefas.append((seed, indice, classe, min(tamanho_do_bloco, corridas - inicio), nivel, andares, politica, distribuicao))
+    return tarefas
+
+def simular_lote(classes, corridas, nivel=1, andares=3, politica="gulosa", distribuicao="equilibrada", seed=0, processos=None, tamanho_do_bloco=TAMANHO_DO_BLOCO):
+    """Resumo por classe de `corridas` masmorras. `processos=1` roda tudo neste processo, sem pool."""
+    tarefas = dividir_em_blocos(seed, classes, corridas, nivel, andares, politica, distribuicao, tamanho_do_bloco)
+    totais = {classe: _novo_resumo() for classe in classes}
+    if processos == 1:
+        parciais = map(rodar_bloco, tarefas)
+        for classe, parcial in parciais: _somar(totais[classe], parcial)
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            for classe, parcial in executor.map(rodar_bloco, tarefas): _somar(totais[classe], parcial)  # map devolve na ordem das tarefas
+    return [dict(classe=classe, taxa_vitoria=t["vitorias"] / t["corridas"] if t["corridas"] else 0.0,
+                 turnos_media=t["turnos"] / t["corridas"] if t["corridas"] else 0.0,
+                 andar_final=dict(sorted(t["andar_final"].items())), nivel_final=dict(sorted(t["nivel_final"].items())),
+                 corridas=t["corridas"], vitorias=t["vitorias"]) for classe, t in totais.items()]
+
+def assinatura(linhas):
+    """Hash do resultado, para conferir que rodadas com números de processos diferentes deram exatamente o mesmo."""
+    return hashlib.sha256(json.dumps(linhas, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m rpg_dinamico simulate-masmorra", description="Simula masmorras completas em paralelo e relata o resultado por classe.")
+    parser.add_argument("--corridas", type=int, default=10000, help="masmorras por classe")
+    parser.add_argument("--classes", default=",".join(rpg_dinamico.CLASSES_BASE), help="classes separadas por vírgula")
+    parser.add_argument("--nivel", type=int, default=1, help="nível inicial do herói")
+    parser.add_argument("--andares", type=int, default=3, help="andares antes do chefe")
+    parser.add_argument("--politica", choices=sorted(simulador.POLITICAS), default="gulosa")
+    parser.add_argument("--distribuicao", choices=sorted(simulador.DISTRIBUICOES), default="equilibrada")
+    parser.add_argument("--seed", type=int, default=None, help="semente mestra (sorteada e mostrada se omitida)")
+    parser.add_argument("--processos", type=int, default=os.cpu_count(), help="1 roda sem pool de processos")
+    parser.add_argument("--bloco", type=int, default=TAMANHO_DO_BLOCO, help="corridas por bloco (muda a divisão das sementes)")
+    parser.add_argument("--json", help="caminho do relatório JSON")
+    args = parser.parse_args(argv)
+    classes = [c.strip() for c in args.classes.split(",")]
+    for classe in classes:
+        if classe not in rpg_dinamico.CLASSES_BASE: parser.error(f"classe desconhecida: {classe}")
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+
+    inicio = time.perf_counter()
+    linhas = simular_lote(classes, args.corridas, args.nivel, args.andares, args.politica, args.distribuicao, seed, args.processos, args.bloco)
+    decorrido = time.perf_counter() - inicio
+    total = sum(l["corridas"] for l in linhas)
+
+    print(f"{'Classe':<22}{'Vitória':>9}{'Turnos':>9}  Andar final / Nível final")
+    for l in linhas:
+        print(f"{l['classe']:<22}{l['taxa_vitoria']:>8.1%}{l['turnos_media']:>9.1f}  {l['andar_final']}  {l['nivel_final']}")
+    print(f"\n{total} masmorras em {decorrido:.2f}s ({total / decorrido:,.0f}/s) com {args.processos} processo(s); seed {seed}, assinatura {assinatura(linhas)}")
+    if args.json: simulador.salvar_json(linhas, args.json, dict(vars(args), seed=seed))
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Motor de combate vetorizado (NumPy) para rodadas de Monte Carlo.
+Guarda N batalhas herói-contra-inimigo como arrays e resolve um turno de todas ao mesmo tempo,
+seguindo as mesmas regras de rpg_dinamico.resolver_* e a mesma ordem de simulador.simular_batalha.
+Batalhas encerradas saem da máscara `ativas` e deixam de ser atualizadas.
+
+Requer NumPy. Uso: python -m rpg_dinamico simulate --motor vetorizado [--verificar]
+"""
+import math
+
+import numpy as np
+
+import rpg_dinamico
+import simulador
+
+# Índices das colunas de atributos dos combatentes.
+VIDA, FORCA, DEFESA, AGILIDADE, CAOS = range(5)
+
+
+def tabela_inimigos(nivel, linhas=None):
+    """Matriz (templates x atributos) com os inimigos já escalados para o nível (por padrão os comuns; `linhas` troca a mistura)."""
+    linhas = rpg_dinamico.linhas_de_inimigos(nivel) if linhas is None else linhas
+    return np.array([atributos for _, _, atributos in linhas], dtype=np.float64)
+
+
+class LoteDeBatalhas:
+    """Estado de N batalhas simultâneas de um mesmo herói contra inimigos sorteados."""
+
+    def __init__(self, heroi, inimigos, politica="gulosa", rng=None):
+        n = len(inimigos)
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.habilidades = rpg_dinamico.HABILIDADES_POR_CLASSE[heroi.classe]
+        self.politica = politica
+        self.proficiencia = heroi.proficiencia
+        # Herói: atributos sem buffs (equipamento incluso) e recursos atuais.
+        self.h_forca = np.full(n, heroi.forca - heroi.buffs_ativos.get('forca', {'valor': 0})['valor'])
+        self.h_defesa = np.full(n, float(heroi.defesa)); self.h_agilidade = np.full(n, float(heroi.agilidade))
+        self.h_vida = np.full(n, heroi.vida_maxima); self.h_caos = np.full(n, heroi.caos_maximo)
+        self.h_buff_forca = np.zeros(n); self.h_buff_turnos = np.zeros(n, dtype=np.int32)
+        # Inimigo.
+        self.i_vida = inimigos[:, VIDA].copy(); self.i_forca = inimigos[:, FORCA].copy()
+        self.i_defesa = inimigos[:, DEFESA].copy(); self.i_agilidade = inimigos[:, AGILIDADE].copy()
+        self.i_veneno_dano = np.zeros(n); self.i_veneno_turnos = np.zeros(n, dtype=np.int32)
+        self.i_congelado_turnos = np.zeros(n, dtype=np.int32)
+        # Controle.
+        self.turnos = np.zeros(n, dtype=np.int32)
+        self.ativas = np.ones(n, dtype=bool)
+
+    # --- Regras, aplicadas só onde a máscara é verdadeira ---
+    def _ataque(self, mascara, a_forca, a_agilidade, d_defesa, d_agilidade, d_vida):
+        chance = np.clip(90 - (d_agilidade - a_agilidade), 20, 100)
+        acertou = mascara & (self.rng.integers(1, 101, size=mascara.shape[0]) <= chance)
+        dano = np.maximum(1.0, a_forca - d_defesa * 0.3)
+        d_vida -= np.where(acertou, dano, 0.0)
+        np.maximum(d_vida, 0.0, out=d_vida)
+
+    def _escolher_acoes(self, mascara):
+        """Índice da habilidade escolhida por batalha, -1 para Ataque Básico (mesmas políticas de simulador.POLITICAS)."""
+        escolha = np.full(mascara.shape[0], -1, dtype=np.int32)
+        if self.politica == "ataque": return escolha
+        decidido = ~mascara
+        melhor_mult = np.full(mascara.shape[0], -1.0)
+        melhor = np.full(mascara.shape[0], -1, dtype=np.int32)
+        for i, hab in enumerate(self.habilidades):
+            pode = ~decidido & (self.h_caos >= hab['custo'])
+            efeito = hab.get('efeito')
+            if self.politica == "habilidade":
+                if hab['multiplicador'] > 0: escolha[pode] = i; decidido |= pode
+                continue
+            if efeito and efeito['tipo'] == 'buff_forca':
+                usar = pode & (self.h_buff_turnos <= 0); escolha[usar] = i; decidido |= usar; pode &= ~usar
+            elif efeito and efeito['tipo'] == 'veneno':
+                usar = pode & (self.i_veneno_turnos <= 0); escolha[usar] = i; decidido |= usar; pode &= ~usar
+            elif efeito and efeito['tipo'] == 'congelado':
+                usar = pode & (self.i_congelado_turnos <= 0); escolha[usar] = i; decidido |= usar; pode &= ~usar
+            if hab['multiplicador'] > 0:
+                melhorou = pode & (hab['multiplicador'] > melhor_mult)
+                melhor[melhorou] = i; melhor_mult[melhorou] = hab['multiplicador']
+        if self.politica == "gulosa":
+            restante = ~decidido & (melhor >= 0); escolha[restante] = melhor[restante]
+        return escolha
+
+    def _habilidade(self, mascara, hab):
+        self.h_caos[mascara] -= hab['custo']
+        dano = (self.h_forca + self.h_buff_forca) * (hab['multiplicador'] + self.proficiencia)
+        if hab['multiplicador'] + self.proficiencia > 0:
+            self.i_vida -= np.where(mascara & (dano > 0), dano, 0.0); np.maximum(self.i_vida, 0.0, out=self.i_vida)
+        efeito = hab.get('efeito')
+        if not efeito: return
+        aplicou = mascara & (self.rng.random(mascara.shape[0]) < efeito['chance'])
+        if efeito['tipo'] == 'veneno':
+            self.i_veneno_turnos[aplicou] = efeito['duracao'] + 1; self.i_veneno_dano[aplicou] = efeito.get('dano', 0)
+        elif efeito['tipo'] == 'congelado':
+            self.i_congelado_turnos[aplicou] = efeito['duracao'] + 1
+        elif efeito['tipo'] == 'buff_forca':
+            self.h_buff_turnos[aplicou] = efeito['duracao'] + 1; self.h_buff_forca[aplicou] = efeito['valor']
+
+    def turno(self):
+        """Resolve um turno completo (herói e inimigo) em todas as batalhas ativas."""
+        ativas = self.ativas
+        self.turnos += ativas
+        # 1. Buffs do herói (o herói não recebe efeitos de status nas regras atuais).
+        tinha_buff = ativas & (self.h_buff_turnos > 0)
+        self.h_buff_turnos -= tinha_buff
+        self.h_buff_forca[tinha_buff & (self.h_buff_turnos <= 0)] = 0.0
+        # 2. Ação do herói (congelado perde a vez).
+        agindo = ativas & (self.h_vida > 0)
+        escolha = self._escolher_acoes(agindo)
+        atacando = agindo & (escolha < 0)
+        for i, hab in enumerate(self.habilidades):
+            usando = agindo & (escolha == i)
+            if usando.any(): self._habilidade(usando, hab)
+        self._ataque(atacando, self.h_forca + self.h_buff_forca, self.h_agilidade, self.i_defesa, self.i_agilidade, self.i_vida)
+        # 3. Efeitos no inimigo: veneno causa dano e depois todos os contadores andam.
+        vivo = agindo & (self.i_vida > 0)
+        envenenado = vivo & (self.i_veneno_turnos > 0)
+        self.i_vida -= np.where(envenenado, self.i_veneno_dano, 0.0); np.maximum(self.i_vida, 0.0, out=self.i_vida)
+        self.i_veneno_turnos -= envenenado
+        congelado = vivo & (self.i_congelado_turnos > 0)
+        self.i_congelado_turnos -= congelado
+        # 4. Ataque do inimigo, se sobreviveu e não está congelado.
+        atacante = vivo & (self.i_vida > 0) & (self.i_congelado_turnos <= 0)
+        self._ataque(atacante, self.i_forca, self.i_agilidade, self.h_defesa, self.h_agilidade, self.h_vida)
+        # 5. Encerra as batalhas decididas ou que bateram o limite de turnos.
+        self.ativas &= (self.h_vida > 0) & (self.i_vida > 0) & (self.turnos < simulador.MAX_TURNOS)
+
+    def rodar(self):
+        while self.ativas.any(): self.turno()
+        venceu = (self.i_vida <= 0) & (self.h_vida > 0)
+        return venceu, self.turnos, self.h_vida
+
+
+def simular_vetorizado(classe, nivel, batalhas, politica="gulosa", distribuicao="equilibrada", rng=None, linhas=None):
+    """Roda `batalhas` lutas de uma classe/nível em lote. Devolve os arrays (venceu, turnos, vida_restante) e o herói usado."""
+    rng = rng if rng is not None else np.random.default_rng()
+    heroi = simulador.criar_heroi_simulado(classe, nivel, distribuicao)
+    tabela = tabela_inimigos(nivel, linhas)
+    inimigos = tabela[rng.integers(0, len(tabela), size=batalhas)]
+    return LoteDeBatalhas(heroi, inimigos, politica, rng).rodar(), heroi
+
+
+def simular_lote(classes, niveis, batalhas, politica="gulosa", distribuicao="equilibrada", seed=None):
+    """Mesmo contrato de simulador.simular_lote, usando o motor vetorizado."""
+    rng = np.random.default_rng(seed); linhas = []
+    for classe in classes:
+        for nivel in niveis:
+            (venceu, turnos, vida), heroi = simular_vetorizado(classe, nivel, batalhas, politica, distribuicao, rng)
+            linhas.append(simulador.resumir(classe, nivel, list(zip(venceu.tolist(), turnos.tolist(), vida.tolist())), heroi.vida_maxima))
+    return linhas
+
+
+# --- VERIFICAÇÃO ESTATÍSTICA CONTRA O MOTOR ESCALAR ---
+def _z_proporcao(a, n_a, b, n_b):
+    p = (a + b) / (n_a + n_b)
+    erro = math.sqrt(p * (1 - p) * (1 / n_a + 1 / n_b))
+    return 0.0 if erro == 0 else (a / n_a - b / n_b) / erro
+
+def _z_media(x, y):
+    if len(x) < 2 or len(y) < 2: return 0.0
+    mx, my = sum(x) / len(x), sum(y) / len(y)
+    vx = sum((v - mx) ** 2 for v in x) / (len(x) - 1); vy = sum((v - my) ** 2 for v in y) / (len(y) - 1)
+    erro = math.sqrt(vx / len(x) + vy / len(y))
+    return 0.0 if erro == 0 else (mx - my) / erro
+
+def confrontos(nivel):
+    """(rótulo, linhas) comparados em um nível: a mistura de inimigos comuns de gerar_inimigo e cada chefe sozinho.
+    Contra os comuns quase todo herói vence sempre; são os chefes que espalham a taxa de vitória e pegam uma divergência."""
+    return [("comuns", rpg_dinamico.linhas_de_inimigos(nivel))] + [(linha[0], (linha,)) for linha in rpg_dinamico.linhas_de_chefes(nivel)]
+
+def verificar(classes, niveis, batalhas=5000, politica="gulosa", distribuicao="equilibrada", seed=0, limite_z=4.0):
+    """
+    Compara os dois motores por classe/nível/confronto: taxa de vitória (teste z de duas proporções) e médias de turnos e
+    vida restante (z de Welch). Devolve (ok, linhas), onde ok é falso se algum |z| passar de `limite_z`.
+    """
+    import random
+    rng_escalar = random.Random(seed); rng_vetor = np.random.default_rng(seed); linhas = []; ok = True
+    for classe in classes:
+        for nivel in niveis:
+            heroi = simulador.criar_heroi_simulado(classe, nivel, distribuicao)
+            for rotulo, mistura in confrontos(nivel):
+                escalar = []
+                for _ in range(batalhas):
+                    simulador.restaurar(heroi); nome, _, atributos = rng_escalar.choice(mistura)
+                    escalar.append(simulador.simular_batalha(heroi, rpg_dinamico.Personagem(nome, *atributos, nivel=nivel), simulador.POLITICAS[politica], rng_escalar))
+                (venceu, turnos, vida), _ = simular_vetorizado(classe, nivel, batalhas, politica, distribuicao, rng_vetor, mistura)
+                vitorias = sum(r[0] for r in escalar)
+                z_vitoria = _z_proporcao(vitorias, batalhas, int(venceu.sum()), batalhas)
+                z_turnos = _z_media([r[1] for r in escalar], turnos.tolist())
+                z_vida = _z_media([r[2] for r in escalar], vida.tolist())
+                passou = max(abs(z_vitoria), abs(z_turnos), abs(z_vida)) <= limite_z; ok &= passou
+                linhas.append({"classe": classe, "nivel": nivel, "confronto": rotulo, "vitoria_escalar": vitorias / batalhas, "vitoria_vetorizado": float(venceu.mean()),
+                               "z_vitoria": z_vitoria, "z_turnos": z_turnos, "z_vida": z_vida, "passou": passou})
+    return ok, linhas
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Renderizador do console em duplo buffer: substitui o os.system('cls'/'clear') de limpar_tela(), que criava um shell
+e um processo a cada tela (dezenas por batalha).
+
+Instalada como sys.stdout (rpg_dinamico.definir_tela, que o main() do console faz), a Tela guarda tudo o que é
+impresso num buffer fora da tela e só escreve no terminal quando o jogo vai esperar o jogador: antes de cada entrada()
+e de cada pausa do RITMO. A primeira apresentação depois de um limpar() compara o quadro novo, linha a linha, com o
+que o terminal já mostra e reescreve só as linhas que mudaram (posição do cursor + linha + apagar o resto), tudo num
+único write/flush; as apresentações seguintes da mesma tela só acrescentam o texto novo, como um terminal comum.
+As cores continuam sendo as de RARIDADES/COR_RESET, que já vêm dentro do texto.
+
+Se o quadro não cabe no terminal (mais linhas que a altura, ou uma linha que quebraria), ele é redesenhado inteiro,
+ainda num único write. Fora de um terminal (saída redirecionada) não há escapes: o texto passa direto.
+"""
+import os
+import re
+import shutil
+import sys
+import unicodedata
+
+ESC = "\033["
+LIMPAR = ESC + "H" + ESC + "2J"  # Cursor no topo + apaga a tela inteira
+_ESCAPE_ANSI = re.compile(r"\033\[[0-9;?]*[A-Za-z]")
+
+
+def largura_visivel(linha):
+    """Colunas que `linha` ocupa no terminal: ignora escapes ANSI e conta emoji e caracteres largos como dois."""
+    largura = 0
+    for caractere in _ESCAPE_ANSI.sub("", linha):
+        if caractere == "\ufe0f": largura += 1  # Seletor de emoji: ❤ + FE0F ocupa duas colunas
+        elif caractere == "\u200d" or unicodedata.combining(caractere): continue
+        else: largura += 2 if unicodedata.east_asian_width(caractere) in "WF" else 1
+    return largura
+
+def limpar(saida):
+    """Limpa o terminal sem a Tela (scripts que chamam as telas do jogo direto): um escape, sem processo filho."""
+    if saida.isatty(): saida.write(LIMPAR); saida.flush()
+
+
+class Tela:
+    """Objeto de arquivo que compõe as telas do console e as apresenta por diferença. `tamanho` pode ser trocado (testes)."""
+    def __init__(self, saida=None, ansi=None, tamanho=shutil.get_terminal_size):
+        self.saida = saida if saida is not None else sys.stdout
+        self.ansi = self.saida.isatty() if ansi is None else ansi
+        self._tamanho = tamanho
+        self._pendente = []       # Texto impresso e ainda não apresentado
+        self._nova = False        # limpar() pedido: a próxima apresentação é um quadro novo
+        self._mostrada = None     # Linhas que o terminal mostra agora (None: desconhecidas, redesenha tudo)
+        self._anterior = None
+
+    # --- OBJETO DE ARQUIVO (sys.stdout) ---
+    def write(self, texto): self._pendente.append(texto); return len(texto)
+    def flush(self): self.apresentar()
+    def isatty(self): return self.ansi
+    @property
+    def encoding(self): return getattr(self.saida, "encoding", "utf-8")
+
+    def instalar(self):
+        if self.ansi and os.name == 'nt': os.system('')  # Liga o modo ANSI do console do Windows (o cls fazia isso de brinde)
+        self._anterior = sys.stdout; sys.stdout = self
+    def desinstalar(self):
+        self.apresentar()
+        if sys.stdout is self: sys.stdout = self._anterior
+        self._anterior = None
+
+    # --- TELAS ---
+    def limpar(self):
+        """Começa um quadro novo. O que estava pendente do quadro anterior é descartado, como o clear fazia."""
+        if self.ansi: self._pendente.clear(); self._nova = True
+
+    def entrada(self, prompt=""):
+        """input() com o prompt no quadro: apresenta, lê e anota o eco do terminal (resposta + quebra de linha)."""
+        self.write(prompt); self.apresentar()
+        resposta = input()
+        if self._mostrada is not None: self._acrescentar([resposta, ""])
+        return resposta
+
+    def apresentar(self):
+        if not self._pendente and not self._nova: return
+        texto = "".join(self._pendente); self._pendente.clear()
+        if not self.ansi: self.saida.write(texto); self.saida.flush(); return
+        if self._nova: self._nova = False; texto = self._quadro_novo(texto.split("\n"))
+        elif self._mostrada is not None: self._acrescentar(texto.split("\n"))
+        if texto: self.saida.write(texto); self.saida.flush()
+
+    def _cabe(self, linhas):
+        colunas, altura = self._tamanho()
+        metade = colunas // 2  # Nenhum caractere ocupa mais de duas colunas: linha curta cabe sem medir
+        return len(linhas) < altura and all(len(linha) < metade or largura_visivel(linha) < colunas for linha in linhas)
+
+    def _quadro_novo(self, linhas):
+        """Escapes que levam o terminal da tela mostrada ao quadro `linhas` (a última linha fica aberta, com o cursor no fim)."""
+        antigas = self._mostrada
+        if not self._cabe(linhas):
+            self._mostrada = None; return LIMPAR + "\n".join(linhas)
+        self._mostrada = linhas
+        if antigas is None: return LIMPAR + "\n".join(linhas)
+        partes = [f"{ESC}{i + 1};1H{linha}{ESC}K" for i, linha in enumerate(linhas) if i >= len(antigas) or antigas[i] != linha]
+        if len(linhas) < len(antigas): partes.append(f"{ESC}{len(linhas) + 1};1H{ESC}J")
+        if partes: partes.append(f"{ESC}{len(linhas)};{largura_visivel(linhas[-1]) + 1}H")
+        return "".join(partes)
+
+    def _acrescentar(self, linhas):
+        """Anota texto escrito em fluxo no fim da tela mostrada; se o terminal rolou ou quebrou linha, ela fica desconhecida."""
+        mostrada = self._mostrada; mostrada[-1] += linhas[0]; mostrada.extend(linhas[1:])
+        if not self._cabe(mostrada): self._mostrada = None
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""Recuperação do diário: uma luta interrompida no meio, reconstruída por diario.recuperar, tem de bater com o estado vivo."""
+import random
+
+import pytest
+
+import diario
+import rpg_dinamico
+
+FURIA = rpg_dinamico.HABILIDADES_POR_CLASSE["Feral"][1]   # buff_forca no próprio herói
+NEVOA = rpg_dinamico.HABILIDADES_POR_CLASSE["Sombra"][1]  # veneno no inimigo
+
+
+@pytest.fixture
+def luta(tmp_path):
+    """Herói e inimigo com o diário ligado e a batalha já aberta nele; desliga o diário no fim."""
+    caminho = str(tmp_path / "masmorra.diario"); registro = diario.DiarioDeBatalha(caminho)
+    heroi = rpg_dinamico.Heroi("Teste", "Sombra", 120, 12, 6, 10, 200)
+    heroi.inventario_pocoes = [rpg_dinamico.Pocao("Elixir de Força", "comum", "buff_forca", 5, 3), rpg_dinamico.Pocao("Poção de Cura", "comum", "cura", 50)]
+    inimigo = rpg_dinamico.Personagem("Ogro", 600, 9, 4, 8, 0)
+    registro.iniciar_masmorra(heroi, andares=1, vidas=3); registro.iniciar_batalha(inimigo, 1)
+    rpg_dinamico.definir_diario(registro)
+    yield caminho, registro, heroi, inimigo
+    rpg_dinamico.definir_diario(None); registro.fechar()
+
+
+def _estado(personagem):
+    return (personagem.vida_atual, personagem.caos_atual, personagem.buffs_ativos.pilhas(), personagem.efeitos_status.pilhas())
+
+def _pocoes(heroi): return [(p.nome, p.raridade, p.tipo, p.valor, p.duracao) for p in heroi.inventario_pocoes]
+
+def _conferir(caminho, registro, heroi, inimigo):
+    registro.fechar()  # A "queda": o que chegou ao arquivo é tudo o que sobra
+    recuperado = diario.recuperar(caminho, rpg_dinamico)
+    assert recuperado is not None and recuperado.inimigo is not None
+    assert _estado(recuperado.heroi) == _estado(heroi)
+    assert _estado(recuperado.inimigo) == _estado(inimigo)
+    assert _pocoes(recuperado.heroi) == _pocoes(heroi)
+
+def _turno(heroi, inimigo, numero, rng):
+    """Um turno do herói alternando buff, veneno, poção e ataque, e o ataque de volta do inimigo."""
+    rpg_dinamico.resolver_efeitos(heroi)
+    acao = numero % 4
+    if acao == 0: rpg_dinamico.resolver_habilidade(heroi, heroi, FURIA, rng)
+    elif acao == 1: rpg_dinamico.resolver_habilidade(heroi, inimigo, NEVOA, rng)
+    elif acao == 2 and heroi.inventario_pocoes: rpg_dinamico.resolver_pocao(heroi, 0)
+    else: rpg_dinamico.resolver_ataque(heroi, inimigo, rng)
+    if numero % 5 == 4: rpg_dinamico.resolver_guardar_pocao(heroi, rpg_dinamico.Pocao("Poção Casca de Ferro", "raro", "buff_defesa", 5, 3))
+    rpg_dinamico.resolver_efeitos(inimigo)
+    if inimigo.esta_vivo() and 'congelado' not in inimigo.efeitos_status: rpg_dinamico.resolver_ataque(inimigo, heroi, rng)
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_luta_interrompida_e_recuperada(luta, seed):
+    caminho, registro, heroi, inimigo = luta
+    rng = random.Random(seed); parar = random.Random(1000 + seed).randint(3, 40)  # Atravessa snapshots (SNAPSHOT_A_CADA eventos)
+    for numero in range(parar):
+        if not (heroi.esta_vivo() and inimigo.esta_vivo()): break
+        _turno(heroi, inimigo, numero, rng)
+    _conferir(caminho, registro, heroi, inimigo)
+
+
+def test_ultimo_efeito_vence_no_ultimo_turno_gravado(luta):
+    caminho, registro, heroi, inimigo = luta
+    rng = random.Random(0)
+    rpg_dinamico.resolver_habilidade(heroi, heroi, FURIA, rng); rpg_dinamico.resolver_habilidade(heroi, inimigo, NEVOA, rng)
+    while heroi.buffs_ativos or inimigo.efeitos_status:
+        rpg_dinamico.resolver_efeitos(heroi); rpg_dinamico.resolver_efeitos(inimigo)
+    assert not heroi.buffs_ativos and not inimigo.efeitos_status
+    _conferir(caminho, registro, heroi, inimigo)
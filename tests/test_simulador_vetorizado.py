@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""Conferência estatística do motor vetorizado contra o escalar (simulador.simular_batalha), com seed fixa."""
+import pytest
+
+pytest.importorskip("numpy")
+
+import simulador_vetorizado
+
+CLASSE = "Moldador de Essência"  # Contra os chefes dos níveis 1 e 3 vence entre ~0% e ~70%: as taxas ficam longe dos extremos
+NIVEIS = [1, 3]
+BATALHAS = 2000
+
+
+def _linhas(**kwargs):
+    ok, linhas = simulador_vetorizado.verificar([CLASSE], NIVEIS, BATALHAS, seed=20240, **kwargs)
+    return ok, linhas
+
+
+def test_confrontos_incluem_cada_chefe():
+    rotulos = [rotulo for rotulo, _ in simulador_vetorizado.confrontos(1)]
+    assert rotulos[0] == "comuns" and len(rotulos) == 1 + len(simulador_vetorizado.rpg_dinamico.linhas_de_chefes(1))
+
+
+def test_motores_concordam():
+    ok, linhas = _linhas()
+    divergentes = [l for l in linhas if not l["passou"]]
+    assert ok, divergentes
+    # Sem confrontos disputados o teste de proporção não testaria nada (z = 0 quando os dois vencem sempre).
+    assert any(0.2 < l["vitoria_escalar"] < 0.8 for l in linhas)
+
+
+def test_divergencia_nas_regras_e_detectada(monkeypatch):
+    ataque = simulador_vetorizado.LoteDeBatalhas._ataque
+    def ataque_mais_forte(self, mascara, a_forca, *resto): ataque(self, mascara, a_forca * 1.1, *resto)
+    monkeypatch.setattr(simulador_vetorizado.LoteDeBatalhas, "_ataque", ataque_mais_forte)
+    ok, linhas = _linhas()
+    assert not ok